@@ -1,12 +1,16 @@
+from collections.abc import Callable
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import Optional
 from uuid import UUID
 
 import jwt
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.routing import APIRoute
 
 from app.application.services.server_orchestrator import ServerProvisionOrchestrator
+from app.application.services.status_reconciler import StatusReconciler
+from app.application.services.vmid_allocator import VmidAllocator
 from app.application.use_cases.control_server_power import ControlServerPower
 from app.application.use_cases.extend_server_expiry import ExtendServerExpiry
 from app.application.use_cases.provision_server import ProvisionServer
@@ -20,21 +24,73 @@ from app.application.use_cases.register_user import RegisterUser
 from app.domain.models.plan import PlanSpec
 from app.domain.models.proxmox_host import ProxmoxHostConfig
 from app.domain.services.provisioning_policy import ProvisioningPolicy
-from app.infrastructure.clients.proxmox import ProxmoxClient
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient
+from app.infrastructure.clients.proxmox_breaker import ProxmoxBreakerRegistry
+from app.infrastructure.clients.proxmox_retry import ProxmoxRetryPolicy
 from app.infrastructure.clients.solapi import SolapiClient
+from app.infrastructure.repositories.catalog_cache import CatalogCache
+from app.infrastructure.repositories.pagination import PageCursor
 from app.infrastructure.config.settings import settings
 from app.infrastructure.repositories.plan_repository import PlanRepository
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
 from app.infrastructure.repositories.server_repository import ServerRepository
 from app.infrastructure.repositories.upgrade_repository import UpgradeRepository
 from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.repositories.vmid_lease_repository import VmidLeaseRepository
 from app.domain.models.user import User
-from app.infrastructure.storage.sqlite import SQLAlchemyDataStore
+from app.infrastructure.storage.sqlite import SQLAlchemyDataStore, SQLiteProfile
 
 
 @lru_cache()
 def get_datastore() -> SQLAlchemyDataStore:
-    return SQLAlchemyDataStore(settings.database_path)
+    return SQLAlchemyDataStore(
+        settings.database_path,
+        profile=SQLiteProfile(
+            journal_mode=settings.sqlite_journal_mode,
+            synchronous=settings.sqlite_synchronous,
+            busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+            mmap_size=settings.sqlite_mmap_size,
+            cache_size=settings.sqlite_cache_size,
+            temp_store=settings.sqlite_temp_store,
+        ),
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+    )
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Route class that runs each request inside one ``UnitOfWork``.
+
+    Every repository call made while handling the request shares a single session and
+    transaction. The commit happens after the endpoint returns but before the response
+    is sent, so a failed commit still reaches the client as an error. Endpoints that
+    await long Proxmox tasks opt out with ``without_unit_of_work``; holding a SQLite
+    write transaction across a clone would block every other writer.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if getattr(self.endpoint, "__unit_of_work__", True) is False:
+            return handler
+
+        async def handle_in_unit_of_work(request: Request) -> Response:
+            with get_datastore().unit_of_work():
+                return await handler(request)
+
+        return handle_in_unit_of_work
+
+
+def without_unit_of_work(endpoint: Callable) -> Callable:
+    """Keep per-repository-call transactions for an endpoint on a ``UnitOfWorkRoute`` router."""
+
+    endpoint.__unit_of_work__ = False
+    return endpoint
+
+
+@lru_cache()
+def get_catalog_cache() -> CatalogCache:
+    return CatalogCache(get_datastore(), check_interval=settings.catalog_check_interval_seconds)
 
 
 @lru_cache()
@@ -49,7 +105,7 @@ def get_server_repository() -> ServerRepository:
 
 @lru_cache()
 def get_plan_repository() -> PlanRepository:
-    repo = PlanRepository(get_datastore())
+    repo = PlanRepository(get_datastore(), cache=get_catalog_cache())
     if not repo.get("basic"):
         repo.add(
             PlanSpec(
@@ -83,13 +139,13 @@ def get_plan_repository() -> PlanRepository:
 
 @lru_cache()
 def get_upgrade_repository() -> UpgradeRepository:
-    return UpgradeRepository(get_datastore())
+    return UpgradeRepository(get_datastore(), cache=get_catalog_cache())
 
 
 @lru_cache()
 def get_proxmox_host_repository() -> ProxmoxHostRepository:
-    repo = ProxmoxHostRepository(get_datastore())
-    if settings.proxmox_password:
+    repo = ProxmoxHostRepository(get_datastore(), cache=get_catalog_cache())
+    if settings.proxmox_password or settings.proxmox_token_secret:
         repo.add(
             ProxmoxHostConfig(
                 id="default",
@@ -99,6 +155,8 @@ def get_proxmox_host_repository() -> ProxmoxHostRepository:
                 realm=settings.proxmox_realm,
                 node=None,
                 location="kr-central",
+                token_id=settings.proxmox_token_id or None,
+                token_secret=settings.proxmox_token_secret or None,
             )
         )
     return repo
@@ -110,8 +168,29 @@ def get_provisioning_policy() -> ProvisioningPolicy:
 
 
 @lru_cache()
-def get_proxmox_client() -> ProxmoxClient:
-    return ProxmoxClient()
+def get_proxmox_client() -> AsyncProxmoxClient:
+    return AsyncProxmoxClient(
+        breakers=get_proxmox_breakers(),
+        retry=ProxmoxRetryPolicy(
+            max_attempts=settings.proxmox_retry_max_attempts,
+            base_delay=settings.proxmox_retry_base_delay,
+            max_delay=settings.proxmox_retry_max_delay,
+            budget_ratio=settings.proxmox_retry_budget_ratio,
+            budget_capacity=settings.proxmox_retry_budget_capacity,
+        ),
+    )
+
+
+@lru_cache()
+def get_proxmox_breakers() -> ProxmoxBreakerRegistry:
+    return ProxmoxBreakerRegistry(
+        failure_threshold=settings.proxmox_breaker_failure_threshold,
+        failure_rate=settings.proxmox_breaker_failure_rate,
+        slow_call_seconds=settings.proxmox_breaker_slow_call_seconds,
+        window_size=settings.proxmox_breaker_window_size,
+        min_calls=settings.proxmox_breaker_min_calls,
+        open_seconds=settings.proxmox_breaker_open_seconds,
+    )
 
 
 @lru_cache()
@@ -126,6 +205,17 @@ def get_server_orchestrator() -> ServerProvisionOrchestrator:
         proxmox_hosts=get_proxmox_host_repository(),
         proxmox_client=get_proxmox_client(),
         solapi_client=get_solapi_client(),
+        vmid_allocator=get_vmid_allocator(),
+    )
+
+
+@lru_cache()
+def get_vmid_allocator() -> VmidAllocator:
+    return VmidAllocator(
+        leases=VmidLeaseRepository(get_datastore()),
+        proxmox_client=get_proxmox_client(),
+        pool_size=settings.proxmox_vmid_pool_size,
+        default_range=(settings.proxmox_vmid_range_start, settings.proxmox_vmid_range_end),
     )
 
 
@@ -170,6 +260,66 @@ def get_server_status_refresher() -> RefreshServerStatus:
         server_repo=get_server_repository(),
         proxmox_hosts=get_proxmox_host_repository(),
         proxmox_client=get_proxmox_client(),
+        per_host_concurrency=settings.status_refresh_per_host_concurrency,
+        deadline=settings.status_refresh_deadline_seconds,
+    )
+
+
+def get_freshness_max_age(
+    freshness: str = Query(
+        "cached",
+        description="`cached` serves the stored copy, `max_age=<seconds>` refreshes rows older than that, `live` always asks Proxmox",
+    ),
+) -> float | None:
+    """Translate the ``freshness`` query parameter into a max age in seconds (``None`` = never refresh)."""
+
+    if freshness == "cached":
+        return None
+    if freshness == "live":
+        return 0.0
+    name, _, value = freshness.partition("=")
+    try:
+        max_age = float(value)
+    except ValueError:
+        max_age = -1.0
+    if name != "max_age" or max_age < 0:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="freshness must be 'cached', 'live' or 'max_age=<seconds>'",
+        )
+    return max_age
+
+
+@dataclass
+class PageParams:
+    limit: int
+    after: PageCursor | None = None
+
+    def set_next_cursor(self, response: Response, items: list) -> None:
+        """Advertise the next page in ``X-Next-Cursor`` when this one came back full."""
+
+        if len(items) >= self.limit:
+            response.headers["X-Next-Cursor"] = PageCursor.after(items[-1]).encode()
+
+
+def get_page_params(
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    cursor: str | None = Query(None, description="`X-Next-Cursor` value from the previous page"),
+) -> PageParams:
+    try:
+        after = PageCursor.decode(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return PageParams(limit=limit, after=after)
+
+
+@lru_cache()
+def get_status_reconciler() -> StatusReconciler:
+    return StatusReconciler(
+        server_repo=get_server_repository(),
+        proxmox_hosts=get_proxmox_host_repository(),
+        refresher=get_server_status_refresher(),
+        interval=settings.status_sync_interval_seconds,
     )
 
 
@@ -184,6 +334,7 @@ def get_expired_server_stopper() -> StopExpiredServers:
         server_repo=get_server_repository(),
         proxmox_hosts=get_proxmox_host_repository(),
         proxmox_client=get_proxmox_client(),
+        per_host_concurrency=settings.expiry_stop_per_host_concurrency,
     )
 
 
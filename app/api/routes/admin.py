@@ -1,35 +1,53 @@
+from collections.abc import Iterable
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 from app.api.dependencies import (
+    PageParams,
+    UnitOfWorkRoute,
+    get_freshness_max_age,
+    get_page_params,
     get_plan_repository,
+    get_proxmox_breakers,
     get_proxmox_host_repository,
     get_upgrade_repository,
     get_server_repository,
     get_server_status_refresher,
+    get_user_repository,
     require_admin,
+    without_unit_of_work,
 )
 from app.domain.models.server import ServerStatus
 from app.domain.models.plan import PlanSpec
 from app.domain.models.proxmox_host import ProxmoxHostConfig
 from app.domain.models.upgrade import UpgradeSpec
+from app.infrastructure.clients.proxmox_breaker import ProxmoxBreakerRegistry
 from app.infrastructure.repositories.plan_repository import PlanRepository
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
 from app.infrastructure.repositories.upgrade_repository import UpgradeRepository
 from app.infrastructure.repositories.server_repository import ServerRepository
+from app.infrastructure.repositories.user_repository import UserRepository
 from app.application.use_cases.refresh_server_status import RefreshServerStatus
 from app.interfaces.schemas import (
     PlanCreate,
     PlanRead,
     ProxmoxHostCreate,
+    ProxmoxHostHealthRead,
     ProxmoxHostRead,
     UpgradeCreate,
     UpgradeRead,
     ServerRead,
+    UserRead,
 )
+from app.interfaces.exports import MEDIA_TYPES, ExportFormat, encode_chunks, export_lines
 
-router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)], route_class=UnitOfWorkRoute
+)
 
 
 @router.post("/plans", response_model=PlanRead)
@@ -61,6 +79,31 @@ def list_proxmox_hosts(repo: ProxmoxHostRepository = Depends(get_proxmox_host_re
     return [ProxmoxHostRead.from_entity(host) for host in repo.list()]
 
 
+@router.get("/proxmox/hosts/health", response_model=list[ProxmoxHostHealthRead])
+def proxmox_host_health(
+    repo: ProxmoxHostRepository = Depends(get_proxmox_host_repository),
+    breakers: ProxmoxBreakerRegistry = Depends(get_proxmox_breakers),
+):
+    """Circuit-breaker state per host; ``open`` hosts are failing fast until ``retry_in_seconds``."""
+
+    health = []
+    for host in repo.list():
+        breaker = breakers.get(host.id).snapshot()
+        health.append(
+            ProxmoxHostHealthRead.from_entity(
+                host,
+                state=breaker.state.value,
+                calls=breaker.calls,
+                failures=breaker.failures,
+                slow_calls=breaker.slow_calls,
+                consecutive_failures=breaker.consecutive_failures,
+                retry_in=breaker.retry_in,
+                last_error=breaker.last_error,
+            )
+        )
+    return health
+
+
 @router.delete("/proxmox/hosts/{host_id}", status_code=204)
 def delete_proxmox_host(host_id: str, repo: ProxmoxHostRepository = Depends(get_proxmox_host_repository)):
     repo.delete(host_id)
@@ -86,13 +129,73 @@ def delete_upgrade(name: str, repo: UpgradeRepository = Depends(get_upgrade_repo
 
 
 @router.get("/servers", response_model=list[ServerRead])
-def list_servers(
+@without_unit_of_work  # may await a Proxmox refresh; must not hold a transaction meanwhile
+async def list_servers(
+    response: Response,
     owner_id: UUID | None = None,
     status: ServerStatus | None = None,
     plan: str | None = None,
     location: str | None = None,
+    page: PageParams = Depends(get_page_params),
     repo: ServerRepository = Depends(get_server_repository),
     refresher: RefreshServerStatus = Depends(get_server_status_refresher),
+    max_age: float | None = Depends(get_freshness_max_age),
+):
+    servers = await run_in_threadpool(
+        repo.list_all,
+        owner_id=owner_id,
+        status=status,
+        plan=plan,
+        location=location,
+        after=page.after,
+        limit=page.limit,
+    )
+    page.set_next_cursor(response, servers)
+    return [ServerRead.from_entity(server) for server in await refresher.ensure_fresh(servers, max_age)]
+
+
+@router.get("/servers/export", response_class=StreamingResponse)
+@without_unit_of_work  # the body is read after the handler returns, on its own session
+def export_servers(
+    owner_id: UUID | None = None,
+    status: ServerStatus | None = None,
+    plan: str | None = None,
+    location: str | None = None,
+    fmt: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    gzip: bool = False,
+    repo: ServerRepository = Depends(get_server_repository),
+):
+    """Stream every server matching the ``list_servers`` filters from stored state (no Proxmox refresh)."""
+
+    servers = repo.iter_all(owner_id=owner_id, status=status, plan=plan, location=location)
+    records = (ServerRead.from_entity(server) for server in servers)
+    return _export_response(records, ServerRead, fmt, gzip, "servers", exclude={"vm_password"})
+
+
+@router.get("/users/export", response_class=StreamingResponse)
+@without_unit_of_work
+def export_users(
+    fmt: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    gzip: bool = False,
+    repo: UserRepository = Depends(get_user_repository),
 ):
-    servers = repo.list_all(owner_id=owner_id, status=status, plan=plan, location=location)
-    return [ServerRead.from_entity(refresher.refresh_entity(server)) for server in servers]
+    records = (UserRead.from_entity(user) for user in repo.iter_all())
+    return _export_response(records, UserRead, fmt, gzip, "users")
+
+
+def _export_response(
+    records: Iterable[BaseModel],
+    schema: type[BaseModel],
+    fmt: ExportFormat,
+    gzip: bool,
+    name: str,
+    exclude: set[str] | None = None,
+) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        encode_chunks(export_lines(records, schema, fmt, exclude), compress=gzip),
+        media_type=MEDIA_TYPES[fmt],
+        headers=headers,
+    )
@@ -1,17 +1,24 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 
 from app.api.dependencies import (
+    PageParams,
+    UnitOfWorkRoute,
     get_current_user,
+    get_freshness_max_age,
+    get_page_params,
     get_plan_repository,
     get_proxmox_host_repository,
     get_server_expiry_extender,
     get_server_power_control,
     get_server_provisioning,
+    get_server_repository,
     get_server_status_refresher,
     get_server_upgrade,
     get_upgrade_repository,
     get_password_resetter,
+    without_unit_of_work,
 )
 from app.application.use_cases.control_server_power import ControlServerPower
 from app.application.use_cases.extend_server_expiry import ExtendServerExpiry
@@ -19,19 +26,21 @@ from app.application.use_cases.refresh_server_status import RefreshServerStatus
 from app.application.use_cases.reset_server_password import ResetServerPassword
 from app.infrastructure.repositories.plan_repository import PlanRepository
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
+from app.infrastructure.repositories.server_repository import ServerRepository
 from app.interfaces.schemas import ServerCreate, ServerExtendRequest, ServerRead, ServerUpgradeRequest
 
-router = APIRouter(prefix="/servers", tags=["servers"])
+router = APIRouter(prefix="/servers", tags=["servers"], route_class=UnitOfWorkRoute)
 
 
 @router.post("", response_model=ServerRead)
-def provision_server(
+@without_unit_of_work  # records progress while the clone runs; must not hold the write lock
+async def provision_server(
     payload: ServerCreate,
     current_user = Depends(get_current_user),
     provision = Depends(get_server_provisioning),
 ):
     try:
-        server, password = provision.execute(
+        server, password = await provision.execute(
             user_id=current_user.id,
             plan=payload.plan,
             location=payload.location,
@@ -43,14 +52,23 @@ def provision_server(
 
 
 @router.get("/user/{user_id}", response_model=list[ServerRead])
-def list_user_servers(
+@without_unit_of_work  # may await a Proxmox refresh; must not hold a transaction meanwhile
+async def list_user_servers(
     user_id: UUID,
+    response: Response,
     current_user = Depends(get_current_user),
+    page: PageParams = Depends(get_page_params),
+    repo: ServerRepository = Depends(get_server_repository),
     refresher: RefreshServerStatus = Depends(get_server_status_refresher),
+    max_age: float | None = Depends(get_freshness_max_age),
 ):
+    """Serve the persisted copy kept current by the status reconciler (see ``staleness_ms``)."""
+
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not allowed to view these servers")
-    servers = refresher.refresh_for_user(user_id=user_id)
+    servers = await run_in_threadpool(repo.list_for_user, user_id, after=page.after, limit=page.limit)
+    page.set_next_cursor(response, servers)
+    servers = await refresher.ensure_fresh(servers, max_age)
     return [ServerRead.from_entity(server) for server in servers]
 
 
@@ -97,25 +115,30 @@ def get_allowed_plans_and_locations(
 
 
 @router.get("/{server_id}", response_model=ServerRead)
-def get_server(
+@without_unit_of_work  # may await a Proxmox refresh; must not hold a transaction meanwhile
+async def get_server(
     server_id: UUID,
     current_user = Depends(get_current_user),
+    repo: ServerRepository = Depends(get_server_repository),
     refresher: RefreshServerStatus = Depends(get_server_status_refresher),
+    max_age: float | None = Depends(get_freshness_max_age),
 ):
-    server = refresher.refresh_owned(server_id, current_user.id)
-    if not server:
+    server = await run_in_threadpool(repo.get, server_id)
+    if not server or server.owner_id != current_user.id:
         raise HTTPException(status_code=404, detail="Server not found or not owned")
+    await refresher.ensure_fresh([server], max_age)
     return ServerRead.from_entity(server)
 
 
 @router.post("/{server_id}/start", response_model=ServerRead)
-def start_server(
+@without_unit_of_work  # waits on the Proxmox task; must not hold a pooled connection meanwhile
+async def start_server(
     server_id: UUID,
     current_user = Depends(get_current_user),
     control: ControlServerPower = Depends(get_server_power_control),
 ):
     try:
-        server = control.start(
+        server = await control.start(
             server_id,
             user_id=current_user.id,
         )
@@ -126,13 +149,14 @@ def start_server(
 
 
 @router.post("/{server_id}/stop", response_model=ServerRead)
-def stop_server(
+@without_unit_of_work
+async def stop_server(
     server_id: UUID,
     current_user = Depends(get_current_user),
     control: ControlServerPower = Depends(get_server_power_control),
 ):
     try:
-        server = control.stop(
+        server = await control.stop(
             server_id,
             user_id=current_user.id,
         )
@@ -143,13 +167,14 @@ def stop_server(
 
 
 @router.post("/{server_id}/reboot", response_model=ServerRead)
-def reboot_server(
+@without_unit_of_work
+async def reboot_server(
     server_id: UUID,
     current_user = Depends(get_current_user),
     control: ControlServerPower = Depends(get_server_power_control),
 ):
     try:
-        server = control.reboot(
+        server = await control.reboot(
             server_id,
             user_id=current_user.id,
         )
@@ -160,13 +185,14 @@ def reboot_server(
 
 
 @router.post("/{server_id}/reset", response_model=ServerRead)
-def reset_server(
+@without_unit_of_work
+async def reset_server(
     server_id: UUID,
     current_user = Depends(get_current_user),
     control: ControlServerPower = Depends(get_server_power_control),
 ):
     try:
-        server = control.reset(
+        server = await control.reset(
             server_id,
             user_id=current_user.id,
         )
@@ -177,13 +203,14 @@ def reset_server(
 
 
 @router.post("/{server_id}/shutdown", response_model=ServerRead)
-def shutdown_server(
+@without_unit_of_work
+async def shutdown_server(
     server_id: UUID,
     current_user = Depends(get_current_user),
     control: ControlServerPower = Depends(get_server_power_control),
 ):
     try:
-        server = control.shutdown(
+        server = await control.shutdown(
             server_id,
             user_id=current_user.id,
         )
@@ -194,13 +221,14 @@ def shutdown_server(
 
 
 @router.post("/{server_id}/suspend", response_model=ServerRead)
-def suspend_server(
+@without_unit_of_work
+async def suspend_server(
     server_id: UUID,
     current_user = Depends(get_current_user),
     control: ControlServerPower = Depends(get_server_power_control),
 ):
     try:
-        server = control.suspend(
+        server = await control.suspend(
             server_id,
             user_id=current_user.id,
         )
@@ -211,13 +239,14 @@ def suspend_server(
 
 
 @router.post("/{server_id}/resume", response_model=ServerRead)
-def resume_server(
+@without_unit_of_work
+async def resume_server(
     server_id: UUID,
     current_user = Depends(get_current_user),
     control: ControlServerPower = Depends(get_server_power_control),
 ):
     try:
-        server = control.resume(
+        server = await control.resume(
             server_id,
             user_id=current_user.id,
         )
@@ -247,14 +276,15 @@ def extend_server(
 
 
 @router.post("/{server_id}/upgrade", response_model=ServerRead)
-def upgrade_server(
+@without_unit_of_work
+async def upgrade_server(
     server_id: UUID,
     payload: ServerUpgradeRequest,
     current_user = Depends(get_current_user),
     upgrader = Depends(get_server_upgrade),
 ):
     try:
-        server = upgrader.apply(
+        server = await upgrader.apply(
             server_id,
             upgrade_name=payload.upgrade,
             user_id=current_user.id,
@@ -266,13 +296,14 @@ def upgrade_server(
 
 
 @router.post("/{server_id}/password/reset", response_model=ServerRead)
-def reset_password(
+@without_unit_of_work
+async def reset_password(
     server_id: UUID,
     current_user = Depends(get_current_user),
     resetter: ResetServerPassword = Depends(get_password_resetter),
 ):
     try:
-        server, password = resetter.reset(
+        server, password = await resetter.reset(
             server_id,
             user_id=current_user.id,
         )
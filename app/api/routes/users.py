@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
-from app.api.dependencies import get_user_registration, get_user_repository
+from app.api.dependencies import (
+    PageParams,
+    UnitOfWorkRoute,
+    get_page_params,
+    get_user_registration,
+    get_user_repository,
+)
 from app.infrastructure.repositories.user_repository import UserRepository
 from app.interfaces.schemas import UserCreate, UserRead
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=UnitOfWorkRoute)
 
 
 @router.post("", response_model=UserRead)
@@ -21,5 +27,11 @@ def register_user(
 
 
 @router.get("", response_model=list[UserRead])
-def list_users(user_repo: UserRepository = Depends(get_user_repository)):
-    return [UserRead.from_entity(user) for user in user_repo.list()]
+def list_users(
+    response: Response,
+    page: PageParams = Depends(get_page_params),
+    user_repo: UserRepository = Depends(get_user_repository),
+):
+    users = list(user_repo.list(after=page.after, limit=page.limit))
+    page.set_next_cursor(response, users)
+    return [UserRead.from_entity(user) for user in users]
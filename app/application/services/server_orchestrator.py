@@ -4,7 +4,12 @@ from app.domain.models.plan import PlanSpec
 from app.domain.models.proxmox_host import ProxmoxHostConfig
 from app.domain.models.server import Server, ServerStatus
 from app.domain.models.user import User
-from app.infrastructure.clients.proxmox import ProxmoxClient
+from app.application.services.vmid_allocator import VmidAllocator
+from app.infrastructure.clients.proxmox import (
+    AsyncProxmoxClient,
+    ProxmoxCreateRejected,
+    ProxmoxProvisionIncomplete,
+)
 from app.infrastructure.clients.solapi import SolapiClient
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
 from app.infrastructure.repositories.server_repository import ServerRepository
@@ -23,17 +28,20 @@ class ServerProvisionOrchestrator:
         self,
         server_repo: ServerRepository,
         proxmox_hosts: ProxmoxHostRepository,
-        proxmox_client: ProxmoxClient,
+        proxmox_client: AsyncProxmoxClient,
         solapi_client: SolapiClient,
+        vmid_allocator: VmidAllocator,
     ):
         self.server_repo = server_repo
         self.proxmox_hosts = proxmox_hosts
         self.proxmox_client = proxmox_client
         self.solapi_client = solapi_client
+        self.vmid_allocator = vmid_allocator
 
-    def provision(
+    async def provision(
         self, server: Server, user: User, plan: PlanSpec, host: ProxmoxHostConfig, vm_password: str
     ) -> None:
+        vmid: int | None = None
         try:
             server.status = ServerStatus.PROVISIONING
             self.server_repo.update(server)
@@ -46,11 +54,12 @@ class ServerProvisionOrchestrator:
                 ),
             )
 
-            external_id = self.proxmox_client.provision_server(server, plan=plan, host=host)
+            vmid = await self.vmid_allocator.allocate(host, server.id)
+            external_id = await self.proxmox_client.provision_server(server, plan=plan, host=host, vmid=vmid)
             server.external_id = external_id
 
             try:
-                self.proxmox_client.set_admin_password(
+                await self.proxmox_client.set_admin_password(
                     external_id=server.external_id,
                     host=host,
                     node=server.proxmox_node or host.node,
@@ -61,7 +70,7 @@ class ServerProvisionOrchestrator:
 
             proxmox_status = None
             try:
-                proxmox_status = self.proxmox_client.get_server_status(
+                proxmox_status = await self.proxmox_client.get_server_status(
                     external_id=server.external_id, host=host, node=server.proxmox_node or host.node
                 )
             except Exception:
@@ -86,7 +95,7 @@ class ServerProvisionOrchestrator:
             )
             raise ValueError("Provisioning timed out; please retry") from exc
         except Exception as exc:  # noqa: BLE001
-            self._rollback(server)
+            await self._rollback(server, host, vmid, exc)
             server.status = ServerStatus.FAILED
             self.server_repo.update(server)
             self.solapi_client.send_status_sms(
@@ -95,15 +104,47 @@ class ServerProvisionOrchestrator:
             )
             raise ValueError("Provisioning failed; see server status") from exc
 
-    def _rollback(self, server: Server) -> None:
-        if server.external_id and server.proxmox_host_id:
-            host = self.proxmox_hosts.get(server.proxmox_host_id)
-            if host:
-                node = server.proxmox_node or host.node
-                self.proxmox_client.destroy_server(server.external_id, host=host, node=node)
+    async def _rollback(
+        self, server: Server, host: ProxmoxHostConfig, vmid: int | None, error: Exception
+    ) -> None:
+        """Destroy what Proxmox created and settle the leased VMID.
+
+        The VMID goes back to the pool only once it is known to be free: the create call
+        was rejected before any task started, or the VM's delete task finished. An id
+        Proxmox reported as already in use is dropped from the pool. When the outcome is
+        unknown (clone task failed or timed out, delete failed) the VMID stays leased.
+        """
+
+        if isinstance(error, ProxmoxProvisionIncomplete):
+            server.external_id = error.external_id
+        vmid_free = False
+        if server.external_id:
+            vmid_free = await self._destroy(server)
+        elif isinstance(error, ProxmoxCreateRejected):
+            if error.vmid_in_use and vmid is not None:
+                self.vmid_allocator.discard(host, vmid)
+            else:
+                vmid_free = True
+        if vmid is not None and vmid_free:
+            self.vmid_allocator.release(host.id, vmid)
         server.status = ServerStatus.ROLLED_BACK
         self.server_repo.update(server)
 
+    async def _destroy(self, server: Server) -> bool:
+        """Delete the VM and wait for the delete task; return whether it is known to be gone."""
+
+        server_host = self.proxmox_hosts.get(server.proxmox_host_id) if server.proxmox_host_id else None
+        if not server_host:
+            return False
+        node = server.proxmox_node or server_host.node
+        try:
+            upid = await self.proxmox_client.destroy_server(server.external_id, host=server_host, node=node)
+            await self.proxmox_client.wait_for_task(server_host, upid, "delete")
+        except Exception:  # noqa: BLE001
+            # the VM may still exist; keep its VMID leased
+            return False
+        return True
+
     @staticmethod
     def _map_proxmox_status(status: str | None) -> ServerStatus | None:
         if not status:
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from itertools import islice
+
+from app.application.use_cases.refresh_server_status import RefreshServerStatus
+from app.domain.models.server import ServerStatus
+from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
+from app.infrastructure.repositories.server_repository import ServerRepository
+
+
+class StatusReconciler:
+    """Keeps persisted server status, resources and IPs in sync with Proxmox in the background.
+
+    One polling loop runs per registered host, so a slow or unreachable host only
+    delays its own servers. Each pass streams the host's servers ``batch_size`` at a time,
+    takes one ``/cluster/resources`` snapshot per batch, and stamps ``last_synced_at`` on
+    every server it confirmed. Guest-agent IPs are only read for running VMs that have
+    no stored IP or were not running before this pass. Hosts added or removed through
+    the admin API are picked up on the next interval.
+    """
+
+    def __init__(
+        self,
+        server_repo: ServerRepository,
+        proxmox_hosts: ProxmoxHostRepository,
+        refresher: RefreshServerStatus,
+        interval: float = 30.0,
+        batch_size: int = 500,
+    ):
+        self.server_repo = server_repo
+        self.proxmox_hosts = proxmox_hosts
+        self.refresher = refresher
+        self.interval = interval
+        self.batch_size = batch_size
+        self._supervisor: asyncio.Task | None = None
+        self._loops: dict[str, asyncio.Task] = {}
+
+    def start(self) -> None:
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.get_running_loop().create_task(self._supervise())
+
+    async def stop(self) -> None:
+        tasks = [task for task in (self._supervisor, *self._loops.values()) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._supervisor = None
+        self._loops.clear()
+
+    async def reconcile_host(self, host_id: str) -> int:
+        """Run one sync pass for a host and return how many servers it covered."""
+
+        servers = self.server_repo.iter_for_host(host_id, chunk_size=self.batch_size)
+        covered = 0
+        while batch := await asyncio.to_thread(list, islice(servers, self.batch_size)):
+            was_running = {server.id for server in batch if server.status == ServerStatus.ACTIVE}
+            await self.refresher.refresh_many(batch)
+            await self.refresher.sync_primary_ips(
+                [server for server in batch if not server.primary_ip or server.id not in was_running]
+            )
+            covered += len(batch)
+        return covered
+
+    async def _supervise(self) -> None:
+        while True:
+            host_ids = {host.id for host in self.proxmox_hosts.list()}
+            for host_id in set(self._loops) - host_ids:
+                self._loops.pop(host_id).cancel()
+            for host_id in host_ids - set(self._loops):
+                self._loops[host_id] = asyncio.get_running_loop().create_task(self._host_loop(host_id))
+            await asyncio.sleep(self.interval)
+
+    async def _host_loop(self, host_id: str) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.reconcile_host(host_id)
+            except Exception:  # noqa: BLE001
+                # keep polling; the breaker and staleness_ms surface a sick host
+                pass
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
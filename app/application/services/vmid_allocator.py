@@ -0,0 +1,114 @@
+import asyncio
+from collections.abc import Iterator
+from uuid import UUID
+
+import httpx
+
+from app.domain.models.proxmox_host import ProxmoxHostConfig
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient
+from app.infrastructure.repositories.vmid_lease_repository import VmidLeaseRepository
+from app.infrastructure.storage.sqlite import detached_context
+
+
+class VmidAllocator:
+    """Leases VMIDs from a per-host range without colliding with what already runs there.
+
+    Each host keeps a small pool of VMIDs that were checked against
+    ``/cluster/resources`` and reserved in ``vmid_leases``. Allocating is a conditional
+    UPDATE on that pool, so the hot path needs no Proxmox round trip; the pool is
+    topped up in the background once it runs low. Topping up also returns the VMIDs
+    of deleted servers to the pool, once the cluster no longer shows them.
+    """
+
+    def __init__(
+        self,
+        leases: VmidLeaseRepository,
+        proxmox_client: AsyncProxmoxClient,
+        pool_size: int = 8,
+        default_range: tuple[int, int] = (10_000, 999_999),
+    ):
+        self.leases = leases
+        self.proxmox_client = proxmox_client
+        self.pool_size = pool_size
+        self.default_range = default_range
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._background: set[asyncio.Task] = set()
+
+    async def allocate(self, host: ProxmoxHostConfig, server_id: UUID) -> int:
+        vmid = self.leases.claim(host.id, server_id)
+        if vmid is None:
+            await self.replenish(host)
+            vmid = self.leases.claim(host.id, server_id)
+            if vmid is None:
+                raise ValueError(f"No free VMID left in the range of Proxmox host '{host.id}'")
+        elif self.leases.reserved_count(host.id) <= self.pool_size // 2:
+            self._replenish_later(host)
+        return vmid
+
+    def release(self, host_id: str, vmid: int) -> None:
+        """Return a VMID that is known to be free on the cluster to the pool."""
+
+        self.leases.release(host_id, vmid)
+
+    def discard(self, host: ProxmoxHostConfig, vmid: int) -> None:
+        """Drop a VMID that Proxmox reported as already in use and top the pool up in the background."""
+
+        self.leases.discard(host.id, vmid)
+        self._replenish_later(host)
+
+    async def replenish(self, host: ProxmoxHostConfig) -> int:
+        """Reconcile the pool with the cluster and top it up; return how many VMIDs were added."""
+
+        async with self._lock(host.id):
+            in_use = await self.proxmox_client.get_cluster_vmids(host)
+            self.leases.discard_reserved(host.id, in_use & self.leases.reserved_vmids(host.id))
+            self.leases.release_orphaned(host.id, in_use)
+
+            missing = self.pool_size - self.leases.reserved_count(host.id)
+            if missing <= 0:
+                return 0
+
+            start, end = self._range(host)
+            try:
+                hint = await self.proxmox_client.get_next_vmid(host)
+            except httpx.HTTPError:
+                hint = start
+            taken = in_use | self.leases.known_vmids(host.id)
+            candidates = []
+            for vmid in self._scan(start, end, hint):
+                if vmid not in taken:
+                    candidates.append(vmid)
+                    if len(candidates) == missing:
+                        break
+            return self.leases.reserve(host.id, candidates)
+
+    def _range(self, host: ProxmoxHostConfig) -> tuple[int, int]:
+        return host.vmid_range_start or self.default_range[0], host.vmid_range_end or self.default_range[1]
+
+    @staticmethod
+    def _scan(start: int, end: int, hint: int) -> Iterator[int]:
+        """Walk the range from Proxmox's next free id upwards, then wrap around to the start."""
+
+        first = hint if start <= hint <= end else start
+        yield from range(first, end + 1)
+        yield from range(start, first)
+
+    def _lock(self, host_id: str) -> asyncio.Lock:
+        lock = self._locks.get(host_id)
+        if lock is None:
+            lock = self._locks[host_id] = asyncio.Lock()
+        return lock
+
+    def _replenish_later(self, host: ProxmoxHostConfig) -> None:
+        if self._lock(host.id).locked():
+            return None
+        task = asyncio.get_running_loop().create_task(self._replenish_quietly(host), context=detached_context())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _replenish_quietly(self, host: ProxmoxHostConfig) -> None:
+        try:
+            await self.replenish(host)
+        except httpx.HTTPError:
+            # the next allocation that finds the pool empty retries in the foreground
+            pass
@@ -1,9 +1,9 @@
 from uuid import UUID
 
-from uuid import UUID
-
+from app.domain.models.proxmox_host import ProxmoxHostConfig
 from app.domain.models.server import Server, ServerStatus
-from app.infrastructure.clients.proxmox import ProxmoxClient
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient
+from app.infrastructure.clients.proxmox_tasks import ProxmoxTaskError, ProxmoxTaskTimeout
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
 from app.infrastructure.repositories.server_repository import ServerRepository
 
@@ -15,85 +15,100 @@ class ControlServerPower:
         self,
         server_repo: ServerRepository,
         proxmox_hosts: ProxmoxHostRepository,
-        proxmox_client: ProxmoxClient,
+        proxmox_client: AsyncProxmoxClient,
     ):
         self.server_repo = server_repo
         self.proxmox_hosts = proxmox_hosts
         self.proxmox_client = proxmox_client
 
-    def start(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
+    async def start(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
         server, host, node = self._resolve_server(server_id, user_id=user_id, allow_admin=allow_admin)
         if not server.external_id:
             raise ValueError("Server has no Proxmox external_id; cannot start")
 
-        self.proxmox_client.start_server(server.external_id, host=host, node=node)
+        upid = await self.proxmox_client.start_server(server.external_id, host=host, node=node)
+        await self._wait(host, upid, "power")
         server.status = ServerStatus.ACTIVE
         self.server_repo.update(server)
         return server
 
-    def stop(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
+    async def stop(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
         server, host, node = self._resolve_server(server_id, user_id=user_id, allow_admin=allow_admin)
         if not server.external_id:
             raise ValueError("Server has no Proxmox external_id; cannot stop")
 
-        self.proxmox_client.stop_server(server.external_id, host=host, node=node)
+        upid = await self.proxmox_client.stop_server(server.external_id, host=host, node=node)
+        await self._wait(host, upid, "power")
         server.status = ServerStatus.STOPPED
         self.server_repo.update(server)
         return server
 
-    def reboot(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
+    async def reboot(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
         server, host, node = self._resolve_server(server_id, user_id=user_id, allow_admin=allow_admin)
         if not server.external_id:
             raise ValueError("Server has no Proxmox external_id; cannot reboot")
 
-        self.proxmox_client.reboot_server(server.external_id, host=host, node=node)
+        upid = await self.proxmox_client.reboot_server(server.external_id, host=host, node=node)
+        await self._wait(host, upid, "power")
         server.status = ServerStatus.ACTIVE
         self.server_repo.update(server)
         return server
 
-    def reset(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
+    async def reset(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
         server, host, node = self._resolve_server(server_id, user_id=user_id, allow_admin=allow_admin)
         if not server.external_id:
             raise ValueError("Server has no Proxmox external_id; cannot reset")
 
-        self.proxmox_client.reset_server(server.external_id, host=host, node=node)
+        upid = await self.proxmox_client.reset_server(server.external_id, host=host, node=node)
+        await self._wait(host, upid, "power")
         server.status = ServerStatus.ACTIVE
         self.server_repo.update(server)
         return server
 
-    def shutdown(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
+    async def shutdown(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
         server, host, node = self._resolve_server(server_id, user_id=user_id, allow_admin=allow_admin)
         if not server.external_id:
             raise ValueError("Server has no Proxmox external_id; cannot shutdown")
 
-        self.proxmox_client.shutdown_server(server.external_id, host=host, node=node)
+        upid = await self.proxmox_client.shutdown_server(server.external_id, host=host, node=node)
+        await self._wait(host, upid, "shutdown")
         server.status = ServerStatus.STOPPED
         self.server_repo.update(server)
         return server
 
-    def suspend(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
+    async def suspend(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
         server, host, node = self._resolve_server(server_id, user_id=user_id, allow_admin=allow_admin)
         if not server.external_id:
             raise ValueError("Server has no Proxmox external_id; cannot suspend")
 
-        self.proxmox_client.suspend_server(server.external_id, host=host, node=node)
+        upid = await self.proxmox_client.suspend_server(server.external_id, host=host, node=node)
+        await self._wait(host, upid, "power")
         server.status = ServerStatus.STOPPED
         self.server_repo.update(server)
         return server
 
-    def resume(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
+    async def resume(self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False) -> Server:
         server, host, node = self._resolve_server(server_id, user_id=user_id, allow_admin=allow_admin)
         if not server.external_id:
             raise ValueError("Server has no Proxmox external_id; cannot resume")
 
-        self.proxmox_client.resume_server(server.external_id, host=host, node=node)
+        upid = await self.proxmox_client.resume_server(server.external_id, host=host, node=node)
+        await self._wait(host, upid, "power")
         server.status = ServerStatus.ACTIVE
         self.server_repo.update(server)
         return server
 
+    async def _wait(self, host: ProxmoxHostConfig, upid: str | None, operation: str) -> None:
+        """Only record the new status once Proxmox reports the power task as finished."""
+
+        try:
+            await self.proxmox_client.wait_for_task(host, upid, operation)
+        except (ProxmoxTaskError, ProxmoxTaskTimeout) as exc:
+            raise ValueError(str(exc)) from exc
+
     def _resolve_server(
         self, server_id: UUID, user_id: UUID | None = None, allow_admin: bool = False
-    ) -> tuple[Server, "ProxmoxHostConfig", str]:
+    ) -> tuple[Server, ProxmoxHostConfig, str]:
         if user_id is None and not allow_admin:
             raise ValueError("User id is required for power controls")
 
@@ -1,10 +1,14 @@
 from datetime import datetime
 
+from app.domain.models.server import ServerStatus
 from app.infrastructure.clients.solapi import SolapiClient
 from app.infrastructure.repositories.server_repository import ServerRepository
 from app.infrastructure.repositories.user_repository import UserRepository
 
 
+NOTIFIABLE_STATUSES = tuple(status for status in ServerStatus if status != ServerStatus.ROLLED_BACK)
+
+
 class NotifyExpiringServers:
     """Send SOLAPI alerts for servers approaching expiration."""
 
@@ -14,15 +18,20 @@ class NotifyExpiringServers:
         user_repo: UserRepository,
         solapi_client: SolapiClient,
         warning_days: int,
+        batch_size: int = 500,
     ):
         self.server_repo = server_repo
         self.user_repo = user_repo
         self.solapi_client = solapi_client
         self.warning_days = warning_days
+        self.batch_size = batch_size
 
     def notify(self) -> None:
         now = datetime.utcnow()
-        expiring = self.server_repo.list_expiring_within(now, self.warning_days)
+        expiring = self.server_repo.iter_expiring_within(
+            now, self.warning_days, statuses=NOTIFIABLE_STATUSES, chunk_size=self.batch_size
+        )
+        notified = []
         for server in expiring:
             if server.expire_at is None:
                 continue
@@ -43,4 +52,8 @@ class NotifyExpiringServers:
                 ),
             )
             server.last_notified_at = now
-            self.server_repo.update(server)
+            notified.append(server)
+            if len(notified) >= self.batch_size:
+                self.server_repo.update_many(notified)
+                notified = []
+        self.server_repo.update_many(notified)
@@ -27,7 +27,7 @@ class ProvisionServer:
         self.policy = policy
         self.orchestrator = orchestrator
 
-    def execute(
+    async def execute(
         self, user_id: UUID, plan: str, location: str, expire_in_days: int | None = None
     ) -> tuple[Server, str]:
         user = self.user_repo.get(user_id)
@@ -54,7 +54,7 @@ class ProvisionServer:
             vm_password=password,
         )
         self.server_repo.add(server)
-        self.orchestrator.provision(server, user, plan_spec, host, vm_password=password)
+        await self.orchestrator.provision(server, user, plan_spec, host, vm_password=password)
         server.vm_password = password
         return server, password
 
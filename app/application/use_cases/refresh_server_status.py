@@ -1,44 +1,234 @@
+import asyncio
+from datetime import datetime
 from uuid import UUID
 
 from app.domain.models.server import Server, ServerStatus
-from app.infrastructure.clients.proxmox import ProxmoxClient
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient, ProxmoxVmSnapshot
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
 from app.infrastructure.repositories.server_repository import ServerRepository
+from app.infrastructure.storage.sqlite import detached_context
+
+
+# With ``max_age``, rows older than this share of it are served but revalidated in the background.
+REVALIDATE_AFTER_FRACTION = 0.5
 
 
 class RefreshServerStatus:
-    """Sync server status from Proxmox when servers are retrieved."""
+    """Sync server status from Proxmox when servers are retrieved.
+
+    Repository calls run in a worker thread (``asyncio.to_thread``), so a SQLite write
+    waiting on the busy timeout never stalls the event loop.
+    """
 
     def __init__(
         self,
         server_repo: ServerRepository,
         proxmox_hosts: ProxmoxHostRepository,
-        proxmox_client: ProxmoxClient,
+        proxmox_client: AsyncProxmoxClient,
+        per_host_concurrency: int = 8,
+        deadline: float | None = 5.0,
     ):
         self.server_repo = server_repo
         self.proxmox_hosts = proxmox_hosts
         self.proxmox_client = proxmox_client
+        self.per_host_concurrency = per_host_concurrency
+        self.deadline = deadline
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+        self._revalidating: set[UUID] = set()
+        self._background: set[asyncio.Task] = set()
 
-    def refresh_by_id(self, server_id: UUID) -> Server | None:
-        server = self.server_repo.get(server_id)
+    async def refresh_by_id(self, server_id: UUID) -> Server | None:
+        server = await asyncio.to_thread(self.server_repo.get, server_id)
         if not server:
             return None
-        return self._refresh(server)
+        return await self._refresh(server)
 
-    def refresh_owned(self, server_id: UUID, user_id: UUID) -> Server | None:
-        server = self.server_repo.get(server_id)
+    async def refresh_owned(self, server_id: UUID, user_id: UUID) -> Server | None:
+        server = await asyncio.to_thread(self.server_repo.get, server_id)
         if not server or server.owner_id != user_id:
             return None
-        return self._refresh(server)
+        return await self._refresh(server)
+
+    async def refresh_for_user(self, user_id: UUID) -> list[Server]:
+        servers = await asyncio.to_thread(self.server_repo.list_for_user, user_id)
+        return await self.refresh_many(servers)
+
+    async def refresh_entity(self, server: Server) -> Server:
+        return await self._refresh(server)
+
+    async def ensure_fresh(self, servers: list[Server], max_age: float | None) -> list[Server]:
+        """Stale-while-revalidate for reads: refresh only what is older than ``max_age`` seconds.
+
+        ``None`` serves the stored copy as is and ``0`` refreshes everything. Rows past
+        ``max_age`` are refreshed before returning. Younger rows past
+        ``REVALIDATE_AFTER_FRACTION`` of it are returned as stored and refreshed in the
+        background, so the next poll finds them fresh.
+        """
+
+        if max_age is None:
+            return servers
+
+        now = datetime.utcnow()
+        expired: list[Server] = []
+        aging: list[Server] = []
+        for server in servers:
+            if not server.external_id or not server.proxmox_host_id:
+                continue
+            age = (now - server.last_synced_at).total_seconds() if server.last_synced_at else None
+            if age is None or age >= max_age:
+                expired.append(server)
+            elif age >= max_age * REVALIDATE_AFTER_FRACTION:
+                aging.append(server)
+
+        if len(expired) == 1 and len(servers) == 1:
+            # a detail view also wants the guest-agent IP
+            await self.refresh_parallel(expired, deadline=self.deadline)
+        elif expired:
+            await self.refresh_many(expired, deadline=self.deadline)
+        if aging:
+            self._revalidate_later(aging)
+        return servers
+
+    def _revalidate_later(self, servers: list[Server]) -> None:
+        pending = [server for server in servers if server.id not in self._revalidating]
+        if not pending:
+            return None
+        self._revalidating.update(server.id for server in pending)
+        task = asyncio.get_running_loop().create_task(self._revalidate(pending), context=detached_context())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _revalidate(self, servers: list[Server]) -> None:
+        try:
+            await self.refresh_many(servers)
+        except Exception:  # noqa: BLE001
+            pass
+        finally:
+            self._revalidating.difference_update(server.id for server in servers)
+
+    async def refresh_parallel(self, servers: list[Server], deadline: float | None = None) -> list[Server]:
+        """Fully refresh each server (status, config, IP) concurrently within ``deadline`` seconds.
+
+        Calls to one Proxmox host are capped at ``per_host_concurrency``. Refreshes still
+        running at the deadline keep going in the background and their servers are
+        returned as stored with ``stale`` set, as are servers whose host failed.
+        """
+
+        before = {server.id: server.last_synced_at for server in servers}
+        # detached: a refresh may outlive the request, so it must not write through its unit of work
+        loop = asyncio.get_running_loop()
+        tasks = [loop.create_task(self._refresh(server), context=detached_context()) for server in servers]
+        if not tasks:
+            return servers
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        for server, task in zip(servers, tasks):
+            server.stale = task in pending or server.last_synced_at == before[server.id]
+        return servers
+
+    async def refresh_many(self, servers: list[Server], deadline: float | None = None) -> list[Server]:
+        """Refresh a listing from one ``/cluster/resources`` snapshot per Proxmox host.
+
+        The snapshot carries status and cpu/memory/disk but no guest-agent IP, so
+        ``primary_ip`` keeps its persisted value here. Hosts that do not answer within
+        ``deadline`` seconds leave their servers as stored, flagged ``stale``.
+        """
+
+        host_ids = sorted(
+            {server.proxmox_host_id for server in servers if server.external_id and server.proxmox_host_id}
+        )
+        snapshots = await asyncio.gather(*(self._host_snapshot(host_id, deadline) for host_id in host_ids))
+        by_host = dict(zip(host_ids, snapshots))
+
+        synced_at = datetime.utcnow()
+        changed_servers, unchanged = [], []
+        for server in servers:
+            snapshot = (by_host.get(server.proxmox_host_id) or {}).get(server.external_id or "")
+            if not snapshot:
+                server.stale = bool(server.external_id and server.proxmox_host_id)
+                continue
+            server.stale = False
+            changed = self._apply_snapshot(server, snapshot)
+            server.last_synced_at = synced_at
+            if changed:
+                changed_servers.append(server)
+            else:
+                unchanged.append(server.id)
+        await asyncio.to_thread(self.server_repo.update_many, changed_servers)
+        await asyncio.to_thread(self.server_repo.mark_synced, unchanged, synced_at)
+        return servers
+
+    async def sync_primary_ips(self, servers: list[Server]) -> None:
+        """Read guest-agent IPs for running servers within the per-host concurrency cap."""
+
+        async def sync(server: Server) -> Server | None:
+            host = self.proxmox_hosts.get(server.proxmox_host_id) if server.proxmox_host_id else None
+            if not host or not server.external_id:
+                return None
+            async with self._host_slot(host.id):
+                primary_ip = await self.proxmox_client.get_primary_ip(
+                    external_id=server.external_id, host=host, node=server.proxmox_node or host.node
+                )
+            if primary_ip and primary_ip != server.primary_ip:
+                server.primary_ip = primary_ip
+                return server
+            return None
 
-    def refresh_for_user(self, user_id: UUID) -> list[Server]:
-        servers = list(self.server_repo.list_for_user(user_id))
-        return [self._refresh(server) for server in servers]
+        results = await asyncio.gather(
+            *(sync(server) for server in servers if server.status == ServerStatus.ACTIVE), return_exceptions=True
+        )
+        # one group commit for the whole pass; a failed lookup only skips its own server
+        changed = [result for result in results if isinstance(result, Server)]
+        await asyncio.to_thread(self.server_repo.update_many, changed)
 
-    def refresh_entity(self, server: Server) -> Server:
-        return self._refresh(server)
+    def _host_slot(self, host_id: str) -> asyncio.Semaphore:
+        slot = self._host_slots.get(host_id)
+        if slot is None:
+            slot = self._host_slots[host_id] = asyncio.Semaphore(self.per_host_concurrency)
+        return slot
 
-    def _refresh(self, server: Server) -> Server:
+    async def _host_snapshot(
+        self, host_id: str, deadline: float | None = None
+    ) -> dict[str, ProxmoxVmSnapshot] | None:
+        host = self.proxmox_hosts.get(host_id)
+        if not host:
+            return None
+
+        async def fetch() -> dict[str, ProxmoxVmSnapshot]:
+            # waiting for a slot counts against the deadline too
+            async with self._host_slot(host_id):
+                return await self.proxmox_client.get_cluster_resources(host)
+
+        try:
+            return await asyncio.wait_for(fetch(), deadline)
+        except Exception:  # noqa: BLE001
+            return None
+
+    @classmethod
+    def _apply_snapshot(cls, server: Server, snapshot: ProxmoxVmSnapshot) -> bool:
+        changed = False
+        mapped = cls._map_proxmox_status(snapshot.status)
+        if mapped and mapped != server.status:
+            server.status = mapped
+            changed = True
+        if snapshot.node and server.proxmox_node and snapshot.node != server.proxmox_node:
+            # VM was migrated inside the cluster
+            server.proxmox_node = snapshot.node
+            changed = True
+        if snapshot.vcpu and snapshot.vcpu != server.vcpu:
+            server.vcpu = snapshot.vcpu
+            changed = True
+        if snapshot.memory_mb and snapshot.memory_mb != server.memory_mb:
+            server.memory_mb = snapshot.memory_mb
+            changed = True
+        if snapshot.disk_gb and snapshot.disk_gb != server.disk_gb:
+            server.disk_gb = snapshot.disk_gb
+            changed = True
+        return changed
+
+    async def _refresh(self, server: Server) -> Server:
         if not server.external_id or not server.proxmox_host_id:
             return server
 
@@ -50,18 +240,23 @@ class RefreshServerStatus:
         if not node:
             return server
 
-        try:
-            proxmox_status = self.proxmox_client.get_server_status(
-                external_id=server.external_id, host=host, node=node
-            )
-            proxmox_config = self.proxmox_client.get_server_config(
-                external_id=server.external_id, host=host, node=node
-            )
-        except Exception:  # noqa: BLE001
+        async def limited(read):
+            async with self._host_slot(host.id):
+                return await read(external_id=server.external_id, host=host, node=node)
+
+        status_result, config_result, ip_result = await asyncio.gather(
+            limited(self.proxmox_client.get_server_status),
+            limited(self.proxmox_client.get_server_config),
+            limited(self.proxmox_client.get_primary_ip),
+            return_exceptions=True,
+        )
+        if isinstance(status_result, BaseException) or isinstance(config_result, BaseException):
             return server
+        proxmox_status, proxmox_config = status_result, config_result
 
         mapped = self._map_proxmox_status(proxmox_status)
         updated = False
+        server.last_synced_at = datetime.utcnow()
         if mapped and mapped != server.status:
             server.status = mapped
             updated = True
@@ -69,21 +264,19 @@ class RefreshServerStatus:
         if proxmox_config:
             updated = self._sync_config(server, proxmox_config) or updated
 
-        try:
-            primary_ip = self.proxmox_client.get_primary_ip(
-                external_id=server.external_id, host=host, node=node
-            )
-            if not primary_ip:
-                primary_ip = self._parse_ip_from_config(proxmox_config)
-            if primary_ip and primary_ip != server.primary_ip:
-                server.primary_ip = primary_ip
-                updated = True
-        except Exception:  # noqa: BLE001
-            pass
+        primary_ip = None if isinstance(ip_result, BaseException) else ip_result
+        if not primary_ip:
+            primary_ip = self._parse_ip_from_config(proxmox_config)
+        if primary_ip and primary_ip != server.primary_ip:
+            server.primary_ip = primary_ip
+            updated = True
 
         if updated:
-            self.server_repo.update(server)
-            server.applied_upgrades = self.server_repo.list_upgrades_for_server(server.id)
+            await asyncio.to_thread(self.server_repo.update_synced_state, server)
+            upgrades = await asyncio.to_thread(self.server_repo.list_upgrades_for_server, server.id)
+            server.applied_upgrades = upgrades
+        else:
+            await asyncio.to_thread(self.server_repo.mark_synced, [server.id], server.last_synced_at)
         return server
 
     @staticmethod
@@ -1,7 +1,7 @@
 import secrets
 from uuid import UUID
 
-from app.infrastructure.clients.proxmox import ProxmoxClient
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
 from app.infrastructure.repositories.server_repository import ServerRepository
 from app.domain.models.server import Server
@@ -14,13 +14,13 @@ class ResetServerPassword:
         self,
         server_repo: ServerRepository,
         proxmox_hosts: ProxmoxHostRepository,
-        proxmox_client: ProxmoxClient,
+        proxmox_client: AsyncProxmoxClient,
     ):
         self.server_repo = server_repo
         self.proxmox_hosts = proxmox_hosts
         self.proxmox_client = proxmox_client
 
-    def reset(self, server_id: UUID, user_id: UUID | None, allow_admin: bool = False) -> tuple[Server, str]:
+    async def reset(self, server_id: UUID, user_id: UUID | None, allow_admin: bool = False) -> tuple[Server, str]:
         server = self.server_repo.get(server_id)
         if not server:
             raise ValueError("Server not found")
@@ -38,7 +38,7 @@ class ResetServerPassword:
             raise ValueError("Proxmox node not available for server")
 
         new_password = self._generate_password()
-        self.proxmox_client.set_admin_password(
+        await self.proxmox_client.set_admin_password(
             external_id=server.external_id,
             host=host,
             node=node,
@@ -1,54 +1,92 @@
+import asyncio
 from datetime import datetime
-from typing import Iterable
 
 from app.domain.models.server import Server, ServerStatus
-from app.infrastructure.clients.proxmox import ProxmoxClient
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
 from app.infrastructure.repositories.server_repository import ServerRepository
 
 
+# stopped and rolled-back servers have nothing left to stop. FAILED comes first: the
+# expiry scan pages status by status, and a server whose stop fails moves to FAILED,
+# which must already have been scanned or it would be stopped twice in one run.
+STOPPABLE_STATUSES = (ServerStatus.FAILED, ServerStatus.PENDING, ServerStatus.PROVISIONING, ServerStatus.ACTIVE)
+
+
 class StopExpiredServers:
-    """Stops servers whose expiration has passed."""
+    """Stops servers whose expiration has passed.
+
+    Each batch of expired servers is stopped concurrently: at most
+    ``per_host_concurrency`` stop calls per Proxmox host are in flight, and the
+    resulting tasks are awaited together on the client's shared task watcher.
+    """
 
     def __init__(
         self,
         server_repo: ServerRepository,
         proxmox_hosts: ProxmoxHostRepository,
-        proxmox_client: ProxmoxClient,
+        proxmox_client: AsyncProxmoxClient,
+        batch_size: int = 500,
+        per_host_concurrency: int = 8,
     ):
         self.server_repo = server_repo
         self.proxmox_hosts = proxmox_hosts
         self.proxmox_client = proxmox_client
+        self.batch_size = batch_size
+        self.per_host_concurrency = per_host_concurrency
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    async def stop_expired(self, now: datetime | None = None) -> int:
+        """Stop every expired server and return how many were processed.
+
+        Expired servers are streamed from the repository ``batch_size`` at a time; each
+        batch is stopped concurrently and its new statuses persisted in one group
+        commit, so memory stays flat however many servers expire at once.
+        """
 
-    def stop_expired(self, now: datetime | None = None) -> Iterable[Server]:
         now = now or datetime.utcnow()
-        expired = self.server_repo.list_expired(now)
-        updated: list[Server] = []
+        stopped = 0
+        pending: list[Server] = []
+
+        for server in self.server_repo.iter_expired(now, statuses=STOPPABLE_STATUSES, chunk_size=self.batch_size):
+            pending.append(server)
+            if len(pending) >= self.batch_size:
+                stopped += await self._stop_batch(pending)
+                pending = []
 
-        for server in expired:
-            updated.append(self._stop_server(server))
+        return stopped + await self._stop_batch(pending)
 
-        return updated
+    async def _stop_batch(self, servers: list[Server]) -> int:
+        await asyncio.gather(*(self._stop_server(server) for server in servers))
+        self.server_repo.update_many(servers)
+        return len(servers)
+
+    async def _stop_server(self, server: Server) -> Server:
+        """Stop one VM and set its new status; the caller persists it."""
 
-    def _stop_server(self, server: Server) -> Server:
         try:
             if not server.proxmox_host_id or not server.external_id:
                 server.status = ServerStatus.STOPPED
-                self.server_repo.update(server)
                 return server
 
             host = self.proxmox_hosts.get(server.proxmox_host_id)
             node = server.proxmox_node or (host.node if host else None)
             if not host or not node:
                 server.status = ServerStatus.FAILED
-                self.server_repo.update(server)
                 return server
 
-            self.proxmox_client.stop_server(server.external_id, host=host, node=node)
+            # only issuing the stop is capped; the task itself is awaited outside the slot
+            async with self._host_slot(host.id):
+                upid = await self.proxmox_client.stop_server(server.external_id, host=host, node=node)
+            await self.proxmox_client.wait_for_task(host, upid, "power")
             server.status = ServerStatus.STOPPED
-            self.server_repo.update(server)
             return server
         except Exception:
             server.status = ServerStatus.FAILED
-            self.server_repo.update(server)
             return server
+
+    def _host_slot(self, host_id: str) -> asyncio.Semaphore:
+        slot = self._host_slots.get(host_id)
+        if slot is None:
+            slot = self._host_slots[host_id] = asyncio.Semaphore(self.per_host_concurrency)
+        return slot
@@ -1,7 +1,8 @@
 from uuid import UUID
 
-from app.domain.models.server import ServerStatus
-from app.infrastructure.clients.proxmox import ProxmoxClient
+from app.domain.models.server import Server, ServerStatus
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient
+from app.infrastructure.clients.proxmox_tasks import ProxmoxTaskError, ProxmoxTaskTimeout
 from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
 from app.infrastructure.repositories.server_repository import ServerRepository
 from app.infrastructure.repositories.upgrade_repository import UpgradeRepository
@@ -15,16 +16,16 @@ class UpgradeServerResources:
         server_repo: ServerRepository,
         upgrade_repo: UpgradeRepository,
         proxmox_hosts: ProxmoxHostRepository,
-        proxmox_client: ProxmoxClient,
+        proxmox_client: AsyncProxmoxClient,
     ):
         self.server_repo = server_repo
         self.upgrade_repo = upgrade_repo
         self.proxmox_hosts = proxmox_hosts
         self.proxmox_client = proxmox_client
 
-    def apply(
+    async def apply(
         self, server_id: UUID, upgrade_name: str, user_id: UUID | None, allow_admin: bool = False
-    ) -> "Server":
+    ) -> Server:
         server = self.server_repo.get(server_id)
         if not server:
             raise ValueError("Server not found")
@@ -53,7 +54,7 @@ class UpgradeServerResources:
         current_status = server.status
         if server.external_id:
             try:
-                proxmox_status = self.proxmox_client.get_server_status(
+                proxmox_status = await self.proxmox_client.get_server_status(
                     external_id=server.external_id, host=host, node=node
                 )
                 if proxmox_status:
@@ -74,7 +75,7 @@ class UpgradeServerResources:
             f"{server.disk_storage or 'local-lvm'}:{int(new_disk)}" if new_disk else None
         )
 
-        self.proxmox_client.update_resources(
+        await self.proxmox_client.update_resources(
             server.external_id,
             host=host,
             node=node,
@@ -84,12 +85,16 @@ class UpgradeServerResources:
         )
 
         if upgrade.add_disk_gb:
-            self.proxmox_client.resize_disk(
+            upid = await self.proxmox_client.resize_disk(
                 server.external_id,
                 host=host,
                 node=node,
                 add_disk_gb=upgrade.add_disk_gb,
             )
+            try:
+                await self.proxmox_client.wait_for_task(host, upid, "resize")
+            except (ProxmoxTaskError, ProxmoxTaskTimeout) as exc:
+                raise ValueError(str(exc)) from exc
 
         server.vcpu = new_vcpu
         server.memory_mb = new_memory
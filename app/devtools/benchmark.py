@@ -0,0 +1,156 @@
+"""Throughput/tail-latency benchmark for provisioning and refresh against the fake Proxmox.
+
+Runs entirely in-process (temporary SQLite file + ``FakeProxmox`` over ``ASGITransport``)::
+
+    python -m app.devtools.benchmark --servers 50 --concurrency 10 --latency-ms 20 --failure-rate 0.01
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from app.application.services.server_orchestrator import ServerProvisionOrchestrator
+from app.application.services.vmid_allocator import VmidAllocator
+from app.application.use_cases.provision_server import ProvisionServer
+from app.application.use_cases.refresh_server_status import RefreshServerStatus
+from app.devtools.fake_proxmox import FakeProxmox, FakeProxmoxConfig
+from app.domain.models.plan import PlanSpec
+from app.domain.models.proxmox_host import ProxmoxHostConfig
+from app.domain.models.user import User
+from app.domain.services.provisioning_policy import ProvisioningPolicy
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient
+from app.infrastructure.clients.solapi import SolapiClient
+from app.infrastructure.repositories.plan_repository import PlanRepository
+from app.infrastructure.repositories.proxmox_host_repository import ProxmoxHostRepository
+from app.infrastructure.repositories.server_repository import ServerRepository
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.repositories.vmid_lease_repository import VmidLeaseRepository
+from app.infrastructure.storage.sqlite import SQLAlchemyDataStore
+
+FAKE_API_URL = "http://fake-pve"
+
+
+def _summary(name: str, latencies: list[float], failures: int, elapsed: float) -> str:
+    if not latencies:
+        return f"{name}: no successful calls ({failures} failed)"
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return ordered[min(int(p * len(ordered)), len(ordered) - 1)] * 1000
+
+    return (
+        f"{name}: {len(latencies)} ok, {failures} failed, {len(latencies) / elapsed:.1f}/s, "
+        f"p50 {pct(0.50):.0f}ms p95 {pct(0.95):.0f}ms p99 {pct(0.99):.0f}ms "
+        f"max {ordered[-1] * 1000:.0f}ms mean {statistics.mean(ordered) * 1000:.0f}ms"
+    )
+
+
+async def _run(
+    name: str, count: int, concurrency: int, call: Callable[[int], Awaitable[object]]
+) -> tuple[list[float], int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failures = 0
+
+    async def one(index: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(index)
+            except Exception:  # noqa: BLE001
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(count)))
+    print(_summary(name, latencies, failures, time.perf_counter() - started))
+    return latencies, failures
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = FakeProxmoxConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        vm_count=args.vm_count,
+        seed=args.seed,
+    )
+    config.task_seconds["qmclone"] = args.clone_seconds
+    config.task_seconds["default"] = args.task_seconds
+    fake = FakeProxmox(config)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLAlchemyDataStore(os.path.join(tmp, "bench.db"))
+        users, servers = UserRepository(db), ServerRepository(db)
+        plans, hosts = PlanRepository(db), ProxmoxHostRepository(db)
+        host = ProxmoxHostConfig(id="fake", api_url=FAKE_API_URL, username="root", password="bench", node="pve")
+        hosts.add(host)
+        plans.add(
+            PlanSpec(
+                name="bench",
+                vcpu=1,
+                memory_mb=1024,
+                disk_gb=20,
+                location=host.location,
+                proxmox_host_id=host.id,
+                template_vmid=config.template_vmid,
+                disk_storage="local-lvm",
+            )
+        )
+        user = User(email="bench@example.com", phone_number="01000000000")
+        users.add(user)
+
+        client = AsyncProxmoxClient(transport=httpx.ASGITransport(app=fake.app))
+        orchestrator = ServerProvisionOrchestrator(
+            server_repo=servers,
+            proxmox_hosts=hosts,
+            proxmox_client=client,
+            solapi_client=SolapiClient(),
+            vmid_allocator=VmidAllocator(VmidLeaseRepository(db), client),
+        )
+        provision = ProvisionServer(servers, users, hosts, ProvisioningPolicy(plans, hosts), orchestrator)
+        refresher = RefreshServerStatus(servers, hosts, client)
+
+        await _run(
+            "provision",
+            args.servers,
+            args.concurrency,
+            lambda _: provision.execute(user_id=user.id, plan="bench", location=host.location),
+        )
+        created = list(servers.list_for_user(user.id))
+        await _run("refresh listing", args.refresh_rounds, 1, lambda _: refresher.refresh_for_user(user.id))
+        await _run(
+            "refresh single",
+            len(created),
+            args.concurrency,
+            lambda index: refresher.refresh_entity(created[index]),
+        )
+        print("fake proxmox calls:", sum(fake.calls.values()), "by path:", len(fake.calls))
+        await client.aclose()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=20, help="servers to provision")
+    parser.add_argument("--concurrency", type=int, default=5, help="concurrent provisions/refreshes")
+    parser.add_argument("--refresh-rounds", type=int, default=10, help="listing refreshes to time")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="fake API latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="extra random latency per call")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of calls answered with 503")
+    parser.add_argument("--clone-seconds", type=float, default=1.0, help="clone task duration")
+    parser.add_argument("--task-seconds", type=float, default=0.1, help="duration of other tasks")
+    parser.add_argument("--vm-count", type=int, default=0, help="VMs already on the fake cluster")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(_parse_args()))
@@ -0,0 +1,374 @@
+"""In-memory stand-in for the Proxmox VE API used by benchmarks and local runs.
+
+Covers the endpoints ``ProxmoxClient``/``AsyncProxmoxClient`` call, with configurable
+latency, failure rate, task durations and a pre-seeded VM count. Use it in-process::
+
+    fake = FakeProxmox(FakeProxmoxConfig(latency_ms=20, failure_rate=0.01))
+    client = AsyncProxmoxClient(transport=httpx.ASGITransport(app=fake.app))
+
+or on localhost (settings are read from ``FAKE_PVE_*`` env vars)::
+
+    uvicorn app.devtools.fake_proxmox:app --port 8006
+"""
+
+import asyncio
+import os
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+API_PREFIX = "/api2/json"
+
+
+@dataclass
+class FakeProxmoxConfig:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    # share of API calls answered with a 503 (login excluded)
+    failure_rate: float = 0.0
+    # seconds until a task of the given type stops; "default" covers the rest
+    task_seconds: dict[str, float] = field(
+        default_factory=lambda: {"qmclone": 2.0, "qmcreate": 1.0, "qmdestroy": 0.5, "default": 0.2}
+    )
+    vm_count: int = 0
+    nodes: tuple[str, ...] = ("pve",)
+    template_vmid: int = 9000
+    seed: int | None = None
+
+    @classmethod
+    def from_env(cls) -> "FakeProxmoxConfig":
+        config = cls(
+            latency_ms=float(os.getenv("FAKE_PVE_LATENCY_MS", "0")),
+            latency_jitter_ms=float(os.getenv("FAKE_PVE_LATENCY_JITTER_MS", "0")),
+            failure_rate=float(os.getenv("FAKE_PVE_FAILURE_RATE", "0")),
+            vm_count=int(os.getenv("FAKE_PVE_VM_COUNT", "0")),
+        )
+        if os.getenv("FAKE_PVE_CLONE_SECONDS"):
+            config.task_seconds["qmclone"] = float(os.environ["FAKE_PVE_CLONE_SECONDS"])
+        if os.getenv("FAKE_PVE_TASK_SECONDS"):
+            config.task_seconds["default"] = float(os.environ["FAKE_PVE_TASK_SECONDS"])
+        return config
+
+
+@dataclass
+class FakeVm:
+    vmid: int
+    node: str
+    name: str
+    cores: int = 1
+    memory_mb: int = 1024
+    disk: str = "local-lvm:20"
+    status: str = "stopped"
+    template: bool = False
+    config: dict[str, str] = field(default_factory=dict)
+    # set while a clone/create task still owns the VM, like Proxmox's config lock
+    lock: str | None = None
+
+    @property
+    def disk_gb(self) -> int:
+        size = self.disk.split(",", 1)[0].rsplit(":", 1)[-1]
+        return int(size) if size.isdigit() else 0
+
+
+@dataclass
+class FakeTask:
+    upid: str
+    node: str
+    kind: str
+    vmid: int
+    finishes_at: float
+    exitstatus: str = "OK"
+    on_finish: tuple | None = None
+
+
+class FakeProxmox:
+    """State plus a FastAPI app mimicking ``/api2/json`` for one cluster."""
+
+    def __init__(self, config: FakeProxmoxConfig | None = None):
+        self.config = config or FakeProxmoxConfig()
+        self.random = random.Random(self.config.seed)
+        self.vms: dict[int, FakeVm] = {}
+        self.tasks: dict[str, FakeTask] = {}
+        self.calls: dict[str, int] = {}
+        self._tickets: set[str] = set()
+        self._seed_vms()
+        self.app = self._build_app()
+
+    # -- state -----------------------------------------------------------------
+
+    def _seed_vms(self) -> None:
+        node = self.config.nodes[0]
+        self.vms[self.config.template_vmid] = FakeVm(
+            self.config.template_vmid, node, "template", template=True
+        )
+        for index in range(self.config.vm_count):
+            vmid = 100 + index
+            self.vms[vmid] = FakeVm(
+                vmid,
+                self.config.nodes[index % len(self.config.nodes)],
+                f"seed-{vmid}",
+                status="running" if index % 3 else "stopped",
+            )
+
+    def _start_task(self, node: str, kind: str, vmid: int, on_finish: tuple | None = None) -> str:
+        started = int(time.time())
+        upid = f"UPID:{node}:{secrets.randbelow(1 << 24):08X}:{started:08X}:{started:08X}:{kind}:{vmid}:root@pam:"
+        seconds = self.config.task_seconds.get(kind, self.config.task_seconds.get("default", 0.0))
+        self.tasks[upid] = FakeTask(upid, node, kind, vmid, time.monotonic() + seconds, on_finish=on_finish)
+        return upid
+
+    def _settle_tasks(self) -> None:
+        now = time.monotonic()
+        for task in self.tasks.values():
+            if task.on_finish and task.finishes_at <= now:
+                action, vmid = task.on_finish
+                task.on_finish = None
+                vm = self.vms.get(vmid)
+                if action == "unlock" and vm:
+                    vm.lock = None
+                elif action == "destroy":
+                    self.vms.pop(vmid, None)
+
+    def _vm(self, node: str, vmid: int) -> FakeVm | None:
+        self._settle_tasks()
+        vm = self.vms.get(vmid)
+        return vm if vm and vm.node == node else None
+
+    def _next_vmid(self) -> int:
+        vmid = 100
+        while vmid in self.vms:
+            vmid += 1
+        return vmid
+
+    # -- app -------------------------------------------------------------------
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Proxmox VE")
+        fake = self
+
+        @app.middleware("http")
+        async def simulate_network(request: Request, call_next):
+            delay = fake.config.latency_ms + fake.random.uniform(0, fake.config.latency_jitter_ms)
+            if delay:
+                await asyncio.sleep(delay / 1000)
+            path = request.url.path
+            fake.calls[path] = fake.calls.get(path, 0) + 1
+            if path == f"{API_PREFIX}/access/ticket":
+                return await call_next(request)
+            if not fake._authorized(request):
+                return JSONResponse({"data": None}, status_code=401)
+            if fake.config.failure_rate and fake.random.random() < fake.config.failure_rate:
+                return JSONResponse({"data": None, "message": "injected failure"}, status_code=503)
+            return await call_next(request)
+
+        @app.post(f"{API_PREFIX}/access/ticket")
+        async def ticket(request: Request):
+            form = await _form(request)
+            if not form.get("username") or not form.get("password"):
+                return JSONResponse({"data": None}, status_code=401)
+            value = f"PVE:{form['username']}:{secrets.token_hex(8)}"
+            fake._tickets.add(value)
+            return {"data": {"ticket": value, "CSRFPreventionToken": secrets.token_hex(8), "username": form["username"]}}
+
+        @app.get(f"{API_PREFIX}/cluster/resources")
+        async def cluster_resources(type: str | None = None):
+            fake._settle_tasks()
+            return {
+                "data": [
+                    {
+                        "id": f"qemu/{vm.vmid}",
+                        "type": "qemu",
+                        "vmid": vm.vmid,
+                        "node": vm.node,
+                        "name": vm.name,
+                        "status": vm.status,
+                        "template": int(vm.template),
+                        "maxcpu": vm.cores,
+                        "maxmem": vm.memory_mb * 1024 * 1024,
+                        "maxdisk": vm.disk_gb * 1024**3,
+                    }
+                    for vm in fake.vms.values()
+                ]
+            }
+
+        @app.get(f"{API_PREFIX}/cluster/nextid")
+        async def next_id():
+            return {"data": str(fake._next_vmid())}
+
+        @app.post(f"{API_PREFIX}/nodes/{{node}}/qemu")
+        async def create_vm(node: str, request: Request):
+            form = await _form(request)
+            vmid = int(form["vmid"])
+            if vmid in fake.vms:
+                return _error(f"unable to create VM {vmid} - VM {vmid} already exists on node '{node}'")
+            fake.vms[vmid] = FakeVm(
+                vmid,
+                node,
+                form.get("name", f"vm-{vmid}"),
+                cores=int(form.get("cores", 1)),
+                memory_mb=int(form.get("memory", 1024)),
+                disk=form.get("virtio0", "local-lvm:20"),
+                lock="create",
+            )
+            return {"data": fake._start_task(node, "qmcreate", vmid, ("unlock", vmid))}
+
+        @app.post(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}/clone")
+        async def clone_vm(node: str, vmid: int, request: Request):
+            form = await _form(request)
+            source = fake._vm(node, vmid)
+            if not source:
+                return _error(f"VM {vmid} does not exist")
+            newid = int(form["newid"])
+            if newid in fake.vms:
+                return _error(f"unable to create VM {newid}: config file already exists")
+            fake.vms[newid] = FakeVm(
+                newid,
+                form.get("target") or node,
+                form.get("name", f"vm-{newid}"),
+                cores=source.cores,
+                memory_mb=source.memory_mb,
+                disk=source.disk,
+                lock="clone",
+            )
+            return {"data": fake._start_task(node, "qmclone", vmid, ("unlock", newid))}
+
+        @app.get(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}/config")
+        async def get_config(node: str, vmid: int):
+            vm = fake._vm(node, vmid)
+            if not vm:
+                return _error(f"VM {vmid} does not exist")
+            return {
+                "data": {
+                    "name": vm.name,
+                    "cores": vm.cores,
+                    "memory": vm.memory_mb,
+                    "virtio0": vm.disk,
+                    **({"lock": vm.lock} if vm.lock else {}),
+                    **vm.config,
+                }
+            }
+
+        @app.put(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}/config")
+        async def put_config(node: str, vmid: int, request: Request):
+            vm = fake._vm(node, vmid)
+            if not vm:
+                return _error(f"VM {vmid} does not exist")
+            if vm.lock:
+                return _error(f"VM is locked ({vm.lock})")
+            form = await _form(request)
+            if "cores" in form:
+                vm.cores = int(form.pop("cores"))
+            if "memory" in form:
+                vm.memory_mb = int(form.pop("memory"))
+            if "virtio0" in form:
+                vm.disk = form.pop("virtio0")
+            form.pop("cipassword", None)
+            vm.config.update(form)
+            return {"data": None}
+
+        @app.post(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}/resize")
+        @app.put(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}/resize")
+        async def resize(node: str, vmid: int, request: Request):
+            vm = fake._vm(node, vmid)
+            if not vm:
+                return _error(f"VM {vmid} does not exist")
+            form = await _form(request)
+            grow = form.get("size", "+0G").lstrip("+").rstrip("G")
+            storage = vm.disk.split(":", 1)[0]
+            vm.disk = f"{storage}:{vm.disk_gb + int(grow or 0)}"
+            return {"data": fake._start_task(node, "resize", vmid)}
+
+        @app.get(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}/status/current")
+        async def status_current(node: str, vmid: int):
+            vm = fake._vm(node, vmid)
+            if not vm:
+                return _error(f"VM {vmid} does not exist")
+            return {"data": {"vmid": vmid, "status": vm.status, "cpus": vm.cores, "maxmem": vm.memory_mb * 1024 * 1024}}
+
+        @app.post(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}/status/{{action}}")
+        async def power(node: str, vmid: int, action: str):
+            vm = fake._vm(node, vmid)
+            if not vm:
+                return _error(f"VM {vmid} does not exist")
+            if vm.lock:
+                return _error(f"VM is locked ({vm.lock})")
+            states = {"start": "running", "reboot": "running", "reset": "running", "resume": "running",
+                      "stop": "stopped", "shutdown": "stopped", "suspend": "paused"}
+            if action not in states:
+                return JSONResponse({"data": None}, status_code=501)
+            vm.status = states[action]
+            return {"data": fake._start_task(node, f"qm{action}", vmid)}
+
+        @app.get(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}/agent/network-get-interfaces")
+        async def agent_network(node: str, vmid: int):
+            vm = fake._vm(node, vmid)
+            if not vm or vm.status != "running":
+                return _error("QEMU guest agent is not running")
+            return {
+                "data": {
+                    "result": [
+                        {"name": "lo", "ip-addresses": [{"ip-address-type": "ipv4", "ip-address": "127.0.0.1"}]},
+                        {
+                            "name": "eth0",
+                            "ip-addresses": [
+                                {"ip-address-type": "ipv4", "ip-address": f"10.{vmid // 65536 % 256}.{vmid // 256 % 256}.{vmid % 256}"}
+                            ],
+                        },
+                    ]
+                }
+            }
+
+        @app.delete(f"{API_PREFIX}/nodes/{{node}}/qemu/{{vmid}}")
+        async def destroy(node: str, vmid: int):
+            vm = fake._vm(node, vmid)
+            if not vm:
+                return _error(f"VM {vmid} does not exist")
+            vm.lock = "destroyed"
+            return {"data": fake._start_task(node, "qmdestroy", vmid, ("destroy", vmid))}
+
+        @app.get(f"{API_PREFIX}/nodes/{{node}}/tasks")
+        async def list_tasks(node: str, source: str = "all"):
+            now = time.monotonic()
+            tasks = [task for task in fake.tasks.values() if task.node == node]
+            if source == "active":
+                tasks = [task for task in tasks if task.finishes_at > now]
+            return {"data": [{"upid": task.upid, "type": task.kind, "id": str(task.vmid)} for task in tasks]}
+
+        @app.get(f"{API_PREFIX}/nodes/{{node}}/tasks/{{upid}}/status")
+        async def task_status(node: str, upid: str):
+            fake._settle_tasks()
+            task = fake.tasks.get(upid)
+            if not task:
+                return _error(f"no such task '{upid}'")
+            if task.finishes_at > time.monotonic():
+                return {"data": {"upid": upid, "status": "running", "type": task.kind}}
+            return {"data": {"upid": upid, "status": "stopped", "exitstatus": task.exitstatus, "type": task.kind}}
+
+        return app
+
+    def _authorized(self, request: Request) -> bool:
+        if request.headers.get("Authorization", "").startswith("PVEAPIToken="):
+            return True
+        ticket = request.cookies.get("PVEAuthCookie")
+        if ticket not in self._tickets:
+            return False
+        if request.method != "GET" and not request.headers.get("CSRFPreventionToken"):
+            return False
+        return True
+
+
+async def _form(request: Request) -> dict[str, str]:
+    return dict(parse_qsl((await request.body()).decode()))
+
+
+def _error(message: str) -> JSONResponse:
+    # pveproxy reports API errors as 500 with the reason in the status line and body
+    return JSONResponse({"data": None, "message": message}, status_code=500)
+
+
+app = FakeProxmox(FakeProxmoxConfig.from_env()).app
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PlanSpec:
     """Represents an admin-defined hosting plan with performance presets."""
 
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True)
 class ProxmoxHostConfig:
     """Credentials and topology for a Proxmox API endpoint."""
 
@@ -12,3 +12,17 @@ class ProxmoxHostConfig:
     realm: str = "pam"
     node: str | None = None
     location: str = "kr-central"
+    token_id: str | None = None
+    token_secret: str | None = None
+    vmid_range_start: int | None = None
+    vmid_range_end: int | None = None
+
+    @property
+    def uses_api_token(self) -> bool:
+        """API tokens are stateless: no ticket login, CSRF token or refresh needed."""
+
+        return bool(self.token_id and self.token_secret)
+
+    @property
+    def user_id(self) -> str:
+        return f"{self.username}@{self.realm}" if self.realm else self.username
@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -15,7 +16,28 @@ class ServerStatus(str, Enum):
     ROLLED_BACK = "rolled_back"
 
 
-@dataclass
+# state the repository persists; change tracking compares these
+TRACKED_FIELDS = (
+    "owner_id",
+    "plan",
+    "location",
+    "proxmox_host_id",
+    "proxmox_node",
+    "vcpu",
+    "memory_mb",
+    "disk_gb",
+    "disk_storage",
+    "primary_ip",
+    "expire_in_days",
+    "status",
+    "created_at",
+    "external_id",
+    "last_notified_at",
+    "last_synced_at",
+)
+
+
+@dataclass(slots=True)
 class Server:
     """Server entity tracked in the domain."""
 
@@ -35,8 +57,28 @@ class Server:
     created_at: datetime = field(default_factory=datetime.utcnow)
     external_id: str | None = None
     last_notified_at: datetime | None = None
+    last_synced_at: datetime | None = None
     applied_upgrades: list[AppliedUpgrade] = field(default_factory=list)
     vm_password: str | None = field(default=None, repr=False, compare=False)
+    # set by a refresh that could not confirm this server with Proxmox in time
+    stale: bool = field(default=False, repr=False, compare=False)
+    # values last read from or written to storage; None until the server has been persisted
+    _persisted: dict | None = field(default=None, init=False, repr=False, compare=False)
+
+    def mark_persisted(self, fields: Iterable[str] | None = None) -> None:
+        """Record the current values of ``fields`` (default: all tracked) as what storage holds."""
+
+        if self._persisted is None or fields is None:
+            self._persisted = {name: getattr(self, name) for name in TRACKED_FIELDS}
+        else:
+            self._persisted.update((name, getattr(self, name)) for name in fields)
+
+    def changed_fields(self) -> set[str] | None:
+        """Tracked fields modified since ``mark_persisted``; ``None`` if never persisted."""
+
+        if self._persisted is None:
+            return None
+        return {name for name in TRACKED_FIELDS if getattr(self, name) != self._persisted[name]}
 
     @property
     def expire_at(self) -> datetime | None:
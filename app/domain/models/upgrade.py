@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass
+@dataclass(frozen=True)
 class UpgradeSpec:
     """Represents an upgrade bundle that can be applied to a server."""
 
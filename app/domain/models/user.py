@@ -3,7 +3,7 @@ from datetime import datetime
 from uuid import UUID, uuid4
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """Core user entity representing an account inside the platform."""
 
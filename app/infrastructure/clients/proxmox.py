@@ -1,33 +1,215 @@
-from typing import Tuple
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Tuple
 
 import httpx
 
 from app.domain.models.plan import PlanSpec
 from app.domain.models.proxmox_host import ProxmoxHostConfig
 from app.domain.models.server import Server
+from app.infrastructure.clients.proxmox_breaker import (
+    ProxmoxBreakerRegistry,
+    ProxmoxCircuitBreaker,
+    ProxmoxHostUnavailable,
+)
+from app.infrastructure.clients.proxmox_retry import NOT_SENT_ERRORS, ProxmoxRetryPolicy
+from app.infrastructure.clients.proxmox_singleflight import AsyncSingleFlight
+from app.infrastructure.clients.proxmox_tasks import (
+    DEFAULT_TIMEOUT_PROFILES,
+    ProxmoxTaskError,
+    ProxmoxTaskTimeout,
+    ProxmoxTaskWatcher,
+    TimeoutProfile,
+    task_node,
+)
 
+# Proxmox tickets are valid for two hours; renew well before that.
+TICKET_LIFETIME_SECONDS = 2 * 60 * 60
+TICKET_RENEW_AFTER_SECONDS = 60 * 60
+TICKET_EXPIRY_MARGIN_SECONDS = 5 * 60
 
-class ProxmoxClient:
-    """Thin wrapper around Proxmox HTTP API (https://pve.proxmox.com/pve-docs/api-viewer/)."""
+# pveproxy answers 500 for API-level errors (bad params, locked VM); these mean the
+# host itself is unreachable or overloaded and count against its circuit breaker.
+HOST_FAILURE_STATUS_CODES = frozenset({502, 503, 504, 595, 596, 599})
+
+
+class ProxmoxCreateRejected(RuntimeError):
+    """The create/clone call for ``vmid`` failed before Proxmox started a task.
+
+    Nothing was created, so the VMID is free again, unless Proxmox refused it because
+    a guest with that id already exists on the cluster (``vmid_in_use``).
+    """
+
+    def __init__(self, vmid: int | None, error: Exception):
+        super().__init__(f"Proxmox refused to create VM {vmid}: {error}")
+        self.vmid = vmid
+        response = getattr(error, "response", None)
+        self.vmid_in_use = response is not None and "already exists" in response.text
+
+
+class ProxmoxProvisionIncomplete(RuntimeError):
+    """The VM was created but configuring it failed; ``external_id`` still exists on the host."""
+
+    def __init__(self, external_id: str, error: Exception):
+        super().__init__(f"Proxmox VM {external_id} was created but not configured: {error}")
+        self.external_id = external_id
+
+
+@dataclass
+class ProxmoxTicket:
+    """Login ticket/CSRF pair issued by ``/access/ticket`` for one host."""
 
-    def __init__(self):
-        self.http = httpx.Client(timeout=10.0, verify=False)
+    ticket: str
+    csrf: str | None
+    fingerprint: tuple[str, str, str]
+    issued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.issued_at
+
+
+@dataclass
+class ProxmoxVmSnapshot:
+    """Per-VM runtime summary from one ``/cluster/resources?type=vm`` listing."""
+
+    vmid: str
+    node: str | None
+    status: str | None
+    vcpu: int | None
+    memory_mb: int | None
+    disk_gb: int | None
+
+
+class ProxmoxTicketCache:
+    """Thread-safe per-host cache of Proxmox tickets keyed by ``ProxmoxHostConfig.id``."""
+
+    def __init__(
+        self,
+        lifetime: float = TICKET_LIFETIME_SECONDS,
+        renew_after: float = TICKET_RENEW_AFTER_SECONDS,
+        expiry_margin: float = TICKET_EXPIRY_MARGIN_SECONDS,
+    ):
+        self.lifetime = lifetime
+        self.renew_after = renew_after
+        self.expiry_margin = expiry_margin
+        self._lock = threading.Lock()
+        self._tickets: dict[str, ProxmoxTicket] = {}
+        self._login_locks: dict[str, threading.Lock] = {}
+        self._async_login_locks: dict[str, asyncio.Lock] = {}
+        self._renewing: set[str] = set()
+
+    @staticmethod
+    def fingerprint(host: ProxmoxHostConfig) -> tuple[str, str, str]:
+        return host.api_url, host.username, host.realm
+
+    def get(self, host: ProxmoxHostConfig) -> ProxmoxTicket | None:
+        """Return a usable ticket, or ``None`` when a fresh login is required."""
+
+        with self._lock:
+            ticket = self._tickets.get(host.id)
+        if not ticket or ticket.fingerprint != self.fingerprint(host):
+            return None
+        if ticket.age >= self.lifetime - self.expiry_margin:
+            return None
+        return ticket
+
+    def store(self, host_id: str, ticket: ProxmoxTicket) -> None:
+        with self._lock:
+            self._tickets[host_id] = ticket
+
+    def invalidate(self, host_id: str, ticket: ProxmoxTicket | None = None) -> None:
+        """Drop the cached ticket, unless another caller already replaced it."""
+
+        with self._lock:
+            current = self._tickets.get(host_id)
+            if current and (ticket is None or current is ticket):
+                del self._tickets[host_id]
+
+    def login_lock(self, host_id: str) -> threading.Lock:
+        with self._lock:
+            return self._login_locks.setdefault(host_id, threading.Lock())
+
+    def async_login_lock(self, host_id: str) -> asyncio.Lock:
+        with self._lock:
+            return self._async_login_locks.setdefault(host_id, asyncio.Lock())
+
+    def should_renew(self, ticket: ProxmoxTicket) -> bool:
+        return ticket.age >= self.renew_after
+
+    def claim_renewal(self, host_id: str) -> bool:
+        """Mark a background renewal as in flight; ``False`` if one already is."""
+
+        with self._lock:
+            if host_id in self._renewing:
+                return False
+            self._renewing.add(host_id)
+            return True
+
+    def release_renewal(self, host_id: str) -> None:
+        with self._lock:
+            self._renewing.discard(host_id)
+
+
+class _ProxmoxClientBase:
+    """Request building and response parsing shared by the sync and async clients."""
+
+    def __init__(
+        self,
+        tickets: ProxmoxTicketCache | None = None,
+        timeouts: dict[str, TimeoutProfile] | None = None,
+        breakers: ProxmoxBreakerRegistry | None = None,
+        retry: ProxmoxRetryPolicy | None = None,
+    ):
+        self.tickets = tickets or ProxmoxTicketCache()
+        self.timeouts = {**DEFAULT_TIMEOUT_PROFILES, **(timeouts or {})}
+        self.breakers = breakers or ProxmoxBreakerRegistry()
+        self.retry = retry or ProxmoxRetryPolicy()
+
+    def _profile(self, operation: str) -> TimeoutProfile:
+        return self.timeouts.get(operation) or self.timeouts["default"]
+
+    @staticmethod
+    def _record_outcome(
+        breaker: ProxmoxCircuitBreaker,
+        started: float,
+        response: httpx.Response | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Feed a finished call into the host's breaker (transport errors and 5xx gateway codes fail)."""
+
+        if isinstance(error, httpx.HTTPStatusError):
+            response = error.response
+        if response is not None:
+            if response.status_code in HOST_FAILURE_STATUS_CODES:
+                breaker.record_failure(f"HTTP {response.status_code}")
+            else:
+                breaker.record_success(time.monotonic() - started)
+        elif isinstance(error, httpx.TransportError):
+            breaker.record_failure(f"{type(error).__name__}: {error}")
+        else:
+            breaker.release()
 
     def _base_url(self, host: ProxmoxHostConfig) -> str:
         return host.api_url.rstrip("/")
 
-    def authenticate(self, host: ProxmoxHostConfig) -> Tuple[str, str | None]:
-        """Login with username/password and return (ticket, csrf)."""
-
-        base_url = self._base_url(host)
-        login_payload = {
-            "username": f"{host.username}@{host.realm}" if host.realm else host.username,
-            "password": host.password,
-        }
-        response = self.http.post(f"{base_url}/api2/json/access/ticket", data=login_payload)
+    def _url(self, host: ProxmoxHostConfig, path: str) -> str:
+        return f"{self._base_url(host)}/api2/json{path}"
+
+    def _parse_ticket(self, host: ProxmoxHostConfig, response: httpx.Response) -> ProxmoxTicket:
         response.raise_for_status()
         data = response.json()["data"]
-        return data["ticket"], data.get("CSRFPreventionToken")
+        return ProxmoxTicket(
+            ticket=data["ticket"],
+            csrf=data.get("CSRFPreventionToken"),
+            fingerprint=self.tickets.fingerprint(host),
+        )
+
+    @staticmethod
+    def _login_payload(host: ProxmoxHostConfig) -> dict[str, str]:
+        return {"username": host.user_id, "password": host.password}
 
     def _headers(self, ticket: str, csrf: str | None) -> dict[str, str]:
         headers = {"Cookie": f"PVEAuthCookie={ticket}"}
@@ -35,18 +217,27 @@ class ProxmoxClient:
             headers["CSRFPreventionToken"] = csrf
         return headers
 
-    def provision_server(self, server: Server, plan: PlanSpec, host: ProxmoxHostConfig) -> str:
-        """Provision a server and return the Proxmox-assigned identifier."""
+    @staticmethod
+    def _token_headers(host: ProxmoxHostConfig) -> dict[str, str]:
+        return {"Authorization": f"PVEAPIToken={host.user_id}!{host.token_id}={host.token_secret}"}
+
+    @staticmethod
+    def _vm_path(external_id: str, host: ProxmoxHostConfig, node: str | None, action: str, suffix: str = "") -> str:
+        target_node = node or host.node
+        if not target_node:
+            raise ValueError(f"Proxmox node required to {action}")
+        return f"/nodes/{target_node}/qemu/{external_id}{suffix}"
+
+    def _provision_requests(
+        self, server: Server, plan: PlanSpec, host: ProxmoxHostConfig, vmid: int
+    ) -> tuple[tuple[str, dict[str, Any], str], tuple[str, dict[str, Any]]]:
+        """Return ((path, payload, operation) to create, (path, payload) to configure) for ``vmid``."""
 
-        ticket, csrf = self.authenticate(host)
         node = plan.proxmox_node or host.node
         if not node:
             raise ValueError("Proxmox node must be configured on the plan or host")
 
-        base_url = self._base_url(host)
         vm_name = f"vm-{server.id}"
-        vmid = self._generate_vmid(server)
-
         disk_volume = self._disk_volume(plan)
 
         if plan.template_vmid:
@@ -60,12 +251,7 @@ class ProxmoxClient:
             if str(plan.clone_mode).lower() != "linked":
                 clone_payload["storage"] = plan.disk_storage or "local-lvm"
 
-            response = self.http.post(
-                f"{base_url}/api2/json/nodes/{node}/qemu/{plan.template_vmid}/clone",
-                data=clone_payload,
-                headers=self._headers(ticket, csrf),
-            )
-            response.raise_for_status()
+            create = (f"/nodes/{node}/qemu/{plan.template_vmid}/clone", clone_payload, "clone")
         else:
             payload = {
                 "vmid": vmid,
@@ -76,117 +262,273 @@ class ProxmoxClient:
                 "ostype": "l26",
                 "virtio0": disk_volume,
             }
-
-            response = self.http.post(
-                f"{base_url}/api2/json/nodes/{node}/qemu",
-                data=payload,
-                headers=self._headers(ticket, csrf),
-            )
-            response.raise_for_status()
+            create = (f"/nodes/{node}/qemu", payload, "create")
 
         # ensure resources match plan for cloned templates
-        self.http.put(
-            f"{base_url}/api2/json/nodes/{node}/qemu/{vmid}/config",
-            data={
+        config = (
+            f"/nodes/{node}/qemu/{vmid}/config",
+            {
                 "cores": plan.vcpu,
                 "memory": plan.memory_mb,
                 "name": vm_name,
                 "virtio0": disk_volume,
             },
-            headers=self._headers(ticket, csrf),
-        ).raise_for_status()
+        )
+        return create, config
 
-        return str(vmid)
+    @staticmethod
+    def _resources_payload(
+        cores: int | None, memory_mb: int | None, disk_volume: str | None
+    ) -> dict[str, int | str]:
+        payload: dict[str, int | str] = {}
+        if cores is not None:
+            payload["cores"] = cores
+        if memory_mb is not None:
+            payload["memory"] = memory_mb
+        if disk_volume:
+            payload["virtio0"] = disk_volume
+        return payload
 
-    def destroy_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> None:
-        """Rollback helper to clean up failed provisioning attempts."""
+    @staticmethod
+    def _upid(response: httpx.Response) -> str | None:
+        """Return the task id for calls that Proxmox runs as a background worker."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to delete VM")
+        data = response.json().get("data")
+        return data if isinstance(data, str) and data.startswith("UPID:") else None
 
-        response = self.http.delete(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+    @staticmethod
+    def _task_path(upid: str, suffix: str = "") -> str:
+        node = task_node(upid)
+        if not node:
+            raise ValueError(f"Not a Proxmox task id: {upid}")
+        return f"/nodes/{node}/tasks/{upid}{suffix}"
 
-    def start_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> None:
-        """Power on an existing VM."""
+    @staticmethod
+    def _parse_status(response: httpx.Response) -> str | None:
+        data = response.json().get("data", {})
+        return data.get("qmpstatus") or data.get("status") or data.get("vmstatus")
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to start VM")
+    @staticmethod
+    def _parse_cluster_resources(response: httpx.Response) -> dict[str, ProxmoxVmSnapshot]:
+        snapshots: dict[str, ProxmoxVmSnapshot] = {}
+        for item in response.json().get("data") or []:
+            if item.get("type", "qemu") != "qemu" or item.get("vmid") is None:
+                continue
+            maxmem = item.get("maxmem")
+            maxdisk = item.get("maxdisk")
+            vmid = str(item["vmid"])
+            snapshots[vmid] = ProxmoxVmSnapshot(
+                vmid=vmid,
+                node=item.get("node"),
+                status=item.get("status"),
+                vcpu=item.get("maxcpu"),
+                memory_mb=maxmem // (1024 * 1024) if isinstance(maxmem, int) else None,
+                disk_gb=maxdisk // (1024 * 1024 * 1024) if isinstance(maxdisk, int) else None,
+            )
+        return snapshots
 
-        response = self.http.post(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/status/start",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+    @staticmethod
+    def _parse_primary_ip(response: httpx.Response) -> str | None:
+        data = response.json().get("data", [])
+        if isinstance(data, dict):
+            # the guest agent wraps the interface list as {"result": [...]}
+            data = data.get("result", [])
+        for iface in data:
+            for addr in iface.get("ip-addresses", []):
+                ip_addr = addr.get("ip-address")
+                if ip_addr and ":" not in ip_addr and not ip_addr.startswith("127."):
+                    return ip_addr
+        return None
 
-    def stop_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> None:
-        """Power off an existing VM."""
+    @staticmethod
+    def _parse_cluster_vmids(response: httpx.Response) -> set[int]:
+        """Every VMID in use on the cluster, containers and templates included."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to stop VM")
+        return {int(item["vmid"]) for item in response.json().get("data") or [] if item.get("vmid") is not None}
 
-        response = self.http.post(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/status/stop",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+    @staticmethod
+    def _disk_volume(plan: PlanSpec) -> str:
+        """Create a disk volume string Proxmox expects (without size suffixes)."""
+
+        storage = plan.disk_storage or "local-lvm"
+        return f"{storage}:{int(plan.disk_gb)}"
+
+
+class ProxmoxClient(_ProxmoxClientBase):
+    """Thin wrapper around Proxmox HTTP API (https://pve.proxmox.com/pve-docs/api-viewer/)."""
+
+    def __init__(
+        self,
+        tickets: ProxmoxTicketCache | None = None,
+        timeouts: dict[str, TimeoutProfile] | None = None,
+        breakers: ProxmoxBreakerRegistry | None = None,
+        retry: ProxmoxRetryPolicy | None = None,
+        transport: httpx.BaseTransport | None = None,
+    ):
+        super().__init__(tickets, timeouts, breakers, retry)
+        self.http = httpx.Client(timeout=self._profile("default").request, verify=False, transport=transport)
+
+    def authenticate(self, host: ProxmoxHostConfig) -> Tuple[str, str | None]:
+        """Return (ticket, csrf) for the host, logging in only when the cache has none."""
+
+        if host.uses_api_token:
+            raise ValueError(f"Proxmox host '{host.id}' uses API token auth; no ticket to fetch")
+
+        ticket = self._ticket(host)
+        return ticket.ticket, ticket.csrf
+
+    def _ticket(self, host: ProxmoxHostConfig) -> ProxmoxTicket:
+        ticket = self.tickets.get(host)
+        if ticket is None:
+            with self.tickets.login_lock(host.id):
+                ticket = self.tickets.get(host)
+                if ticket is None:
+                    ticket = self._login(host)
+                    self.tickets.store(host.id, ticket)
+        elif self.tickets.should_renew(ticket) and self.tickets.claim_renewal(host.id):
+            threading.Thread(target=self._renew, args=(host,), daemon=True).start()
+        return ticket
+
+    def _login(self, host: ProxmoxHostConfig) -> ProxmoxTicket:
+        """Login with username/password and return a fresh ticket."""
+
+        response = self.http.post(self._url(host, "/access/ticket"), data=self._login_payload(host))
+        return self._parse_ticket(host, response)
+
+    def _renew(self, host: ProxmoxHostConfig) -> None:
+        try:
+            with self.tickets.login_lock(host.id):
+                self.tickets.store(host.id, self._login(host))
+        except httpx.HTTPError:
+            # the current ticket stays usable until it expires; the next call retries
+            pass
+        finally:
+            self.tickets.release_renewal(host.id)
+
+    def _request(
+        self, method: str, host: ProxmoxHostConfig, path: str, operation: str = "default", **kwargs
+    ) -> httpx.Response:
+        """Send an API call, retrying per the retry policy, and raise on error statuses."""
+
+        attempt = 1
+        while True:
+            try:
+                response = self._attempt(method, host, path, operation, **kwargs)
+            except httpx.HTTPError as exc:
+                delay = self.retry.next_delay(host.id, method, operation, attempt, error=exc)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry.next_delay(host.id, method, operation, attempt, response=response)
+                if delay is None:
+                    response.raise_for_status()
+                    return response
+            time.sleep(delay)
+            attempt += 1
+
+    def _attempt(
+        self, method: str, host: ProxmoxHostConfig, path: str, operation: str, **kwargs
+    ) -> httpx.Response:
+        """Send one attempt through the host's circuit breaker."""
+
+        breaker = self.breakers.get(host.id)
+        breaker.acquire()
+        started = time.monotonic()
+        try:
+            response = self._send(method, host, path, operation, **kwargs)
+        except BaseException as exc:
+            self._record_outcome(breaker, started, error=exc)
+            raise
+        self._record_outcome(breaker, started, response=response)
+        return response
+
+    def _send(
+        self, method: str, host: ProxmoxHostConfig, path: str, operation: str, **kwargs
+    ) -> httpx.Response:
+        """Send an authenticated API call, re-logging in once if the ticket was rejected."""
+
+        url = self._url(host, path)
+        kwargs.setdefault("timeout", self._profile(operation).request)
+        if host.uses_api_token:
+            return self.http.request(method, url, headers=self._token_headers(host), **kwargs)
+
+        ticket = self._ticket(host)
+        response = self.http.request(method, url, headers=self._headers(ticket.ticket, ticket.csrf), **kwargs)
+        if response.status_code == httpx.codes.UNAUTHORIZED:
+            self.tickets.invalidate(host.id, ticket)
+            ticket = self._ticket(host)
+            response = self.http.request(method, url, headers=self._headers(ticket.ticket, ticket.csrf), **kwargs)
+        return response
+
+    def get_task_status(self, host: ProxmoxHostConfig, upid: str) -> dict[str, Any]:
+        """Read ``/nodes/{node}/tasks/{upid}/status`` (``status`` is "running" or "stopped")."""
+
+        return self._request("GET", host, self._task_path(upid, "/status"), operation="read").json().get("data") or {}
+
+    def wait_for_task(self, host: ProxmoxHostConfig, upid: str | None, operation: str = "default") -> str | None:
+        """Block until the task stops, polling with backoff; raise if it failed or timed out."""
+
+        if not upid:
+            return None
+
+        timeout = self._profile(operation).task
+        deadline = time.monotonic() + timeout
+        interval = 0.5
+        while True:
+            status = self.get_task_status(host, upid)
+            if status.get("status") == "stopped":
+                exitstatus = status.get("exitstatus")
+                if exitstatus != "OK":
+                    raise ProxmoxTaskError(upid, exitstatus)
+                return exitstatus
+            if time.monotonic() >= deadline:
+                raise ProxmoxTaskTimeout(upid, timeout)
+            time.sleep(interval)
+            interval = min(interval * 1.5, 5.0)
+
+    def destroy_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
+        """Rollback helper to clean up failed provisioning attempts."""
+
+        path = self._vm_path(external_id, host, node, "delete VM")
+        return self._upid(self._request("DELETE", host, path, operation="delete"))
+
+    def start_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
+        """Power on an existing VM."""
+
+        path = self._vm_path(external_id, host, node, "start VM", "/status/start")
+        return self._upid(self._request("POST", host, path, operation="power"))
+
+    def stop_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
+        """Power off an existing VM."""
+
+        path = self._vm_path(external_id, host, node, "stop VM", "/status/stop")
+        return self._upid(self._request("POST", host, path, operation="power"))
 
     def resize_disk(
         self, external_id: str, host: ProxmoxHostConfig, node: str | None, add_disk_gb: int
-    ) -> None:
+    ) -> str | None:
         """Increase disk size on the primary virtio disk."""
 
         if add_disk_gb <= 0:
             return None
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to resize VM disk")
-
-        response = self.http.post(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/resize",
-            data={"disk": "virtio0", "size": f"+{add_disk_gb}G"},
-            headers=self._headers(ticket, csrf),
+        path = self._vm_path(external_id, host, node, "resize VM disk", "/resize")
+        response = self._request(
+            "POST", host, path, operation="resize", data={"disk": "virtio0", "size": f"+{add_disk_gb}G"}
         )
-        response.raise_for_status()
+        return self._upid(response)
 
-    def shutdown_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> None:
+    def shutdown_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
         """Gracefully shut down a VM via ACPI."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to shutdown VM")
-
-        response = self.http.post(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/status/shutdown",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+        path = self._vm_path(external_id, host, node, "shutdown VM", "/status/shutdown")
+        return self._upid(self._request("POST", host, path, operation="shutdown"))
 
-    def reboot_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> None:
+    def reboot_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
         """Reboot a running VM."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to reboot VM")
-
-        response = self.http.post(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/status/reboot",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+        path = self._vm_path(external_id, host, node, "reboot VM", "/status/reboot")
+        return self._upid(self._request("POST", host, path, operation="power"))
 
     def update_resources(
         self,
@@ -199,152 +541,405 @@ class ProxmoxClient:
     ) -> None:
         """Update VM cores/memory/disk mapping after provisioning or upgrade."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to update VM config")
-
-        payload: dict[str, int | str] = {}
-        if cores is not None:
-            payload["cores"] = cores
-        if memory_mb is not None:
-            payload["memory"] = memory_mb
-        if disk_volume:
-            payload["virtio0"] = disk_volume
-
+        path = self._vm_path(external_id, host, node, "update VM config", "/config")
+        payload = self._resources_payload(cores, memory_mb, disk_volume)
         if not payload:
             return None
 
-        response = self.http.put(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/config",
-            data=payload,
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+        self._request("PUT", host, path, operation="config", data=payload)
 
-    def reset_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> None:
+    def reset_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
         """Hard reset a VM."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to reset VM")
-
-        response = self.http.post(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/status/reset",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+        path = self._vm_path(external_id, host, node, "reset VM", "/status/reset")
+        return self._upid(self._request("POST", host, path, operation="power"))
 
-    def suspend_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> None:
+    def suspend_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
         """Suspend a VM to RAM."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to suspend VM")
-
-        response = self.http.post(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/status/suspend",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+        path = self._vm_path(external_id, host, node, "suspend VM", "/status/suspend")
+        return self._upid(self._request("POST", host, path, operation="power"))
 
-    def resume_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> None:
+    def resume_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
         """Resume a suspended VM."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to resume VM")
-
-        response = self.http.post(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/status/resume",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+        path = self._vm_path(external_id, host, node, "resume VM", "/status/resume")
+        return self._upid(self._request("POST", host, path, operation="power"))
 
     def get_server_status(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
         """Fetch the current runtime status for a VM."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to read VM status")
-
-        response = self.http.get(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/status/current",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
-        data = response.json().get("data", {})
-        return data.get("qmpstatus") or data.get("status") or data.get("vmstatus")
+        path = self._vm_path(external_id, host, node, "read VM status", "/status/current")
+        return self._parse_status(self._request("GET", host, path, operation="read"))
 
     def get_server_config(
         self, external_id: str, host: ProxmoxHostConfig, node: str | None = None
     ) -> dict[str, int | str] | None:
         """Fetch VM configuration like cores/memory/disk for synchronization."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to read VM config")
+        path = self._vm_path(external_id, host, node, "read VM config", "/config")
+        return self._request("GET", host, path, operation="read").json().get("data") or None
 
-        response = self.http.get(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/config",
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
-        return response.json().get("data") or None
+    def get_cluster_resources(self, host: ProxmoxHostConfig) -> dict[str, ProxmoxVmSnapshot]:
+        """Fetch status/cpu/memory/disk for every VM on the host's cluster in one call."""
+
+        response = self._request("GET", host, "/cluster/resources", operation="read", params={"type": "vm"})
+        return self._parse_cluster_resources(response)
+
+    def get_cluster_vmids(self, host: ProxmoxHostConfig) -> set[int]:
+        """Fetch every VMID in use on the host's cluster (VMs and containers)."""
+
+        response = self._request("GET", host, "/cluster/resources", operation="read", params={"type": "vm"})
+        return self._parse_cluster_vmids(response)
+
+    def get_next_vmid(self, host: ProxmoxHostConfig) -> int:
+        """Ask ``/cluster/nextid`` for the lowest VMID Proxmox considers free."""
+
+        response = self._request("GET", host, "/cluster/nextid", operation="read")
+        return int(response.json()["data"])
 
     def set_admin_password(
         self, external_id: str, host: ProxmoxHostConfig, node: str | None, password: str
     ) -> None:
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
-            raise ValueError("Proxmox node required to reset password")
-
-        response = self.http.put(
-            f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/config",
-            data={"ciuser": "root", "cipassword": password},
-            headers=self._headers(ticket, csrf),
-        )
-        response.raise_for_status()
+        path = self._vm_path(external_id, host, node, "reset password", "/config")
+        self._request("PUT", host, path, operation="config", data={"ciuser": "root", "cipassword": password})
 
     def get_primary_ip(
         self, external_id: str, host: ProxmoxHostConfig, node: str | None
     ) -> str | None:
         """Attempt to read the primary IPv4 via QEMU guest agent."""
 
-        ticket, csrf = self.authenticate(host)
-        target_node = node or host.node
-        if not target_node:
+        if not (node or host.node):
             return None
 
+        path = self._vm_path(external_id, host, node, "read VM network", "/agent/network-get-interfaces")
         try:
-            response = self.http.get(
-                f"{self._base_url(host)}/api2/json/nodes/{target_node}/qemu/{external_id}/agent/network-get-interfaces",
-                headers=self._headers(ticket, csrf),
-            )
-            response.raise_for_status()
-            data = response.json().get("data", [])
-            for iface in data:
-                for addr in iface.get("ip-addresses", []):
-                    ip_addr = addr.get("ip-address")
-                    if ip_addr and ":" not in ip_addr:
-                        return ip_addr
+            return self._parse_primary_ip(self._request("GET", host, path, operation="read"))
         except httpx.HTTPError:
             return None
-        return None
 
-    @staticmethod
-    def _generate_vmid(server: Server) -> int:
-        return abs(server.id.int % 2_000_000_000) or 1000
 
-    @staticmethod
-    def _disk_volume(plan: PlanSpec) -> str:
-        """Create a disk volume string Proxmox expects (without size suffixes)."""
+class AsyncProxmoxClient(_ProxmoxClientBase):
+    """Non-blocking twin of :class:`ProxmoxClient` built on ``httpx.AsyncClient``.
 
-        storage = plan.disk_storage or "local-lvm"
-        return f"{storage}:{int(plan.disk_gb)}"
+    Exposes the same methods as coroutines so a single event loop can keep many slow
+    Proxmox calls in flight without tying up a threadpool worker per request.
+    """
+
+    def __init__(
+        self,
+        tickets: ProxmoxTicketCache | None = None,
+        timeouts: dict[str, TimeoutProfile] | None = None,
+        breakers: ProxmoxBreakerRegistry | None = None,
+        retry: ProxmoxRetryPolicy | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        super().__init__(tickets, timeouts, breakers, retry)
+        self.http = httpx.AsyncClient(timeout=self._profile("default").request, verify=False, transport=transport)
+        self.tasks = ProxmoxTaskWatcher(self)
+        self.reads = AsyncSingleFlight()
+        self._background: set[asyncio.Task] = set()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+    async def authenticate(self, host: ProxmoxHostConfig) -> Tuple[str, str | None]:
+        """Return (ticket, csrf) for the host, logging in only when the cache has none."""
+
+        if host.uses_api_token:
+            raise ValueError(f"Proxmox host '{host.id}' uses API token auth; no ticket to fetch")
+
+        ticket = await self._ticket(host)
+        return ticket.ticket, ticket.csrf
+
+    async def _ticket(self, host: ProxmoxHostConfig) -> ProxmoxTicket:
+        ticket = self.tickets.get(host)
+        if ticket is None:
+            async with self.tickets.async_login_lock(host.id):
+                ticket = self.tickets.get(host)
+                if ticket is None:
+                    ticket = await self._login(host)
+                    self.tickets.store(host.id, ticket)
+        elif self.tickets.should_renew(ticket) and self.tickets.claim_renewal(host.id):
+            task = asyncio.get_running_loop().create_task(self._renew(host))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        return ticket
+
+    async def _login(self, host: ProxmoxHostConfig) -> ProxmoxTicket:
+        """Login with username/password and return a fresh ticket."""
+
+        response = await self.http.post(self._url(host, "/access/ticket"), data=self._login_payload(host))
+        return self._parse_ticket(host, response)
+
+    async def _renew(self, host: ProxmoxHostConfig) -> None:
+        try:
+            async with self.tickets.async_login_lock(host.id):
+                self.tickets.store(host.id, await self._login(host))
+        except httpx.HTTPError:
+            # the current ticket stays usable until it expires; the next call retries
+            pass
+        finally:
+            self.tickets.release_renewal(host.id)
+
+    async def _request(
+        self, method: str, host: ProxmoxHostConfig, path: str, operation: str = "default", **kwargs
+    ) -> httpx.Response:
+        """Send an API call; identical concurrent GETs share one upstream request."""
+
+        if method != "GET":
+            return await self._request_with_retry(method, host, path, operation, **kwargs)
+
+        # path carries node, vmid and endpoint, e.g. /nodes/pve/qemu/101/status/current
+        key = (host.id, path, tuple(sorted((kwargs.get("params") or {}).items())))
+        return await self.reads.do(
+            key, lambda: self._request_with_retry(method, host, path, operation, **kwargs)
+        )
+
+    async def _request_with_retry(
+        self, method: str, host: ProxmoxHostConfig, path: str, operation: str, **kwargs
+    ) -> httpx.Response:
+        """Send an API call, retrying per the retry policy, and raise on error statuses."""
+
+        attempt = 1
+        while True:
+            try:
+                response = await self._attempt(method, host, path, operation, **kwargs)
+            except httpx.HTTPError as exc:
+                delay = self.retry.next_delay(host.id, method, operation, attempt, error=exc)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry.next_delay(host.id, method, operation, attempt, response=response)
+                if delay is None:
+                    response.raise_for_status()
+                    return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _attempt(
+        self, method: str, host: ProxmoxHostConfig, path: str, operation: str, **kwargs
+    ) -> httpx.Response:
+        """Send one attempt through the host's circuit breaker."""
+
+        breaker = self.breakers.get(host.id)
+        breaker.acquire()
+        started = time.monotonic()
+        try:
+            response = await self._send(method, host, path, operation, **kwargs)
+        except BaseException as exc:
+            self._record_outcome(breaker, started, error=exc)
+            raise
+        self._record_outcome(breaker, started, response=response)
+        return response
+
+    async def _send(
+        self, method: str, host: ProxmoxHostConfig, path: str, operation: str, **kwargs
+    ) -> httpx.Response:
+        """Send an authenticated API call, re-logging in once if the ticket was rejected."""
+
+        url = self._url(host, path)
+        kwargs.setdefault("timeout", self._profile(operation).request)
+        if host.uses_api_token:
+            return await self.http.request(method, url, headers=self._token_headers(host), **kwargs)
+
+        ticket = await self._ticket(host)
+        response = await self.http.request(method, url, headers=self._headers(ticket.ticket, ticket.csrf), **kwargs)
+        if response.status_code == httpx.codes.UNAUTHORIZED:
+            self.tickets.invalidate(host.id, ticket)
+            ticket = await self._ticket(host)
+            response = await self.http.request(
+                method, url, headers=self._headers(ticket.ticket, ticket.csrf), **kwargs
+            )
+        return response
+
+    async def get_task_status(self, host: ProxmoxHostConfig, upid: str) -> dict[str, Any]:
+        """Read ``/nodes/{node}/tasks/{upid}/status`` (``status`` is "running" or "stopped")."""
+
+        response = await self._request("GET", host, self._task_path(upid, "/status"), operation="read")
+        return response.json().get("data") or {}
+
+    async def list_active_tasks(self, host: ProxmoxHostConfig, node: str) -> set[str]:
+        """Return the UPIDs of tasks still running on a node."""
+
+        response = await self._request(
+            "GET", host, f"/nodes/{node}/tasks", operation="read", params={"source": "active"}
+        )
+        return {item["upid"] for item in response.json().get("data") or [] if item.get("upid")}
+
+    async def wait_for_task(
+        self, host: ProxmoxHostConfig, upid: str | None, operation: str = "default"
+    ) -> str | None:
+        """Wait on the shared task watcher; raise if the task failed or timed out."""
+
+        if not upid:
+            return None
+        return await self.tasks.wait(host, upid, timeout=self._profile(operation).task)
+
+    async def provision_server(self, server: Server, plan: PlanSpec, host: ProxmoxHostConfig, vmid: int) -> str:
+        """Create the VM as ``vmid`` (leased from ``VmidAllocator``) and return its identifier.
+
+        Raises :class:`ProxmoxCreateRejected` when nothing was created and
+        :class:`ProxmoxProvisionIncomplete` when the VM exists but was not configured.
+        """
+
+        try:
+            (create_path, create_payload, operation), (config_path, config_payload) = self._provision_requests(
+                server, plan, host, vmid
+            )
+            response = await self._request("POST", host, create_path, operation=operation, data=create_payload)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code in HOST_FAILURE_STATUS_CODES:
+                # a gateway error does not say whether pvedaemon acted on the call
+                raise
+            raise ProxmoxCreateRejected(vmid, exc) from exc
+        except (ValueError, ProxmoxHostUnavailable, *NOT_SENT_ERRORS) as exc:
+            raise ProxmoxCreateRejected(vmid, exc) from exc
+        # the clone/create task holds the VM lock; configuring before it finishes fails.
+        # A failed or timed-out task propagates as is: the VM may or may not exist.
+        await self.wait_for_task(host, self._upid(response), operation)
+        try:
+            await self._request("PUT", host, config_path, operation="config", data=config_payload)
+        except Exception as exc:
+            raise ProxmoxProvisionIncomplete(str(vmid), exc) from exc
+        return str(vmid)
+
+    async def destroy_server(
+        self, external_id: str, host: ProxmoxHostConfig, node: str | None = None
+    ) -> str | None:
+        """Rollback helper to clean up failed provisioning attempts."""
+
+        path = self._vm_path(external_id, host, node, "delete VM")
+        return self._upid(await self._request("DELETE", host, path, operation="delete"))
+
+    async def start_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
+        """Power on an existing VM."""
+
+        path = self._vm_path(external_id, host, node, "start VM", "/status/start")
+        return self._upid(await self._request("POST", host, path, operation="power"))
+
+    async def stop_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
+        """Power off an existing VM."""
+
+        path = self._vm_path(external_id, host, node, "stop VM", "/status/stop")
+        return self._upid(await self._request("POST", host, path, operation="power"))
+
+    async def resize_disk(
+        self, external_id: str, host: ProxmoxHostConfig, node: str | None, add_disk_gb: int
+    ) -> str | None:
+        """Increase disk size on the primary virtio disk."""
+
+        if add_disk_gb <= 0:
+            return None
+
+        path = self._vm_path(external_id, host, node, "resize VM disk", "/resize")
+        response = await self._request(
+            "POST", host, path, operation="resize", data={"disk": "virtio0", "size": f"+{add_disk_gb}G"}
+        )
+        return self._upid(response)
+
+    async def shutdown_server(
+        self, external_id: str, host: ProxmoxHostConfig, node: str | None = None
+    ) -> str | None:
+        """Gracefully shut down a VM via ACPI."""
+
+        path = self._vm_path(external_id, host, node, "shutdown VM", "/status/shutdown")
+        return self._upid(await self._request("POST", host, path, operation="shutdown"))
+
+    async def reboot_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
+        """Reboot a running VM."""
+
+        path = self._vm_path(external_id, host, node, "reboot VM", "/status/reboot")
+        return self._upid(await self._request("POST", host, path, operation="power"))
+
+    async def update_resources(
+        self,
+        external_id: str,
+        host: ProxmoxHostConfig,
+        node: str | None,
+        cores: int | None = None,
+        memory_mb: int | None = None,
+        disk_volume: str | None = None,
+    ) -> None:
+        """Update VM cores/memory/disk mapping after provisioning or upgrade."""
+
+        path = self._vm_path(external_id, host, node, "update VM config", "/config")
+        payload = self._resources_payload(cores, memory_mb, disk_volume)
+        if not payload:
+            return None
+
+        await self._request("PUT", host, path, operation="config", data=payload)
+
+    async def reset_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
+        """Hard reset a VM."""
+
+        path = self._vm_path(external_id, host, node, "reset VM", "/status/reset")
+        return self._upid(await self._request("POST", host, path, operation="power"))
+
+    async def suspend_server(
+        self, external_id: str, host: ProxmoxHostConfig, node: str | None = None
+    ) -> str | None:
+        """Suspend a VM to RAM."""
+
+        path = self._vm_path(external_id, host, node, "suspend VM", "/status/suspend")
+        return self._upid(await self._request("POST", host, path, operation="power"))
+
+    async def resume_server(self, external_id: str, host: ProxmoxHostConfig, node: str | None = None) -> str | None:
+        """Resume a suspended VM."""
+
+        path = self._vm_path(external_id, host, node, "resume VM", "/status/resume")
+        return self._upid(await self._request("POST", host, path, operation="power"))
+
+    async def get_server_status(
+        self, external_id: str, host: ProxmoxHostConfig, node: str | None = None
+    ) -> str | None:
+        """Fetch the current runtime status for a VM."""
+
+        path = self._vm_path(external_id, host, node, "read VM status", "/status/current")
+        return self._parse_status(await self._request("GET", host, path, operation="read"))
+
+    async def get_server_config(
+        self, external_id: str, host: ProxmoxHostConfig, node: str | None = None
+    ) -> dict[str, int | str] | None:
+        """Fetch VM configuration like cores/memory/disk for synchronization."""
+
+        path = self._vm_path(external_id, host, node, "read VM config", "/config")
+        return (await self._request("GET", host, path, operation="read")).json().get("data") or None
+
+    async def get_cluster_resources(self, host: ProxmoxHostConfig) -> dict[str, ProxmoxVmSnapshot]:
+        """Fetch status/cpu/memory/disk for every VM on the host's cluster in one call."""
+
+        response = await self._request("GET", host, "/cluster/resources", operation="read", params={"type": "vm"})
+        return self._parse_cluster_resources(response)
+
+    async def get_cluster_vmids(self, host: ProxmoxHostConfig) -> set[int]:
+        """Fetch every VMID in use on the host's cluster (VMs and containers)."""
+
+        response = await self._request("GET", host, "/cluster/resources", operation="read", params={"type": "vm"})
+        return self._parse_cluster_vmids(response)
+
+    async def get_next_vmid(self, host: ProxmoxHostConfig) -> int:
+        """Ask ``/cluster/nextid`` for the lowest VMID Proxmox considers free."""
+
+        response = await self._request("GET", host, "/cluster/nextid", operation="read")
+        return int(response.json()["data"])
+
+    async def set_admin_password(
+        self, external_id: str, host: ProxmoxHostConfig, node: str | None, password: str
+    ) -> None:
+        path = self._vm_path(external_id, host, node, "reset password", "/config")
+        await self._request("PUT", host, path, operation="config", data={"ciuser": "root", "cipassword": password})
+
+    async def get_primary_ip(
+        self, external_id: str, host: ProxmoxHostConfig, node: str | None
+    ) -> str | None:
+        """Attempt to read the primary IPv4 via QEMU guest agent."""
+
+        if not (node or host.node):
+            return None
+
+        path = self._vm_path(external_id, host, node, "read VM network", "/agent/network-get-interfaces")
+        try:
+            return self._parse_primary_ip(await self._request("GET", host, path, operation="read"))
+        except httpx.HTTPError:
+            return None
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+
+import httpx
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ProxmoxHostUnavailable(httpx.HTTPError):
+    """Raised without touching the network while a host's circuit breaker is open.
+
+    Subclasses ``httpx.HTTPError`` so callers that already tolerate Proxmox outages
+    (status refreshes, guest-agent lookups, the task watcher) treat it the same way.
+    """
+
+    def __init__(self, host_id: str, retry_in: float):
+        super().__init__(f"Proxmox host '{host_id}' is unavailable; retry in {retry_in:.0f}s")
+        self.host_id = host_id
+        self.retry_in = retry_in
+
+
+@dataclass
+class BreakerSnapshot:
+    host_id: str
+    state: BreakerState
+    calls: int
+    failures: int
+    slow_calls: int
+    consecutive_failures: int
+    retry_in: float | None
+    last_error: str | None
+
+
+class ProxmoxCircuitBreaker:
+    """Closed/open/half-open breaker for a single Proxmox host.
+
+    Outcomes of the last ``window_size`` calls are kept. The breaker opens when
+    ``failure_threshold`` calls fail in a row, or when at least ``min_calls`` calls
+    were seen and the share of failed or slow ones reaches ``failure_rate``. After
+    ``open_seconds`` a single probe is let through (half-open); its outcome closes
+    the breaker or re-opens it.
+    """
+
+    def __init__(
+        self,
+        host_id: str,
+        failure_threshold: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        window_size: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+    ):
+        self.host_id = host_id
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._outcomes: deque[str] = deque(maxlen=window_size)
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self._last_error: str | None = None
+
+    def acquire(self) -> None:
+        """Let a call through or raise :class:`ProxmoxHostUnavailable`."""
+
+        with self._lock:
+            if self._state == BreakerState.CLOSED:
+                return
+            retry_in = self._opened_at + self.open_seconds - time.monotonic()
+            if self._state == BreakerState.OPEN and retry_in <= 0:
+                self._state = BreakerState.HALF_OPEN
+            if self._state == BreakerState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        raise ProxmoxHostUnavailable(self.host_id, max(retry_in, 0.0))
+
+    def record_success(self, elapsed: float) -> None:
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            self._probe_in_flight = False
+            self._consecutive_failures = 0
+            if self._state == BreakerState.HALF_OPEN:
+                if slow:
+                    self._open("slow probe")
+                    return
+                self._outcomes.clear()
+                self._state = BreakerState.CLOSED
+            self._outcomes.append("slow" if slow else "ok")
+            if slow:
+                self._last_error = f"slow call ({elapsed:.1f}s)"
+            self._evaluate()
+
+    def record_failure(self, error: str) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+            self._consecutive_failures += 1
+            self._last_error = error
+            if self._state == BreakerState.HALF_OPEN:
+                self._open(error)
+                return
+            self._outcomes.append("failed")
+            self._evaluate()
+
+    def release(self) -> None:
+        """Give back a half-open probe whose call ended without a health signal."""
+
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> BreakerSnapshot:
+        with self._lock:
+            retry_in = None
+            if self._state == BreakerState.OPEN:
+                retry_in = max(self._opened_at + self.open_seconds - time.monotonic(), 0.0)
+            return BreakerSnapshot(
+                host_id=self.host_id,
+                state=self._state,
+                calls=len(self._outcomes),
+                failures=self._outcomes.count("failed"),
+                slow_calls=self._outcomes.count("slow"),
+                consecutive_failures=self._consecutive_failures,
+                retry_in=retry_in,
+                last_error=self._last_error,
+            )
+
+    def _evaluate(self) -> None:
+        if self._state != BreakerState.CLOSED:
+            return
+        if self._consecutive_failures >= self.failure_threshold:
+            self._open(self._last_error)
+            return
+        if len(self._outcomes) >= self.min_calls:
+            bad = sum(1 for outcome in self._outcomes if outcome != "ok")
+            if bad / len(self._outcomes) >= self.failure_rate:
+                self._open(self._last_error)
+
+    def _open(self, error: str | None) -> None:
+        self._state = BreakerState.OPEN
+        self._opened_at = time.monotonic()
+        self._last_error = error
+
+
+class ProxmoxBreakerRegistry:
+    """Lazily creates one :class:`ProxmoxCircuitBreaker` per host id with shared thresholds."""
+
+    def __init__(self, **thresholds):
+        self.thresholds = thresholds
+        self._lock = threading.Lock()
+        self._breakers: dict[str, ProxmoxCircuitBreaker] = {}
+
+    def get(self, host_id: str) -> ProxmoxCircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host_id)
+            if breaker is None:
+                breaker = ProxmoxCircuitBreaker(host_id, **self.thresholds)
+                self._breakers[host_id] = breaker
+            return breaker
+
+    def snapshots(self) -> list[BreakerSnapshot]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [breaker.snapshot() for breaker in breakers]
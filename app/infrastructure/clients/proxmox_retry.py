@@ -0,0 +1,110 @@
+import random
+import threading
+
+import httpx
+
+# (method, operation) pairs that can be replayed without side effects. Clones, creates,
+# deletes and power actions each start a new Proxmox task, so they are never replayed
+# once the request may have reached the host.
+IDEMPOTENT_OPERATIONS = frozenset({("GET", "read"), ("GET", "default"), ("PUT", "config")})
+
+# Failures where the request provably never left the client, so even unsafe calls can
+# be sent again.
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of successful calls for one host.
+
+    Starts full; each retry spends a token and each success earns ``ratio`` tokens, so a
+    host that keeps failing quickly runs dry instead of receiving a retry storm.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10.0):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.capacity)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class ProxmoxRetryPolicy:
+    """Decides whether and when a failed Proxmox call is sent again.
+
+    Idempotent operations are retried on transport errors and 5xx responses. Unsafe
+    ones only when the connection was never established. Delays use exponential
+    backoff with full jitter, and every retry must be paid for from the host's budget.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        budget_ratio: float = 0.2,
+        budget_capacity: float = 10.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_capacity = budget_capacity
+        self._lock = threading.Lock()
+        self._budgets: dict[str, RetryBudget] = {}
+
+    @staticmethod
+    def is_idempotent(method: str, operation: str) -> bool:
+        return (method.upper(), operation) in IDEMPOTENT_OPERATIONS
+
+    def budget(self, host_id: str) -> RetryBudget:
+        with self._lock:
+            budget = self._budgets.get(host_id)
+            if budget is None:
+                budget = RetryBudget(self.budget_ratio, self.budget_capacity)
+                self._budgets[host_id] = budget
+            return budget
+
+    def next_delay(
+        self,
+        host_id: str,
+        method: str,
+        operation: str,
+        attempt: int,
+        response: httpx.Response | None = None,
+        error: BaseException | None = None,
+    ) -> float | None:
+        """Seconds to wait before attempt ``attempt + 1``, or ``None`` to give up."""
+
+        if response is not None and response.status_code < 500:
+            self.budget(host_id).deposit()
+            return None
+        if attempt >= self.max_attempts or not self._retryable(method, operation, response, error):
+            return None
+        if not self.budget(host_id).withdraw():
+            return None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _retryable(
+        self, method: str, operation: str, response: httpx.Response | None, error: BaseException | None
+    ) -> bool:
+        if isinstance(error, NOT_SENT_ERRORS):
+            return True
+        if not self.is_idempotent(method, operation):
+            return False
+        if response is not None:
+            return response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
@@ -0,0 +1,40 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncSingleFlight:
+    """Collapses concurrent calls with the same key into one in-flight call.
+
+    The first caller starts ``fn`` as a task; callers arriving before it finishes await
+    the same result (or exception) instead of issuing their own request. Every caller
+    awaits through ``asyncio.shield``, so a caller that is cancelled or times out never
+    cancels the shared request. Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.shared = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # every caller may have given up; don't log "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
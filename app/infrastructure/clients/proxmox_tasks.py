@@ -0,0 +1,195 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import httpx
+
+from app.domain.models.proxmox_host import ProxmoxHostConfig
+
+if TYPE_CHECKING:
+    from app.infrastructure.clients.proxmox import AsyncProxmoxClient
+
+
+@dataclass(frozen=True)
+class TimeoutProfile:
+    """HTTP timeout for the API call plus how long to wait for its Proxmox task."""
+
+    request: float
+    task: float
+
+
+# Operation name -> timeouts. Clones copy whole disks, so they get the longest budget.
+DEFAULT_TIMEOUT_PROFILES: dict[str, TimeoutProfile] = {
+    "default": TimeoutProfile(request=10.0, task=60.0),
+    "read": TimeoutProfile(request=10.0, task=0.0),
+    "config": TimeoutProfile(request=20.0, task=60.0),
+    "create": TimeoutProfile(request=30.0, task=300.0),
+    "clone": TimeoutProfile(request=30.0, task=1800.0),
+    "delete": TimeoutProfile(request=30.0, task=300.0),
+    "resize": TimeoutProfile(request=30.0, task=300.0),
+    "power": TimeoutProfile(request=15.0, task=120.0),
+    "shutdown": TimeoutProfile(request=15.0, task=300.0),
+}
+
+
+class ProxmoxTaskError(RuntimeError):
+    """Raised when a Proxmox task finishes with a non-OK exit status."""
+
+    def __init__(self, upid: str, exitstatus: str | None):
+        super().__init__(f"Proxmox task {upid} failed: {exitstatus or 'unknown error'}")
+        self.upid = upid
+        self.exitstatus = exitstatus
+
+
+class ProxmoxTaskTimeout(TimeoutError):
+    """Raised when a Proxmox task is still running after its profile's task timeout."""
+
+    def __init__(self, upid: str, timeout: float):
+        super().__init__(f"Proxmox task {upid} did not finish within {timeout:g}s")
+        self.upid = upid
+
+
+def task_node(upid: str) -> str | None:
+    """Extract the node from ``UPID:<node>:<pid>:<pstart>:<starttime>:<type>:<id>:<user>:``."""
+
+    parts = upid.split(":")
+    if len(parts) < 3 or parts[0] != "UPID":
+        return None
+    return parts[1]
+
+
+@dataclass
+class _PendingTask:
+    upid: str
+    host: ProxmoxHostConfig
+    node: str
+    future: asyncio.Future
+    timeout: float
+    deadline: float
+
+
+class ProxmoxTaskWatcher:
+    """Single polling loop that tracks every outstanding Proxmox task.
+
+    Each tick lists the active tasks once per (host, node) and only fetches the
+    status of tasks that dropped off that list, so polling cost follows the number
+    of nodes rather than the number of waiters. The interval starts short and backs
+    off while nothing changes, resetting whenever a task is added or finishes.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncProxmoxClient",
+        min_interval: float = 0.5,
+        max_interval: float = 5.0,
+        backoff: float = 1.5,
+    ):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._interval = min_interval
+        self._pending: dict[str, _PendingTask] = {}
+        self._wakeup = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._pending)
+
+    async def wait(self, host: ProxmoxHostConfig, upid: str, timeout: float) -> str:
+        """Wait until the task stops and return its exit status ("OK" on success)."""
+
+        node = task_node(upid)
+        if not node:
+            raise ValueError(f"Not a Proxmox task id: {upid}")
+
+        pending = self._pending.get(upid)
+        if pending:
+            pending.deadline = max(pending.deadline, time.monotonic() + timeout)
+        else:
+            pending = _PendingTask(
+                upid=upid,
+                host=host,
+                node=node,
+                future=asyncio.get_running_loop().create_future(),
+                timeout=timeout,
+                deadline=time.monotonic() + timeout,
+            )
+            self._pending[upid] = pending
+            self._ensure_loop()
+        self._interval = self.min_interval
+        self._wakeup.set()
+        return await asyncio.shield(pending.future)
+
+    def _ensure_loop(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._pending:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._interval)
+                # a new task arrived: give it the short interval before polling
+                await asyncio.sleep(self.min_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            finished = await self._poll_once()
+            if finished:
+                self._interval = self.min_interval
+            else:
+                self._interval = min(self._interval * self.backoff, self.max_interval)
+
+    async def _poll_once(self) -> int:
+        groups: dict[tuple[str, str], list[_PendingTask]] = {}
+        for pending in list(self._pending.values()):
+            groups.setdefault((pending.host.id, pending.node), []).append(pending)
+
+        results = await asyncio.gather(*(self._poll_node(tasks) for tasks in groups.values()))
+        return sum(results)
+
+    async def _poll_node(self, tasks: list[_PendingTask]) -> int:
+        host, node = tasks[0].host, tasks[0].node
+        try:
+            active = await self.client.list_active_tasks(host, node)
+        except httpx.HTTPError:
+            active = set()
+
+        finished = 0
+        now = time.monotonic()
+        for pending in tasks:
+            if pending.upid in active:
+                if now >= pending.deadline:
+                    self._resolve(pending, error=ProxmoxTaskTimeout(pending.upid, pending.timeout))
+                    finished += 1
+                continue
+            try:
+                status = await self.client.get_task_status(host, pending.upid)
+            except httpx.HTTPError as exc:
+                if now >= pending.deadline:
+                    self._resolve(pending, error=exc)
+                    finished += 1
+                continue
+            if status.get("status") == "stopped":
+                exitstatus = status.get("exitstatus")
+                if exitstatus == "OK":
+                    self._resolve(pending, result=exitstatus)
+                else:
+                    self._resolve(pending, error=ProxmoxTaskError(pending.upid, exitstatus))
+                finished += 1
+            elif now >= pending.deadline:
+                self._resolve(pending, error=ProxmoxTaskTimeout(pending.upid, pending.timeout))
+                finished += 1
+        return finished
+
+    def _resolve(self, pending: _PendingTask, result: str | None = None, error: BaseException | None = None) -> None:
+        self._pending.pop(pending.upid, None)
+        if pending.future.done():
+            return
+        if error is not None:
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(result)
@@ -13,6 +13,27 @@ class Settings(BaseSettings):
     proxmox_username: str = Field("root", env="PROXMOX_USERNAME")
     proxmox_password: str = Field("", env="PROXMOX_PASSWORD")
     proxmox_realm: str = Field("pam", env="PROXMOX_REALM")
+    proxmox_token_id: str = Field("", env="PROXMOX_TOKEN_ID")
+    proxmox_token_secret: str = Field("", env="PROXMOX_TOKEN_SECRET")
+    proxmox_vmid_range_start: int = Field(10_000, env="PROXMOX_VMID_RANGE_START")
+    proxmox_vmid_range_end: int = Field(999_999, env="PROXMOX_VMID_RANGE_END")
+    proxmox_vmid_pool_size: int = Field(8, env="PROXMOX_VMID_POOL_SIZE")
+    proxmox_breaker_failure_threshold: int = Field(5, env="PROXMOX_BREAKER_FAILURE_THRESHOLD")
+    proxmox_breaker_failure_rate: float = Field(0.5, env="PROXMOX_BREAKER_FAILURE_RATE")
+    proxmox_breaker_slow_call_seconds: float = Field(5.0, env="PROXMOX_BREAKER_SLOW_CALL_SECONDS")
+    proxmox_breaker_window_size: int = Field(20, env="PROXMOX_BREAKER_WINDOW_SIZE")
+    proxmox_breaker_min_calls: int = Field(10, env="PROXMOX_BREAKER_MIN_CALLS")
+    proxmox_breaker_open_seconds: float = Field(30.0, env="PROXMOX_BREAKER_OPEN_SECONDS")
+    proxmox_retry_max_attempts: int = Field(3, env="PROXMOX_RETRY_MAX_ATTEMPTS")
+    proxmox_retry_base_delay: float = Field(0.25, env="PROXMOX_RETRY_BASE_DELAY")
+    proxmox_retry_max_delay: float = Field(4.0, env="PROXMOX_RETRY_MAX_DELAY")
+    proxmox_retry_budget_ratio: float = Field(0.2, env="PROXMOX_RETRY_BUDGET_RATIO")
+    proxmox_retry_budget_capacity: float = Field(10.0, env="PROXMOX_RETRY_BUDGET_CAPACITY")
+
+    # Background status sync (0 disables the reconciler)
+    status_sync_interval_seconds: float = Field(30.0, env="STATUS_SYNC_INTERVAL_SECONDS")
+    status_refresh_per_host_concurrency: int = Field(8, env="STATUS_REFRESH_PER_HOST_CONCURRENCY")
+    status_refresh_deadline_seconds: float = Field(5.0, env="STATUS_REFRESH_DEADLINE_SECONDS")
 
     # SOLAPI settings
     solapi_api_key: str = Field("", env="SOLAPI_KEY")
@@ -21,7 +42,24 @@ class Settings(BaseSettings):
 
     # Persistence
     database_path: str = Field("data/vibecoding.db", env="DATABASE_PATH")
+    database_pool_size: int = Field(5, env="DATABASE_POOL_SIZE")
+    database_max_overflow: int = Field(10, env="DATABASE_MAX_OVERFLOW")
+    database_pool_timeout: float = Field(30.0, env="DATABASE_POOL_TIMEOUT")
+    sqlite_journal_mode: str = Field("wal", env="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field("normal", env="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(5000, env="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size: int = Field(268_435_456, env="SQLITE_MMAP_SIZE")
+    sqlite_cache_size: int = Field(-64_000, env="SQLITE_CACHE_SIZE")
+    sqlite_temp_store: str = Field("memory", env="SQLITE_TEMP_STORE")
     expiry_warning_days: int = Field(3, env="EXPIRY_WARNING_DAYS")
+    expiry_stop_per_host_concurrency: int = Field(8, env="EXPIRY_STOP_PER_HOST_CONCURRENCY")
+
+    # How often each worker checks the catalog version for plan/upgrade/host changes
+    catalog_check_interval_seconds: float = Field(1.0, env="CATALOG_CHECK_INTERVAL_SECONDS")
+
+    # Listing pagination
+    page_size_default: int = Field(100, env="PAGE_SIZE_DEFAULT")
+    page_size_max: int = Field(1000, env="PAGE_SIZE_MAX")
 
     # Admin
     admin_api_key: str = Field("", env="ADMIN_API_KEY")
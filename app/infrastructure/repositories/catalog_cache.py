@@ -0,0 +1,86 @@
+import time
+from collections.abc import Callable, Mapping
+from types import MappingProxyType
+from typing import Any
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.infrastructure.storage.sqlite import CatalogVersionModel, SQLAlchemyDataStore
+
+_CHANGED = "catalog_changed"
+
+
+class CatalogCache:
+    """In-process read-through cache for the admin-managed catalog (plans, upgrades, hosts).
+
+    Each section is loaded whole on first use and then served from a dict. Every catalog
+    write bumps the single-row ``catalog_version`` counter in its own transaction.
+    Workers compare that counter with the version they loaded at most once per
+    ``check_interval`` seconds and reload when it moved; this process also drops its
+    sections as soon as its own write commits. Sections are handed out as read-only
+    mappings of frozen entities, so callers cannot change what other requests see.
+
+    A unit of work that has written to the catalog but not committed yet reads through
+    its own session instead, so it sees its writes and nobody else sees them early.
+    """
+
+    def __init__(self, db: SQLAlchemyDataStore, check_interval: float = 1.0):
+        self.db = db
+        self.check_interval = check_interval
+        self._sections: dict[str, dict] = {}
+        self._version: int | None = None
+        self._checked_at = float("-inf")
+        event.listen(db.SessionLocal, "after_commit", self._after_commit)
+        event.listen(db.SessionLocal, "after_rollback", self._after_rollback)
+
+    def section(self, name: str, load: Callable[[Session], dict[Any, Any]]) -> Mapping[Any, Any]:
+        """Return the cached ``name`` section, loading it with ``load`` on a miss."""
+
+        active = self.db.active_session()
+        if active is not None and active.info.get(_CHANGED):
+            return MappingProxyType(load(active))
+        self._check_version()
+        # a load racing with invalidate() fills the dict that was just discarded
+        sections = self._sections
+        entries = sections.get(name)
+        if entries is None:
+            # committed rows only: a unit of work's uncommitted catalog writes may still roll back
+            with self.db.SessionLocal() as session:
+                entries = sections[name] = load(session)
+        return MappingProxyType(entries)
+
+    def bump(self, session: Session) -> None:
+        """Record a catalog change inside the writing transaction (the row is seeded at startup)."""
+
+        session.execute(
+            update(CatalogVersionModel)
+            .where(CatalogVersionModel.id == 1)
+            .values(version=CatalogVersionModel.version + 1)
+        )
+        session.info[_CHANGED] = True
+
+    def invalidate(self) -> None:
+        self._sections = {}
+        self._checked_at = float("-inf")
+
+    def version(self) -> int:
+        with self.db.SessionLocal() as session:
+            return session.scalar(select(CatalogVersionModel.version).where(CatalogVersionModel.id == 1)) or 0
+
+    def _check_version(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return None
+        version = self.version()
+        self._checked_at = now
+        if version != self._version:
+            self._sections = {}
+            self._version = version
+
+    def _after_commit(self, session: Session) -> None:
+        if session.info.pop(_CHANGED, False):
+            self.invalidate()
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_CHANGED, None)
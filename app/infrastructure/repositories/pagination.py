@@ -0,0 +1,85 @@
+import base64
+import json
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TypeVar
+
+from sqlalchemy import Row, Select, tuple_
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PageCursor:
+    """Position after the last row of a page, ordered by ``(created_at, id)``.
+
+    Clients only see the opaque ``encode()`` form and hand it back unchanged.
+    """
+
+    created_at: datetime
+    id: str
+
+    def encode(self) -> str:
+        raw = json.dumps([self.created_at.isoformat(), self.id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "PageCursor":
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            created_at, row_id = json.loads(raw)
+            return cls(created_at=datetime.fromisoformat(created_at), id=str(row_id))
+        except (ValueError, TypeError) as exc:
+            raise ValueError("Invalid cursor") from exc
+
+    @classmethod
+    def after(cls, entity) -> "PageCursor":
+        """Cursor pointing past ``entity`` (anything with ``created_at`` and ``id``)."""
+
+        return cls(created_at=entity.created_at, id=str(entity.id))
+
+
+def keyset_page(stmt: Select, columns, after: PageCursor | None, limit: int | None) -> Select:
+    """Order ``stmt`` by ``(created_at, id)`` and seek past ``after`` instead of using OFFSET.
+
+    ``columns`` is anything exposing ``created_at`` and ``id`` columns: an ORM model
+    class or a table's ``.c`` collection. The row-value comparison lets SQLite range-scan the ``(created_at, id)`` index, so
+    a deep page costs the same as the first one.
+    """
+
+    if after is not None:
+        stmt = stmt.where(tuple_(columns.created_at, columns.id) > tuple_(after.created_at, after.id))
+    stmt = stmt.order_by(columns.created_at, columns.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def iter_keyset(
+    db,
+    stmt: Select,
+    key: Sequence,
+    chunk_size: int,
+    load: Callable[..., list[T]],
+) -> Iterator[T]:
+    """Yield what ``load(session, rows)`` maps from ``stmt``, one keyset page of ``chunk_size`` at a time.
+
+    Each page is a separate short query and session that seeks past the last ``key``
+    value seen, so no read transaction (and no WAL snapshot) stays open while the caller
+    works through the results. Rows updated in between are neither skipped nor repeated
+    as long as their ``key`` columns do not change.
+    """
+
+    last: tuple | None = None
+    while True:
+        page = stmt.order_by(*key).limit(chunk_size)
+        if last is not None:
+            page = page.where(tuple_(*key) > tuple_(*last))
+        with db.session() as session:
+            rows: list[Row] = session.execute(page).all()
+            items = load(session, rows)
+        yield from items
+        if len(rows) < chunk_size:
+            return
+        last = tuple(getattr(rows[-1], column.name) for column in key)
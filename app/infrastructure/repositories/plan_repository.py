@@ -1,16 +1,21 @@
+from collections.abc import Mapping
 from typing import Iterable, Optional
 
 from sqlalchemy import select
 
 from app.domain.models.plan import PlanSpec
+from app.infrastructure.repositories.catalog_cache import CatalogCache
 from app.infrastructure.storage.sqlite import PlanModel, SQLAlchemyDataStore
 
+PLANS = PlanModel.__table__
+
 
 class PlanRepository:
     """SQLAlchemy-backed store for admin-defined hosting plans."""
 
-    def __init__(self, db: SQLAlchemyDataStore):
+    def __init__(self, db: SQLAlchemyDataStore, cache: CatalogCache | None = None):
         self.db = db
+        self.cache = cache
 
     def add(self, plan: PlanSpec) -> None:
         with self.db.session() as session:
@@ -46,27 +51,44 @@ class PlanRepository:
                         default_expire_days=plan.default_expire_days,
                     )
                 )
+            self._changed(session)
             session.commit()
 
     def get(self, name: str) -> Optional[PlanSpec]:
+        if self.cache:
+            return self._catalog().get(name)
         with self.db.session() as session:
-            row = session.get(PlanModel, name)
-            return self._model_to_plan(row) if row else None
+            row = session.execute(select(PLANS).where(PLANS.c.name == name)).first()
+            return self._row_to_plan(row) if row else None
 
     def list(self) -> Iterable[PlanSpec]:
+        if self.cache:
+            return list(self._catalog().values())
         with self.db.session() as session:
-            rows = session.scalars(select(PlanModel)).all()
-            return [self._model_to_plan(row) for row in rows]
+            rows = session.execute(select(PLANS)).all()
+            return [self._row_to_plan(row) for row in rows]
 
     def delete(self, name: str) -> None:
         with self.db.session() as session:
             row = session.get(PlanModel, name)
             if row:
                 session.delete(row)
+                self._changed(session)
                 session.commit()
 
+    def _catalog(self) -> Mapping[str, PlanSpec]:
+        return self.cache.section("plans", self._load_catalog)
+
+    @classmethod
+    def _load_catalog(cls, session) -> dict[str, PlanSpec]:
+        return {row.name: cls._row_to_plan(row) for row in session.execute(select(PLANS))}
+
+    def _changed(self, session) -> None:
+        if self.cache:
+            self.cache.bump(session)
+
     @staticmethod
-    def _model_to_plan(row: PlanModel) -> PlanSpec:
+    def _row_to_plan(row) -> PlanSpec:
         return PlanSpec(
             name=row.name,
             vcpu=row.vcpu,
@@ -1,16 +1,19 @@
+from collections.abc import Mapping
 from typing import Iterable, Optional
 
 from sqlalchemy import select
 
 from app.domain.models.proxmox_host import ProxmoxHostConfig
+from app.infrastructure.repositories.catalog_cache import CatalogCache
 from app.infrastructure.storage.sqlite import ProxmoxHostModel, SQLAlchemyDataStore
 
 
 class ProxmoxHostRepository:
     """SQLAlchemy persistence for Proxmox host definitions."""
 
-    def __init__(self, db: SQLAlchemyDataStore):
+    def __init__(self, db: SQLAlchemyDataStore, cache: CatalogCache | None = None):
         self.db = db
+        self.cache = cache
 
     def add(self, host: ProxmoxHostConfig) -> None:
         with self.db.session() as session:
@@ -22,6 +25,10 @@ class ProxmoxHostRepository:
                 existing.realm = host.realm
                 existing.node = host.node
                 existing.location = host.location
+                existing.token_id = host.token_id
+                existing.token_secret = host.token_secret
+                existing.vmid_range_start = host.vmid_range_start
+                existing.vmid_range_end = host.vmid_range_end
             else:
                 session.add(
                     ProxmoxHostModel(
@@ -32,27 +39,54 @@ class ProxmoxHostRepository:
                         realm=host.realm,
                         node=host.node,
                         location=host.location,
+                        token_id=host.token_id,
+                        token_secret=host.token_secret,
+                        vmid_range_start=host.vmid_range_start,
+                        vmid_range_end=host.vmid_range_end,
                     )
                 )
+            self._changed(session)
             session.commit()
 
     def get(self, host_id: str) -> Optional[ProxmoxHostConfig]:
+        if self.cache:
+            return self._catalog().get(host_id)
         with self.db.session() as session:
             row = session.get(ProxmoxHostModel, host_id)
             return self._model_to_host(row) if row else None
 
     def list(self) -> Iterable[ProxmoxHostConfig]:
+        if self.cache:
+            return list(self._catalog().values())
         with self.db.session() as session:
             rows = session.scalars(select(ProxmoxHostModel)).all()
             return [self._model_to_host(row) for row in rows]
 
+    def first_for_location(self, location: str) -> Optional[ProxmoxHostConfig]:
+        """The host new servers in ``location`` default to (lowest id, so the choice is stable)."""
+
+        hosts = [host for host in self.list() if host.location == location]
+        return min(hosts, key=lambda host: host.id, default=None)
+
     def delete(self, host_id: str) -> None:
         with self.db.session() as session:
             row = session.get(ProxmoxHostModel, host_id)
             if row:
                 session.delete(row)
+                self._changed(session)
                 session.commit()
 
+    def _catalog(self) -> Mapping[str, ProxmoxHostConfig]:
+        return self.cache.section("hosts", self._load_catalog)
+
+    @classmethod
+    def _load_catalog(cls, session) -> dict[str, ProxmoxHostConfig]:
+        return {row.id: cls._model_to_host(row) for row in session.scalars(select(ProxmoxHostModel))}
+
+    def _changed(self, session) -> None:
+        if self.cache:
+            self.cache.bump(session)
+
     @staticmethod
     def _model_to_host(row: ProxmoxHostModel) -> ProxmoxHostConfig:
         return ProxmoxHostConfig(
@@ -63,4 +97,8 @@ class ProxmoxHostRepository:
             realm=row.realm,
             node=row.node,
             location=row.location,
+            token_id=row.token_id,
+            token_secret=row.token_secret,
+            vmid_range_start=row.vmid_range_start,
+            vmid_range_end=row.vmid_range_end,
         )
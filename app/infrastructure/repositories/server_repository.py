@@ -1,21 +1,46 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import and_, func, select, String
+from sqlalchemy import and_, select, update
 
 from app.domain.models.server import Server, ServerStatus
 from app.domain.models.upgrade import AppliedUpgrade
+from app.infrastructure.repositories.pagination import PageCursor, iter_keyset, keyset_page
 from app.infrastructure.storage.sqlite import (
     SQLAlchemyDataStore,
     ServerModel,
     ServerUpgradeModel,
 )
 
+SERVERS = ServerModel.__table__
+UPGRADES = ServerUpgradeModel.__table__
+
 
 class ServerRepository:
-    """SQLAlchemy persistence for server entities."""
+    """SQLAlchemy persistence for server entities.
+
+    Reads select plain Core rows from the ``servers`` table and map them straight into
+    ``Server`` objects; no ORM instances or identity map are built for listings.
+    """
+
+    # columns mirrored from Proxmox by update_synced_state
+    SYNCED_FIELDS = (
+        "status",
+        "proxmox_node",
+        "vcpu",
+        "memory_mb",
+        "disk_gb",
+        "disk_storage",
+        "primary_ip",
+        "last_synced_at",
+    )
+
+    # ids per ``server_id IN (...)`` query when attaching applied upgrades
+    UPGRADE_BATCH_SIZE = 500
+    # rows fetched per keyset page by the iter_* generators
+    STREAM_CHUNK_SIZE = 1000
 
     def __init__(self, db: SQLAlchemyDataStore):
         self.db = db
@@ -30,26 +55,112 @@ class ServerRepository:
                 self._apply_server(model, server)
                 session.add(model)
             session.commit()
+        server.mark_persisted()
 
     def update(self, server: Server) -> None:
-        self.add(server)
+        """Write only the fields changed since the server was loaded or last saved.
+
+        Emits one ``UPDATE ... WHERE id = ?`` without reading the row first, and nothing
+        at all when no tracked field changed. A server that was never persisted (or
+        whose row has gone) is written in full by ``add``.
+        """
+
+        changed = server.changed_fields()
+        if changed is None:
+            return self.add(server)
+        if not changed:
+            return None
+        with self.db.session() as session:
+            result = session.execute(
+                update(ServerModel)
+                .where(ServerModel.id == str(server.id))
+                .values(**self._column_values(server, changed))
+            )
+            session.commit()
+        if result.rowcount == 0:
+            return self.add(server)
+        server.mark_persisted(changed)
 
     def get(self, server_id: UUID) -> Optional[Server]:
         with self.db.session() as session:
-            model = session.get(ServerModel, str(server_id))
-            if not model:
+            row = session.execute(select(SERVERS).where(SERVERS.c.id == str(server_id))).first()
+            if row is None:
                 return None
-            server = self._model_to_server(model)
-            server.applied_upgrades = self.list_upgrades_for_server(server.id)
-            return server
+            return self._attach_upgrades(session, [self._row_to_server(row)])[0]
+
+    def list_for_user(
+        self, user_id: UUID, after: PageCursor | None = None, limit: int | None = None
+    ) -> Iterable[Server]:
+        with self.db.session() as session:
+            stmt = select(SERVERS).where(SERVERS.c.owner_id == str(user_id))
+            rows = session.execute(keyset_page(stmt, SERVERS.c, after, limit)).all()
+            return self._attach_upgrades(session, [self._row_to_server(row) for row in rows])
+
+    def update_many(self, servers: Iterable[Server], chunk_size: int = 500) -> int:
+        """Persist the changed fields of many servers, committing once per ``chunk_size`` rows.
+
+        Rows are written with an executemany UPDATE keyed by id (SQLAlchemy groups rows
+        that changed the same columns into one statement). Unchanged servers are skipped
+        and never-persisted ones go through ``add``. Returns how many servers were written.
+        """
+
+        rows: list[dict] = []
+        written: list[tuple[Server, set[str]]] = []
+        for server in servers:
+            changed = server.changed_fields()
+            if changed is None:
+                self.add(server)
+            elif changed:
+                rows.append({"id": str(server.id), **self._column_values(server, changed)})
+                written.append((server, changed))
+        for start in range(0, len(rows), chunk_size):
+            with self.db.session() as session:
+                session.execute(update(ServerModel), rows[start : start + chunk_size])
+                session.commit()
+        for server, changed in written:
+            server.mark_persisted(changed)
+        return len(written)
+
+    def list_for_host(self, host_id: str) -> Iterable[Server]:
+        """Servers with a VM on the host that the status reconciler should keep in sync."""
+
+        return list(self.iter_for_host(host_id))
 
-    def list_for_user(self, user_id: UUID) -> Iterable[Server]:
+    def iter_for_host(self, host_id: str, chunk_size: int | None = None) -> Iterator[Server]:
+        """Stream what ``list_for_host`` returns in ``(external_id, id)`` order."""
+
+        stmt = select(SERVERS).where(
+            SERVERS.c.proxmox_host_id == host_id,
+            SERVERS.c.external_id.isnot(None),
+            SERVERS.c.status != ServerStatus.ROLLED_BACK.value,
+        )
+        return self._stream(stmt, (SERVERS.c.external_id, SERVERS.c.id), chunk_size)
+
+    def mark_synced(self, server_ids: Iterable[UUID], synced_at: datetime) -> None:
+        """Stamp ``last_synced_at`` for servers whose Proxmox state matched the stored copy."""
+
+        ids = [str(server_id) for server_id in server_ids]
+        if not ids:
+            return None
         with self.db.session() as session:
-            rows = session.scalars(select(ServerModel).where(ServerModel.owner_id == str(user_id))).all()
-            servers = [self._model_to_server(row) for row in rows]
-            for server in servers:
-                server.applied_upgrades = self.list_upgrades_for_server(server.id)
-            return servers
+            session.execute(update(ServerModel).where(ServerModel.id.in_(ids)).values(last_synced_at=synced_at))
+            session.commit()
+
+    def update_synced_state(self, server: Server) -> None:
+        """Write only the fields mirrored from Proxmox.
+
+        Sync runs race with user actions (extend, upgrade), so they must not write back
+        a whole row loaded before the Proxmox round trip.
+        """
+
+        with self.db.session() as session:
+            session.execute(
+                update(ServerModel)
+                .where(ServerModel.id == str(server.id))
+                .values(**self._column_values(server, set(self.SYNCED_FIELDS)))
+            )
+            session.commit()
+        server.mark_persisted(self.SYNCED_FIELDS)
 
     def list_all(
         self,
@@ -57,54 +168,79 @@ class ServerRepository:
         status: ServerStatus | None = None,
         plan: str | None = None,
         location: str | None = None,
+        after: PageCursor | None = None,
+        limit: int | None = None,
     ) -> Iterable[Server]:
-        with self.db.session() as session:
-            conditions = []
-            if owner_id:
-                conditions.append(ServerModel.owner_id == str(owner_id))
-            if status:
-                conditions.append(ServerModel.status == status.value)
-            if plan:
-                conditions.append(ServerModel.plan == plan)
-            if location:
-                conditions.append(ServerModel.location == location)
-
-            stmt = select(ServerModel)
-            if conditions:
-                stmt = stmt.where(and_(*conditions))
-
-            rows = session.scalars(stmt).all()
-            servers = [self._model_to_server(row) for row in rows]
-            for server in servers:
-                server.applied_upgrades = self.list_upgrades_for_server(server.id)
-            return servers
-
-    def list_expired(self, now: datetime) -> Iterable[Server]:
-        with self.db.session() as session:
-            expiry_expr = func.datetime(ServerModel.created_at, "+" + func.cast(ServerModel.expire_in_days, String) + " days")
-            rows = session.scalars(
-                select(ServerModel).where(
-                    ServerModel.expire_in_days.isnot(None),
-                    expiry_expr <= now,
-                )
-            ).all()
-            servers = [self._model_to_server(row) for row in rows]
-            for server in servers:
-                server.applied_upgrades = self.list_upgrades_for_server(server.id)
-            return servers
+        """Servers matching the filters in ``(created_at, id)`` order, ``limit`` rows past ``after``."""
 
-    def list_expiring_within(self, now: datetime, days: int) -> Iterable[Server]:
         with self.db.session() as session:
-            expiry_expr = func.datetime(ServerModel.created_at, "+" + func.cast(ServerModel.expire_in_days, String) + " days")
-            upper = now + timedelta(days=days)
-            rows = session.scalars(
-                select(ServerModel).where(
-                    ServerModel.expire_in_days.isnot(None),
-                    expiry_expr > now,
-                    expiry_expr <= upper,
-                )
-            ).all()
-            return [self._model_to_server(row) for row in rows]
+            stmt = self._filtered(owner_id, status, plan, location)
+            rows = session.execute(keyset_page(stmt, SERVERS.c, after, limit)).all()
+            return self._attach_upgrades(session, [self._row_to_server(row) for row in rows])
+
+    def iter_all(
+        self,
+        owner_id: UUID | None = None,
+        status: ServerStatus | None = None,
+        plan: str | None = None,
+        location: str | None = None,
+        chunk_size: int | None = None,
+    ) -> Iterator[Server]:
+        """Stream every server matching the filters in ``(created_at, id)`` order."""
+
+        stmt = self._filtered(owner_id, status, plan, location)
+        return self._stream(stmt, (SERVERS.c.created_at, SERVERS.c.id), chunk_size, with_upgrades=True)
+
+    def list_expired(
+        self, now: datetime, statuses: Iterable[ServerStatus] = tuple(ServerStatus)
+    ) -> Iterable[Server]:
+        """Servers in ``statuses`` whose ``expire_at`` has passed (a range scan per status)."""
+
+        return list(self.iter_expired(now, statuses))
+
+    def iter_expired(
+        self,
+        now: datetime,
+        statuses: Iterable[ServerStatus] = tuple(ServerStatus),
+        chunk_size: int | None = None,
+    ) -> Iterator[Server]:
+        """Stream what ``list_expired`` returns, status by status in ``(expire_at, id)`` order.
+
+        A server moved during the scan to a status that is scanned later is yielded
+        again, so callers that change statuses should list their target status first.
+        """
+
+        for status in statuses:
+            yield from self._stream(
+                select(SERVERS).where(SERVERS.c.status == status.value, SERVERS.c.expire_at <= now),
+                (SERVERS.c.expire_at, SERVERS.c.id),
+                chunk_size,
+                with_upgrades=True,
+            )
+
+    def list_expiring_within(
+        self, now: datetime, days: int, statuses: Iterable[ServerStatus] = tuple(ServerStatus)
+    ) -> Iterable[Server]:
+        return list(self.iter_expiring_within(now, days, statuses))
+
+    def iter_expiring_within(
+        self,
+        now: datetime,
+        days: int,
+        statuses: Iterable[ServerStatus] = tuple(ServerStatus),
+        chunk_size: int | None = None,
+    ) -> Iterator[Server]:
+        upper = now + timedelta(days=days)
+        for status in statuses:
+            yield from self._stream(
+                select(SERVERS).where(
+                    SERVERS.c.status == status.value,
+                    SERVERS.c.expire_at > now,
+                    SERVERS.c.expire_at <= upper,
+                ),
+                (SERVERS.c.expire_at, SERVERS.c.id),
+                chunk_size,
+            )
 
     def record_upgrade(self, server_id: UUID, upgrade_name: str, price: float | None) -> None:
         with self.db.session() as session:
@@ -117,21 +253,24 @@ class ServerRepository:
 
     def list_upgrades_for_server(self, server_id: UUID) -> list[AppliedUpgrade]:
         with self.db.session() as session:
-            rows = session.scalars(
-                select(ServerUpgradeModel)
-                .where(ServerUpgradeModel.server_id == str(server_id))
-                .order_by(ServerUpgradeModel.applied_at)
+            rows = session.execute(
+                select(UPGRADES).where(UPGRADES.c.server_id == str(server_id)).order_by(UPGRADES.c.applied_at)
             ).all()
-            return [
-                AppliedUpgrade(
-                    name=row.upgrade_name,
-                    applied_at=row.applied_at
-                    if isinstance(row.applied_at, datetime)
-                    else datetime.fromisoformat(row.applied_at),
-                    price=row.price,
-                )
-                for row in rows
-            ]
+            return [self._row_to_upgrade(row) for row in rows]
+
+    @staticmethod
+    def _column_values(server: Server, fields: set[str]) -> dict:
+        values = {}
+        for name in fields:
+            value = getattr(server, name)
+            if name == "owner_id":
+                value = str(value)
+            elif name == "status":
+                value = value.value
+            values[name] = value
+        if "created_at" in fields or "expire_in_days" in fields:
+            values["expire_at"] = server.expire_at
+        return values
 
     @staticmethod
     def _apply_server(model: ServerModel, server: Server) -> None:
@@ -147,13 +286,62 @@ class ServerRepository:
         model.disk_storage = server.disk_storage
         model.primary_ip = server.primary_ip
         model.expire_in_days = server.expire_in_days
+        model.expire_at = server.expire_at
         model.status = server.status.value
         model.created_at = server.created_at
         model.external_id = server.external_id
         model.last_notified_at = server.last_notified_at
+        model.last_synced_at = server.last_synced_at
+
+    def _stream(self, stmt, key: tuple, chunk_size: int | None, with_upgrades: bool = False) -> Iterator[Server]:
+        """Yield servers for ``stmt`` one keyset page (ordered by ``key``) and short session at a time."""
+
+        def load(session, rows) -> list[Server]:
+            servers = [self._row_to_server(row) for row in rows]
+            return self._attach_upgrades(session, servers) if with_upgrades else servers
+
+        return iter_keyset(self.db, stmt, key, chunk_size or self.STREAM_CHUNK_SIZE, load)
 
     @staticmethod
-    def _model_to_server(row: ServerModel) -> Server:
+    def _filtered(
+        owner_id: UUID | None, status: ServerStatus | None, plan: str | None, location: str | None
+    ):
+        conditions = []
+        if owner_id:
+            conditions.append(SERVERS.c.owner_id == str(owner_id))
+        if status:
+            conditions.append(SERVERS.c.status == status.value)
+        if plan:
+            conditions.append(SERVERS.c.plan == plan)
+        if location:
+            conditions.append(SERVERS.c.location == location)
+        stmt = select(SERVERS)
+        return stmt.where(and_(*conditions)) if conditions else stmt
+
+    @classmethod
+    def _attach_upgrades(cls, session, servers: list[Server]) -> list[Server]:
+        """Fill ``applied_upgrades`` for ``servers`` with one ``IN`` query per batch of ids."""
+
+        by_id = {str(server.id): server for server in servers}
+        ids = list(by_id)
+        for start in range(0, len(ids), cls.UPGRADE_BATCH_SIZE):
+            rows = session.execute(
+                select(UPGRADES)
+                .where(UPGRADES.c.server_id.in_(ids[start : start + cls.UPGRADE_BATCH_SIZE]))
+                .order_by(UPGRADES.c.server_id, UPGRADES.c.applied_at)
+            )
+            for row in rows:
+                by_id[row.server_id].applied_upgrades.append(cls._row_to_upgrade(row))
+        return servers
+
+    @staticmethod
+    def _row_to_upgrade(row) -> AppliedUpgrade:
+        return AppliedUpgrade(name=row.upgrade_name, applied_at=row.applied_at, price=row.price)
+
+    @staticmethod
+    def _row_to_server(row) -> Server:
+        """Map a ``servers`` Core row; the DateTime columns already come back as ``datetime``."""
+
         server = Server(
             id=UUID(row.id),
             owner_id=UUID(row.owner_id),
@@ -168,13 +356,10 @@ class ServerRepository:
             primary_ip=row.primary_ip,
             expire_in_days=row.expire_in_days,
             status=ServerStatus(row.status),
-            created_at=row.created_at if isinstance(row.created_at, datetime) else datetime.fromisoformat(row.created_at),
+            created_at=row.created_at,
             external_id=row.external_id,
-            last_notified_at=row.last_notified_at
-            if isinstance(row.last_notified_at, datetime)
-            else datetime.fromisoformat(row.last_notified_at)
-            if row.last_notified_at
-            else None,
+            last_notified_at=row.last_notified_at,
+            last_synced_at=row.last_synced_at,
         )
-        server.applied_upgrades = []
+        server.mark_persisted()
         return server
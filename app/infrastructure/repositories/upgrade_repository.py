@@ -1,17 +1,19 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
 from typing import Optional
 
 from sqlalchemy import select
 
 from app.domain.models.upgrade import UpgradeSpec
+from app.infrastructure.repositories.catalog_cache import CatalogCache
 from app.infrastructure.storage.sqlite import SQLAlchemyDataStore, UpgradeModel
 
 
 class UpgradeRepository:
     """SQLAlchemy-backed repository for resource upgrade bundles."""
 
-    def __init__(self, db: SQLAlchemyDataStore):
+    def __init__(self, db: SQLAlchemyDataStore, cache: CatalogCache | None = None):
         self.db = db
+        self.cache = cache
 
     def add(self, upgrade: UpgradeSpec) -> None:
         with self.db.session() as session:
@@ -33,14 +35,19 @@ class UpgradeRepository:
                         description=upgrade.description,
                     )
                 )
+            self._changed(session)
             session.commit()
 
     def get(self, name: str) -> Optional[UpgradeSpec]:
+        if self.cache:
+            return self._catalog().get(name)
         with self.db.session() as session:
             row = session.get(UpgradeModel, name)
             return self._model_to_upgrade(row) if row else None
 
     def list(self) -> Iterable[UpgradeSpec]:
+        if self.cache:
+            return list(self._catalog().values())
         with self.db.session() as session:
             rows = session.scalars(select(UpgradeModel)).all()
             return [self._model_to_upgrade(row) for row in rows]
@@ -50,8 +57,20 @@ class UpgradeRepository:
             row = session.get(UpgradeModel, name)
             if row:
                 session.delete(row)
+                self._changed(session)
                 session.commit()
 
+    def _catalog(self) -> Mapping[str, UpgradeSpec]:
+        return self.cache.section("upgrades", self._load_catalog)
+
+    @classmethod
+    def _load_catalog(cls, session) -> dict[str, UpgradeSpec]:
+        return {row.name: cls._model_to_upgrade(row) for row in session.scalars(select(UpgradeModel))}
+
+    def _changed(self, session) -> None:
+        if self.cache:
+            self.cache.bump(session)
+
     @staticmethod
     def _model_to_upgrade(row: UpgradeModel) -> UpgradeSpec:
         return UpgradeSpec(
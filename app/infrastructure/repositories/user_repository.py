@@ -1,17 +1,22 @@
-from collections.abc import Iterable
-from datetime import datetime
+from collections.abc import Iterable, Iterator
 from typing import Optional
 from uuid import UUID
 
 from sqlalchemy import select
 
 from app.domain.models.user import User
+from app.infrastructure.repositories.pagination import PageCursor, iter_keyset, keyset_page
 from app.infrastructure.storage.sqlite import SQLAlchemyDataStore, UserModel
 
+USERS = UserModel.__table__
+
 
 class UserRepository:
     """SQLAlchemy-backed repository for users."""
 
+    # rows fetched per keyset page by iter_all
+    STREAM_CHUNK_SIZE = 1000
+
     def __init__(self, db: SQLAlchemyDataStore):
         self.db = db
 
@@ -47,25 +52,36 @@ class UserRepository:
 
     def get(self, user_id: UUID) -> Optional[User]:
         with self.db.session() as session:
-            row = session.get(UserModel, str(user_id))
-            return self._model_to_user(row) if row else None
+            row = session.execute(select(USERS).where(USERS.c.id == str(user_id))).first()
+            return self._row_to_user(row) if row else None
 
     def get_by_external_auth(self, external_auth_id: str) -> Optional[User]:
         with self.db.session() as session:
-            row = session.scalar(select(UserModel).where(UserModel.external_auth_id == external_auth_id))
-            return self._model_to_user(row) if row else None
+            row = session.execute(select(USERS).where(USERS.c.external_auth_id == external_auth_id)).first()
+            return self._row_to_user(row) if row else None
 
-    def list(self) -> Iterable[User]:
+    def list(self, after: PageCursor | None = None, limit: int | None = None) -> Iterable[User]:
         with self.db.session() as session:
-            rows = session.scalars(select(UserModel)).all()
-            return [self._model_to_user(row) for row in rows]
+            rows = session.execute(keyset_page(select(USERS), USERS.c, after, limit)).all()
+            return [self._row_to_user(row) for row in rows]
+
+    def iter_all(self, chunk_size: int | None = None) -> Iterator[User]:
+        """Stream every user in ``(created_at, id)`` order, one short keyset query per ``chunk_size`` rows."""
+
+        return iter_keyset(
+            self.db,
+            select(USERS),
+            (USERS.c.created_at, USERS.c.id),
+            chunk_size or self.STREAM_CHUNK_SIZE,
+            lambda session, rows: [self._row_to_user(row) for row in rows],
+        )
 
     @staticmethod
-    def _model_to_user(row: UserModel) -> User:
+    def _row_to_user(row) -> User:
         return User(
             id=UUID(row.id),
             email=row.email,
             phone_number=row.phone_number,
             external_auth_id=row.external_auth_id,
-            created_at=row.created_at if isinstance(row.created_at, datetime) else datetime.fromisoformat(row.created_at),
+            created_at=row.created_at,
         )
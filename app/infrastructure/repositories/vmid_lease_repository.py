@@ -0,0 +1,148 @@
+from collections.abc import Iterable
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from app.infrastructure.storage.sqlite import ServerModel, SQLAlchemyDataStore, VmidLeaseModel
+
+RESERVED = "reserved"
+LEASED = "leased"
+
+
+class VmidLeaseRepository:
+    """SQLAlchemy persistence for the per-host VMID pool and the leases handed out from it."""
+
+    def __init__(self, db: SQLAlchemyDataStore):
+        self.db = db
+
+    def claim(self, host_id: str, server_id: UUID) -> int | None:
+        """Lease the lowest reserved VMID to ``server_id``; ``None`` when the pool is empty.
+
+        The UPDATE only matches a row that is still reserved, so two concurrent claims
+        can never end up with the same VMID; the loser simply tries the next one.
+        """
+
+        with self.db.session() as session:
+            while True:
+                vmid = session.scalar(
+                    select(VmidLeaseModel.vmid)
+                    .where(VmidLeaseModel.host_id == host_id, VmidLeaseModel.state == RESERVED)
+                    .order_by(VmidLeaseModel.vmid)
+                    .limit(1)
+                )
+                if vmid is None:
+                    return None
+                result = session.execute(
+                    update(VmidLeaseModel)
+                    .where(
+                        VmidLeaseModel.host_id == host_id,
+                        VmidLeaseModel.vmid == vmid,
+                        VmidLeaseModel.state == RESERVED,
+                    )
+                    .values(state=LEASED, server_id=str(server_id), updated_at=datetime.utcnow())
+                )
+                session.commit()
+                if result.rowcount == 1:
+                    return vmid
+
+    def reserve(self, host_id: str, vmids: Iterable[int]) -> int:
+        """Add VMIDs to the pool, skipping any another worker reserved first; return how many were added."""
+
+        now = datetime.utcnow()
+        rows = [{"host_id": host_id, "vmid": vmid, "state": RESERVED, "updated_at": now} for vmid in vmids]
+        if not rows:
+            return 0
+        with self.db.session() as session:
+            # ids already present (reserved by another worker, or leased) are skipped, not an error
+            result = session.execute(insert(VmidLeaseModel).values(rows).on_conflict_do_nothing())
+            session.commit()
+        return result.rowcount
+
+    def release(self, host_id: str, vmid: int) -> None:
+        """Return a lease to the pool (e.g. after the VM was rolled back)."""
+
+        with self.db.session() as session:
+            session.execute(
+                update(VmidLeaseModel)
+                .where(VmidLeaseModel.host_id == host_id, VmidLeaseModel.vmid == vmid)
+                .values(state=RESERVED, server_id=None, updated_at=datetime.utcnow())
+            )
+            session.commit()
+
+    def release_orphaned(self, host_id: str, in_use: set[int]) -> int:
+        """Return leases whose server row was deleted to the pool; ``in_use`` VMIDs stay leased.
+
+        Returns how many leases were released.
+        """
+
+        with self.db.session() as session:
+            orphaned = session.scalars(
+                select(VmidLeaseModel.vmid).where(
+                    VmidLeaseModel.host_id == host_id,
+                    VmidLeaseModel.state == LEASED,
+                    ~exists().where(ServerModel.id == VmidLeaseModel.server_id),
+                )
+            ).all()
+            free = [vmid for vmid in orphaned if vmid not in in_use]
+            if not free:
+                return 0
+            session.execute(
+                update(VmidLeaseModel)
+                .where(
+                    VmidLeaseModel.host_id == host_id,
+                    VmidLeaseModel.state == LEASED,
+                    VmidLeaseModel.vmid.in_(free),
+                )
+                .values(state=RESERVED, server_id=None, updated_at=datetime.utcnow())
+            )
+            session.commit()
+        return len(free)
+
+    def discard(self, host_id: str, vmid: int) -> None:
+        """Forget a VMID entirely, e.g. a lease whose id turned out to be taken on the cluster."""
+
+        with self.db.session() as session:
+            session.execute(
+                delete(VmidLeaseModel).where(VmidLeaseModel.host_id == host_id, VmidLeaseModel.vmid == vmid)
+            )
+            session.commit()
+
+    def discard_reserved(self, host_id: str, vmids: Iterable[int]) -> None:
+        """Drop pool entries that turned out to be taken on the cluster."""
+
+        vmids = list(vmids)
+        if not vmids:
+            return None
+        with self.db.session() as session:
+            session.execute(
+                delete(VmidLeaseModel).where(
+                    VmidLeaseModel.host_id == host_id,
+                    VmidLeaseModel.state == RESERVED,
+                    VmidLeaseModel.vmid.in_(vmids),
+                )
+            )
+            session.commit()
+
+    def reserved_count(self, host_id: str) -> int:
+        with self.db.session() as session:
+            return session.scalar(
+                select(func.count())
+                .select_from(VmidLeaseModel)
+                .where(VmidLeaseModel.host_id == host_id, VmidLeaseModel.state == RESERVED)
+            )
+
+    def reserved_vmids(self, host_id: str) -> set[int]:
+        with self.db.session() as session:
+            return set(
+                session.scalars(
+                    select(VmidLeaseModel.vmid).where(
+                        VmidLeaseModel.host_id == host_id, VmidLeaseModel.state == RESERVED
+                    )
+                )
+            )
+
+    def known_vmids(self, host_id: str) -> set[int]:
+        with self.db.session() as session:
+            return set(session.scalars(select(VmidLeaseModel.vmid).where(VmidLeaseModel.host_id == host_id)))
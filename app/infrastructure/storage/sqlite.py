@@ -1,18 +1,27 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime
+from contextvars import Context, ContextVar, copy_context
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 from sqlalchemy import (
     Column,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    bindparam,
     create_engine,
+    event,
+    inspect,
+    select,
+    text,
+    update,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker, Session
 
@@ -21,6 +30,7 @@ Base = declarative_base()
 
 class UserModel(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id = Column(String, primary_key=True)
     email = Column(String, nullable=False)
@@ -68,10 +78,24 @@ class ProxmoxHostModel(Base):
     realm = Column(String, nullable=False)
     node = Column(String, nullable=True)
     location = Column(String, nullable=False)
+    token_id = Column(String, nullable=True)
+    token_secret = Column(String, nullable=True)
+    vmid_range_start = Column(Integer, nullable=True)
+    vmid_range_end = Column(Integer, nullable=True)
 
 
 class ServerModel(Base):
     __tablename__ = "servers"
+    # filter columns lead and (created_at, id) follows, so filtered pages need no sort
+    __table_args__ = (
+        Index("ix_servers_created_at_id", "created_at", "id"),
+        Index("ix_servers_status_expire_at_id", "status", "expire_at", "id"),
+        Index("ix_servers_owner_id_created_at", "owner_id", "created_at", "id"),
+        Index("ix_servers_status_created_at", "status", "created_at", "id"),
+        Index("ix_servers_plan_created_at", "plan", "created_at", "id"),
+        Index("ix_servers_location_created_at", "location", "created_at", "id"),
+        Index("ix_servers_proxmox_host_id_external_id", "proxmox_host_id", "external_id", "id"),
+    )
 
     id = Column(String, primary_key=True)
     owner_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -85,18 +109,27 @@ class ServerModel(Base):
     disk_storage = Column(String, nullable=True)
     primary_ip = Column(String, nullable=True)
     expire_in_days = Column(Integer, nullable=True)
+    # created_at + expire_in_days, stored so expiry scans can use an index
+    expire_at = Column(DateTime, nullable=True)
     status = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     external_id = Column(String, nullable=True)
     last_notified_at = Column(DateTime, nullable=True)
+    last_synced_at = Column(DateTime, nullable=True)
 
-    upgrades = relationship("ServerUpgradeModel", back_populates="server", cascade="all, delete-orphan")
+    upgrades = relationship(
+        "ServerUpgradeModel",
+        back_populates="server",
+        cascade="all, delete-orphan",
+        order_by="[ServerUpgradeModel.server_id, ServerUpgradeModel.applied_at]",
+    )
 
 
 class ServerUpgradeModel(Base):
     __tablename__ = "server_upgrades"
     __table_args__ = (
         UniqueConstraint("server_id", "upgrade_name", "applied_at", name="uq_server_upgrade"),
+        Index("ix_server_upgrades_server_id_applied_at", "server_id", "applied_at"),
     )
 
     server_id = Column(String, ForeignKey("servers.id"), primary_key=True)
@@ -107,16 +140,246 @@ class ServerUpgradeModel(Base):
     server = relationship("ServerModel", back_populates="upgrades")
 
 
+class CatalogVersionModel(Base):
+    """Single-row counter bumped by every plan/upgrade/host write, polled by catalog caches."""
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class VmidLeaseModel(Base):
+    __tablename__ = "vmid_leases"
+
+    host_id = Column(String, ForeignKey("proxmox_hosts.id", ondelete="CASCADE"), primary_key=True)
+    vmid = Column(Integer, primary_key=True)
+    # "reserved" ids wait in the host's pool; "leased" ids belong to server_id
+    state = Column(String, nullable=False, default="reserved")
+    server_id = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+_active_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar("active_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """One session and transaction shared by every repository call made inside it.
+
+    While a unit of work is active in the current context, ``SQLAlchemyDataStore.session()``
+    hands out its session instead of a new one. A repository's ``session.commit()`` then
+    only flushes, and the unit of work commits once on a clean exit or rolls back on an
+    exception. Entering a unit of work while one is already active joins the outer one.
+    """
+
+    def __init__(self, db: SQLAlchemyDataStore):
+        self.db = db
+        self.session: Session | None = None
+        self._owner = False
+        self._token = None
+
+    @property
+    def active(self) -> bool:
+        return self.session is not None
+
+    def __enter__(self) -> UnitOfWork:
+        outer = _active_unit_of_work.get()
+        if outer is not None and outer.active and outer.db is self.db:
+            self.session = outer.session
+            return self
+        self.session = self.db.SessionLocal()
+        self._owner = True
+        self._token = _active_unit_of_work.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self._owner:
+            self.session = None
+            return None
+        session, self.session = self.session, None
+        try:
+            if exc_type is None:
+                session.commit()
+            else:
+                session.rollback()
+        finally:
+            session.close()
+            _active_unit_of_work.reset(self._token)
+
+    def flush(self) -> None:
+        self.session.flush()
+
+    def commit(self) -> None:
+        """Commit what is pending now; the unit of work stays open for further calls."""
+
+        self.session.commit()
+
+
+class _UnitOfWorkSession:
+    """A repository's handle on the unit-of-work session: ``commit`` flushes, ``close`` is a no-op."""
+
+    def __init__(self, session: Session):
+        self._session = session
+
+    def __getattr__(self, name: str):
+        return getattr(self._session, name)
+
+    def __enter__(self) -> _UnitOfWorkSession:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def commit(self) -> None:
+        self._session.flush()
+
+    def close(self) -> None:
+        return None
+
+
+def detached_context() -> Context:
+    """Copy of the current context with no active unit of work.
+
+    Background tasks that may outlive the request that started them run in it, so
+    they use their own sessions rather than joining (or outliving) the request's.
+    """
+
+    context = copy_context()
+    context.run(_active_unit_of_work.set, None)
+    return context
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """PRAGMAs applied to every new SQLite connection.
+
+    WAL lets readers run alongside the single writer, ``synchronous=NORMAL`` is durable
+    across application crashes in WAL mode, and ``busy_timeout`` makes a second writer
+    wait for the lock instead of failing with ``database is locked``.
+    """
+
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    busy_timeout_ms: int = 5000
+    mmap_size: int = 256 * 1024 * 1024
+    # negative values are KiB, positive values are pages
+    cache_size: int = -64_000
+    temp_store: str = "memory"
+
+    def pragmas(self) -> list[str]:
+        for name in ("journal_mode", "synchronous", "temp_store"):
+            if not getattr(self, name).isalnum():
+                raise ValueError(f"Invalid SQLite {name}: {getattr(self, name)!r}")
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            f"PRAGMA cache_size={int(self.cache_size)}",
+            f"PRAGMA temp_store={self.temp_store}",
+        ]
+
+
 class SQLAlchemyDataStore:
     """SQLAlchemy-backed datastore with SQLite default."""
 
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str,
+        profile: SQLiteProfile | None = None,
+        pool_size: int | None = None,
+        max_overflow: int | None = None,
+        pool_timeout: float | None = None,
+    ):
         os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
         url = path if "://" in path else f"sqlite:///{path}"
-        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
-        self.engine = create_engine(url, future=True, connect_args=connect_args)
+        is_sqlite = url.startswith("sqlite")
+        connect_args = {"check_same_thread": False} if is_sqlite else {}
+        pool_args = {
+            name: value
+            for name, value in (("pool_size", pool_size), ("max_overflow", max_overflow), ("pool_timeout", pool_timeout))
+            if value is not None
+        }
+        self.engine = create_engine(url, future=True, connect_args=connect_args, **pool_args)
+        if is_sqlite:
+            self._apply_profile(profile or SQLiteProfile())
         self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
         Base.metadata.create_all(self.engine)
+        self._upgrade_schema()
+
+    def _apply_profile(self, profile: SQLiteProfile) -> None:
+        pragmas = profile.pragmas()
+
+        @event.listens_for(self.engine, "connect")
+        def _on_connect(dbapi_connection, _record) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    def _upgrade_schema(self) -> None:
+        """Add nullable columns and indexes introduced after an existing database file was created."""
+
+        inspector = inspect(self.engine)
+        added: set[tuple[str, str]] = set()
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                existing = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    added.add((table.name, column.name))
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+            self._seed_catalog_version(conn)
+            if ("servers", "expire_at") in added:
+                self._backfill_expire_at(conn)
+
+    @staticmethod
+    def _seed_catalog_version(conn) -> None:
+        """Create the single ``catalog_version`` row up front so catalog writes only ever UPDATE it."""
+
+        versions = CatalogVersionModel.__table__
+        if conn.scalar(select(versions.c.id).where(versions.c.id == 1)) is None:
+            # OR IGNORE: another worker starting at the same time may insert it first
+            conn.execute(versions.insert().prefix_with("OR IGNORE", dialect="sqlite").values(id=1, version=0))
+
+    @staticmethod
+    def _backfill_expire_at(conn) -> None:
+        """Fill ``servers.expire_at`` for rows written before the column existed."""
+
+        servers = ServerModel.__table__
+        rows = conn.execute(
+            select(servers.c.id, servers.c.created_at, servers.c.expire_in_days).where(
+                servers.c.expire_in_days.isnot(None)
+            )
+        ).all()
+        if rows:
+            conn.execute(
+                update(servers).where(servers.c.id == bindparam("row_id")).values(expire_at=bindparam("expire_at")),
+                [
+                    {"row_id": row.id, "expire_at": row.created_at + timedelta(days=row.expire_in_days)}
+                    for row in rows
+                ],
+            )
 
     def session(self) -> Session:
+        active = self.active_session()
+        if active is not None:
+            return _UnitOfWorkSession(active)  # type: ignore[return-value]
         return self.SessionLocal()
+
+    def active_session(self) -> Session | None:
+        """The session of the unit of work active in this context, if any."""
+
+        uow = _active_unit_of_work.get()
+        if uow is not None and uow.active and uow.db is self:
+            return uow.session
+        return None
+
+    def unit_of_work(self) -> UnitOfWork:
+        return UnitOfWork(self)
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.CSV: "text/csv"}
+
+# encoded bytes gathered before a chunk after the first is handed to the response
+CHUNK_BYTES = 64 * 1024
+
+
+def export_lines(
+    records: Iterable[BaseModel],
+    schema: type[BaseModel],
+    fmt: ExportFormat,
+    exclude: set[str] | None = None,
+) -> Iterator[str]:
+    """Serialize ``records`` one line at a time; CSV starts with a header of ``schema``'s fields.
+
+    CSV cells holding lists or objects (e.g. applied upgrades) are written as JSON.
+    """
+
+    exclude = exclude or set()
+    if fmt is ExportFormat.NDJSON:
+        for record in records:
+            yield record.model_dump_json(exclude=exclude) + "\n"
+        return
+
+    columns = [name for name in schema.model_fields if name not in exclude]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for record in records:
+        values = record.model_dump(mode="json", include=set(columns))
+        writer.writerow([_csv_cell(values[name]) for name in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # no records: still emit the header
+        yield buffer.getvalue()
+
+
+def encode_chunks(lines: Iterable[str], compress: bool = False) -> Iterator[bytes]:
+    """Join ``lines`` into ~``CHUNK_BYTES`` UTF-8 chunks, gzip-compressed as a single stream if asked.
+
+    The first line (the first record, with the header for CSV) goes out on its own and,
+    when compressing, is sync-flushed, so the client gets decodable bytes before the
+    first full chunk has been read from the database.
+    """
+
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    pending: list[bytes] = []
+    size = 0
+    first = True
+    for line in lines:
+        data = line.encode()
+        pending.append(data)
+        size += len(data)
+        if size < CHUNK_BYTES and not first:
+            continue
+        chunk = b"".join(pending)
+        pending, size = [], 0
+        if compressor:
+            chunk = compressor.compress(chunk)
+            if first:
+                chunk += compressor.flush(zlib.Z_SYNC_FLUSH)
+        first = False
+        if chunk:
+            yield chunk
+    chunk = b"".join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
@@ -1,7 +1,9 @@
+from dataclasses import asdict
+from datetime import datetime
 from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 from app.domain.models.plan import PlanSpec
 from app.domain.models.server import Server, ServerStatus
@@ -82,6 +84,13 @@ class ServerRead(BaseModel):
     status: ServerStatus
     external_id: str | None
     applied_upgrades: list[AppliedUpgradeRead] = Field(default_factory=list)
+    last_synced_at: datetime | None = None
+    staleness_ms: int | None = Field(
+        default=None, description="Milliseconds since the status/resources were last confirmed with Proxmox"
+    )
+    stale: bool = Field(
+        default=False, description="A requested refresh did not reach Proxmox in time; stored values were returned"
+    )
 
     @classmethod
     def from_entity(cls, server: Server, vm_password: str | None = None) -> "ServerRead":
@@ -104,6 +113,13 @@ class ServerRead(BaseModel):
             status=server.status,
             external_id=server.external_id,
             applied_upgrades=[AppliedUpgradeRead.from_entity(upgrade) for upgrade in server.applied_upgrades],
+            last_synced_at=server.last_synced_at,
+            staleness_ms=(
+                int((datetime.utcnow() - server.last_synced_at).total_seconds() * 1000)
+                if server.last_synced_at
+                else None
+            ),
+            stale=server.stale,
         )
 
     class Config:
@@ -162,17 +178,37 @@ class PlanRead(BaseModel):
 
     @classmethod
     def from_entity(cls, plan: PlanSpec) -> "PlanRead":
-        return cls(**plan.__dict__)
+        return cls(**asdict(plan))
 
 
 class ProxmoxHostCreate(BaseModel):
     id: str = Field(..., description="Internal identifier for referencing the host")
     api_url: str = Field(..., example="https://pve1.local")
     username: str
-    password: str
+    password: str = Field("", description="Login password; optional when an API token is supplied")
     realm: str = Field("pam", description="Authentication realm, e.g. pam or pve")
     node: str | None = Field(None, description="Default node name to schedule on")
     location: str = Field("kr-central", description="Geographic/location tag")
+    token_id: str | None = Field(
+        None, description="API token id; sent as PVEAPIToken=<username>@<realm>!<token_id>=<secret>"
+    )
+    token_secret: str | None = Field(None, description="API token secret (UUID)")
+    vmid_range_start: int | None = Field(
+        None, ge=100, description="First VMID this backend may allocate on the host"
+    )
+    vmid_range_end: int | None = Field(
+        None, le=999_999_999, description="Last VMID this backend may allocate on the host"
+    )
+
+    @model_validator(mode="after")
+    def _require_credentials(self) -> "ProxmoxHostCreate":
+        if bool(self.token_id) != bool(self.token_secret):
+            raise ValueError("token_id and token_secret must be provided together")
+        if not self.password and not self.token_id:
+            raise ValueError("Either password or token_id/token_secret is required")
+        if self.vmid_range_start and self.vmid_range_end and self.vmid_range_start > self.vmid_range_end:
+            raise ValueError("vmid_range_start must not exceed vmid_range_end")
+        return self
 
 
 class ProxmoxHostRead(BaseModel):
@@ -182,6 +218,9 @@ class ProxmoxHostRead(BaseModel):
     realm: str
     node: str | None
     location: str
+    token_id: str | None = None
+    vmid_range_start: int | None = None
+    vmid_range_end: int | None = None
 
     @classmethod
     def from_entity(cls, host: ProxmoxHostConfig) -> "ProxmoxHostRead":
@@ -192,6 +231,46 @@ class ProxmoxHostRead(BaseModel):
             realm=host.realm,
             node=host.node,
             location=host.location,
+            token_id=host.token_id,
+            vmid_range_start=host.vmid_range_start,
+            vmid_range_end=host.vmid_range_end,
+        )
+
+
+class ProxmoxHostHealthRead(BaseModel):
+    id: str
+    location: str
+    state: str = Field(..., description="Circuit breaker state: closed, open or half_open")
+    calls: int
+    failures: int
+    slow_calls: int
+    consecutive_failures: int
+    retry_in_seconds: float | None = None
+    last_error: str | None = None
+
+    @classmethod
+    def from_entity(
+        cls,
+        host: ProxmoxHostConfig,
+        *,
+        state: str,
+        calls: int,
+        failures: int,
+        slow_calls: int,
+        consecutive_failures: int,
+        retry_in: float | None,
+        last_error: str | None,
+    ) -> "ProxmoxHostHealthRead":
+        return cls(
+            id=host.id,
+            location=host.location,
+            state=state,
+            calls=calls,
+            failures=failures,
+            slow_calls=slow_calls,
+            consecutive_failures=consecutive_failures,
+            retry_in_seconds=round(retry_in, 1) if retry_in is not None else None,
+            last_error=last_error,
         )
 
 
@@ -214,7 +293,7 @@ class UpgradeRead(BaseModel):
 
     @classmethod
     def from_entity(cls, upgrade: UpgradeSpec) -> "UpgradeRead":
-        return cls(**upgrade.__dict__)
+        return cls(**asdict(upgrade))
 
 
 class ServerUpgradeRequest(BaseModel):
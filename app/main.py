@@ -1,18 +1,20 @@
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
-from app.api.dependencies import get_expired_server_stopper, get_expiry_notifier
+from app.api.dependencies import (
+    get_expired_server_stopper,
+    get_expiry_notifier,
+    get_proxmox_client,
+    get_status_reconciler,
+)
 from app.api.routes import admin, servers, users
+from app.infrastructure.clients.proxmox_breaker import ProxmoxHostUnavailable
 from app.infrastructure.config.settings import settings
 
-app = FastAPI(title=settings.app_name, version="0.1.0")
-
-app.include_router(users.router)
-app.include_router(admin.router)
-app.include_router(servers.router)
-
 
 async def _run_midnight_expiry_worker(app: FastAPI) -> None:
     stopper = get_expired_server_stopper()
@@ -23,19 +25,38 @@ async def _run_midnight_expiry_worker(app: FastAPI) -> None:
         sleep_seconds = max((next_midnight - now).total_seconds(), 0)
         await asyncio.sleep(sleep_seconds)
         notifier.notify()
-        stopper.stop_expired()
+        await stopper.stop_expired()
 
 
-@app.on_event("startup")
-async def start_expiry_scheduler() -> None:
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     app.state.expiry_task = asyncio.create_task(_run_midnight_expiry_worker(app))
+    reconciler = get_status_reconciler() if settings.status_sync_interval_seconds > 0 else None
+    if reconciler:
+        reconciler.start()
+    try:
+        yield
+    finally:
+        app.state.expiry_task.cancel()
+        if reconciler:
+            await reconciler.stop()
+        await get_proxmox_client().aclose()
+
+
+app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
+
+app.include_router(users.router)
+app.include_router(admin.router)
+app.include_router(servers.router)
 
 
-@app.on_event("shutdown")
-async def stop_expiry_scheduler() -> None:
-    task = getattr(app.state, "expiry_task", None)
-    if task:
-        task.cancel()
+@app.exception_handler(ProxmoxHostUnavailable)
+async def proxmox_host_unavailable(request: Request, exc: ProxmoxHostUnavailable) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(int(exc.retry_in), 1))},
+    )
 
 
 @app.get("/healthz")
@@ -0,0 +1,83 @@
+"""Shared fixtures: a throwaway SQLite file and a fake Proxmox cluster served in-process.
+
+The Proxmox client talks to :mod:`app.devtools.fake_proxmox` through ``httpx.ASGITransport``,
+so every request goes through the real client stack (tickets, breaker, retries, single
+flight) without a network. ``FlakyTransport`` sits in front of the fake to inject failures
+in a fixed order where ``FakeProxmoxConfig.failure_rate`` would be random.
+"""
+
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from app.devtools.fake_proxmox import FakeProxmox, FakeProxmoxConfig
+from app.domain.models.proxmox_host import ProxmoxHostConfig
+from app.infrastructure.clients.proxmox import AsyncProxmoxClient
+from app.infrastructure.clients.proxmox_retry import ProxmoxRetryPolicy
+from app.infrastructure.storage.sqlite import SQLAlchemyDataStore
+
+
+class FlakyTransport(httpx.AsyncBaseTransport):
+    """Answers the next API calls from ``failures`` before passing requests on to ``inner``.
+
+    Each entry is a status code (answered without reaching the fake) or an exception
+    instance (raised as if the connection failed). Logins are never intercepted.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+        self.failures: list[int | Exception] = []
+        self.sent = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/access/ticket"):
+            return await self.inner.handle_async_request(request)
+        self.sent += 1
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return httpx.Response(failure, json={"data": None, "message": "injected failure"}, request=request)
+        return await self.inner.handle_async_request(request)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db(tmp_path):
+    return SQLAlchemyDataStore(str(tmp_path / "test.db"))
+
+
+@pytest.fixture
+def fake():
+    return FakeProxmox(FakeProxmoxConfig(task_seconds={"default": 0.05}, vm_count=3, seed=7))
+
+
+@pytest.fixture
+def host():
+    return ProxmoxHostConfig(id="fake", api_url="http://fake-pve", username="root", password="secret", node="pve")
+
+
+@pytest.fixture
+def transport(fake):
+    return FlakyTransport(httpx.ASGITransport(app=fake.app))
+
+
+@pytest.fixture
+def make_client(transport) -> Callable[..., AsyncProxmoxClient]:
+    """Build a client against the fake; retries back off for 0s unless a test passes its own policy."""
+
+    def make(**kwargs) -> AsyncProxmoxClient:
+        kwargs.setdefault("retry", ProxmoxRetryPolicy(base_delay=0.0))
+        return AsyncProxmoxClient(transport=transport, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
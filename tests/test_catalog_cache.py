@@ -0,0 +1,111 @@
+"""Catalog cache invalidation: own commits, other workers' version bumps and units of work."""
+
+from dataclasses import FrozenInstanceError, replace
+
+import pytest
+from sqlalchemy import event
+
+from app.domain.models.plan import PlanSpec
+from app.infrastructure.repositories.catalog_cache import CatalogCache
+from app.infrastructure.repositories.plan_repository import PlanRepository
+from app.infrastructure.storage.sqlite import detached_context
+
+BASIC = PlanSpec(name="basic", vcpu=1, memory_mb=1024, disk_gb=20, location="kr-central")
+
+
+@pytest.fixture
+def cache(db):
+    # a long interval: only invalidation, never the periodic version check, refreshes these tests
+    return CatalogCache(db, check_interval=3600)
+
+
+@pytest.fixture
+def plans(db, cache):
+    repo = PlanRepository(db, cache=cache)
+    repo.add(BASIC)
+    return repo
+
+
+def count_selects(db, call):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM plans" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        result = call()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_reads_are_served_from_memory_after_the_first_load(db, plans):
+    assert count_selects(db, lambda: plans.get("basic"))[1] == 1
+    found, selects = count_selects(db, lambda: [plans.get("basic") for _ in range(5)])
+    assert found == [BASIC] * 5
+    assert selects == 0
+
+
+def test_own_write_invalidates_on_commit(plans, cache):
+    plans.get("basic")
+    version = cache.version()
+    plans.add(replace(BASIC, vcpu=4))
+    assert cache.version() == version + 1
+    assert plans.get("basic").vcpu == 4
+
+
+def test_other_worker_sees_a_bump_at_its_next_version_check(db, plans):
+    other = PlanRepository(db, cache=CatalogCache(db, check_interval=0))
+    assert other.get("basic").vcpu == 1
+
+    plans.add(replace(BASIC, vcpu=8))
+    assert other.get("basic").vcpu == 8
+
+
+def test_version_is_checked_at_most_once_per_interval(db, plans):
+    stale = PlanRepository(db, cache=CatalogCache(db, check_interval=3600))
+    assert stale.get("basic").vcpu == 1
+
+    plans.add(replace(BASIC, vcpu=8))
+    # within the interval the other worker keeps serving what it loaded
+    assert stale.get("basic").vcpu == 1
+    stale.cache.invalidate()
+    assert stale.get("basic").vcpu == 8
+
+
+def test_unit_of_work_reads_its_own_uncommitted_writes(db, plans):
+    plans.get("basic")
+    with db.unit_of_work():
+        plans.add(replace(BASIC, vcpu=2))
+        plans.add(PlanSpec(name="large", vcpu=8, memory_mb=8192, disk_gb=160, location="kr-central"))
+        assert plans.get("basic").vcpu == 2
+        assert {plan.name for plan in plans.list()} == {"basic", "large"}
+        # nobody outside the unit of work sees them before the commit
+        assert detached_context().run(plans.get, "basic").vcpu == 1
+        assert detached_context().run(plans.get, "large") is None
+    assert plans.get("basic").vcpu == 2
+    assert plans.get("large") is not None
+
+
+def test_rolled_back_write_leaves_the_cache_untouched(db, plans, cache):
+    plans.get("basic")
+    version = cache.version()
+    with pytest.raises(RuntimeError), db.unit_of_work():
+        plans.add(replace(BASIC, vcpu=2))
+        raise RuntimeError("request failed")
+    assert cache.version() == version
+    plan, selects = count_selects(db, lambda: plans.get("basic"))
+    assert plan.vcpu == 1
+    assert selects == 0
+
+
+def test_cached_entries_cannot_be_changed_by_callers(plans, cache):
+    plan = plans.get("basic")
+    with pytest.raises(FrozenInstanceError):
+        plan.vcpu = 64
+    section = cache.section("plans", PlanRepository._load_catalog)
+    with pytest.raises(TypeError):
+        section["basic"] = replace(BASIC, vcpu=64)
+    assert plans.get("basic").vcpu == 1
@@ -0,0 +1,98 @@
+"""Streaming exports: rows streamed from a temp SQLite file, encoded lazily and optionally gzipped."""
+
+import csv
+import gzip
+import io
+import json
+import zlib
+from uuid import uuid4
+
+import pytest
+
+from app.domain.models.server import Server
+from app.infrastructure.repositories.server_repository import ServerRepository
+from app.interfaces.exports import (
+    CHUNK_BYTES,
+    ExportFormat,
+    encode_chunks,
+    export_lines,
+)
+from app.interfaces.schemas import ServerRead
+
+
+@pytest.fixture
+def servers(db):
+    repo = ServerRepository(db)
+    for index in range(50):
+        repo.add(Server(owner_id=uuid4(), plan="basic", location="kr-central", external_id=str(100 + index)))
+    return repo
+
+
+def server_lines(repo, fmt: ExportFormat):
+    records = (ServerRead.from_entity(server) for server in repo.iter_all(chunk_size=7))
+    return export_lines(records, ServerRead, fmt, exclude={"vm_password"})
+
+
+class Pulled:
+    """Iterates ``lines`` while counting how many the consumer has pulled so far."""
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self.lines)
+        self.count += 1
+        return line
+
+
+def test_ndjson_export_streams_every_row(servers):
+    rows = [json.loads(line) for line in server_lines(servers, ExportFormat.NDJSON)]
+    assert len(rows) == 50
+    assert len({row["id"] for row in rows}) == 50
+    assert "vm_password" not in rows[0]
+
+
+def test_csv_export_has_a_header_and_json_cells(servers):
+    text = "".join(server_lines(servers, ExportFormat.CSV))
+    header, *rows = list(csv.reader(io.StringIO(text)))
+    assert header[0] == "id" and "vm_password" not in header
+    assert len(rows) == 50
+    assert json.loads(rows[0][header.index("applied_upgrades")]) == []
+
+
+def test_empty_csv_export_still_has_its_header():
+    assert list(export_lines([], ServerRead, ExportFormat.CSV, exclude={"vm_password"})) == [
+        ",".join(name for name in ServerRead.model_fields if name != "vm_password") + "\r\n"
+    ]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_first_row_is_sent_before_the_rest_is_read(servers, compress):
+    lines = Pulled(server_lines(servers, ExportFormat.NDJSON))
+    first = next(encode_chunks(lines, compress=compress))
+    assert lines.count == 1
+
+    if compress:
+        # sync-flushed: the client can decode the first row without the rest of the stream
+        first = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(first)
+    assert json.loads(first)["plan"] == "basic"
+
+
+def test_later_rows_are_batched_into_large_chunks():
+    lines = [f"{index:0100d}\n" for index in range(3000)]
+    chunks = list(encode_chunks(lines))
+    assert b"".join(chunks) == "".join(lines).encode()
+    assert len(chunks[0]) == len(lines[0])
+    assert all(len(chunk) >= CHUNK_BYTES for chunk in chunks[1:-1])
+    assert len(chunks) < 10
+
+
+def test_gzip_output_is_a_single_stream(servers):
+    plain = "".join(server_lines(servers, ExportFormat.CSV)).encode()
+    compressed = b"".join(encode_chunks(server_lines(servers, ExportFormat.CSV), compress=True))
+    assert gzip.decompress(compressed) == plain
+    assert len(compressed) < len(plain)
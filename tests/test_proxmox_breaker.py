@@ -0,0 +1,133 @@
+"""Circuit breaker state transitions, driven by real client calls against the fake cluster."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.infrastructure.clients.proxmox_breaker import (
+    BreakerState,
+    ProxmoxBreakerRegistry,
+    ProxmoxCircuitBreaker,
+    ProxmoxHostUnavailable,
+)
+from app.infrastructure.clients.proxmox_retry import ProxmoxRetryPolicy
+
+pytestmark = pytest.mark.anyio
+
+RESOURCES = "/api2/json/cluster/resources"
+
+
+@pytest.fixture
+def client(make_client):
+    breakers = ProxmoxBreakerRegistry(failure_threshold=3, open_seconds=0.05)
+    return make_client(breakers=breakers, retry=ProxmoxRetryPolicy(max_attempts=1))
+
+
+def state(client, host) -> BreakerState:
+    return client.breakers.get(host.id).snapshot().state
+
+
+async def test_consecutive_gateway_errors_open_the_breaker(client, fake, host):
+    fake.config.failure_rate = 1.0
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_cluster_vmids(host)
+    assert state(client, host) is BreakerState.OPEN
+
+    sent = fake.calls[RESOURCES]
+    with pytest.raises(ProxmoxHostUnavailable):
+        await client.get_cluster_vmids(host)
+    assert fake.calls[RESOURCES] == sent
+
+
+async def test_api_errors_do_not_count_against_the_host(client, host):
+    for _ in range(5):
+        with pytest.raises(httpx.HTTPStatusError):
+            # pveproxy answers 500 for a missing VM: the host itself is healthy
+            await client.get_server_config("4242", host)
+    snapshot = client.breakers.get(host.id).snapshot()
+    assert snapshot.state is BreakerState.CLOSED
+    assert snapshot.failures == 0
+
+
+async def test_successful_probe_closes_the_breaker(client, fake, host):
+    fake.config.failure_rate = 1.0
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_cluster_vmids(host)
+
+    fake.config.failure_rate = 0.0
+    await asyncio.sleep(0.06)
+    assert 9000 in await client.get_cluster_vmids(host)
+    snapshot = client.breakers.get(host.id).snapshot()
+    assert snapshot.state is BreakerState.CLOSED
+    assert snapshot.calls == 1
+
+
+async def test_failed_probe_reopens_the_breaker(client, fake, host):
+    fake.config.failure_rate = 1.0
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_cluster_vmids(host)
+
+    await asyncio.sleep(0.06)
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get_cluster_vmids(host)
+    assert state(client, host) is BreakerState.OPEN
+    with pytest.raises(ProxmoxHostUnavailable):
+        await client.get_cluster_vmids(host)
+
+
+async def test_transport_errors_count_as_failures(client, transport, host):
+    transport.failures = [httpx.ReadError("connection reset")] * 3
+    for _ in range(3):
+        with pytest.raises(httpx.ReadError):
+            await client.get_cluster_vmids(host)
+    snapshot = client.breakers.get(host.id).snapshot()
+    assert snapshot.state is BreakerState.OPEN
+    assert snapshot.last_error.startswith("ReadError")
+
+
+def test_failure_rate_opens_without_consecutive_failures():
+    breaker = ProxmoxCircuitBreaker("h1", failure_threshold=100, failure_rate=0.5, min_calls=4)
+    for failed in (False, True, False):
+        breaker.acquire()
+        if failed:
+            breaker.record_failure("HTTP 503")
+        else:
+            breaker.record_success(0.01)
+    assert breaker.snapshot().state is BreakerState.CLOSED
+
+    breaker.acquire()
+    breaker.record_failure("HTTP 503")
+    snapshot = breaker.snapshot()
+    assert snapshot.state is BreakerState.OPEN
+    assert snapshot.consecutive_failures == 1
+
+
+def test_slow_calls_count_towards_the_failure_rate():
+    breaker = ProxmoxCircuitBreaker("h1", slow_call_seconds=1.0, failure_rate=0.5, min_calls=4)
+    for elapsed in (0.1, 2.0, 0.1, 2.0):
+        breaker.acquire()
+        breaker.record_success(elapsed)
+    snapshot = breaker.snapshot()
+    assert snapshot.state is BreakerState.OPEN
+    assert snapshot.slow_calls == 2
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = ProxmoxCircuitBreaker("h1", failure_threshold=1, open_seconds=0.0)
+    breaker.acquire()
+    breaker.record_failure("HTTP 503")
+
+    breaker.acquire()
+    assert breaker.snapshot().state is BreakerState.HALF_OPEN
+    with pytest.raises(ProxmoxHostUnavailable):
+        breaker.acquire()
+
+    # a probe that ended without a health signal (e.g. cancelled) frees the slot
+    breaker.release()
+    breaker.acquire()
+    breaker.record_success(0.01)
+    assert breaker.snapshot().state is BreakerState.CLOSED
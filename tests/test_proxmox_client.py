@@ -0,0 +1,174 @@
+"""Retry budget and idempotency gate, read single flight and ticket renewal of ``AsyncProxmoxClient``."""
+
+import asyncio
+from dataclasses import replace
+
+import httpx
+import pytest
+
+from app.infrastructure.clients.proxmox import ProxmoxTicketCache
+from app.infrastructure.clients.proxmox_breaker import ProxmoxBreakerRegistry
+from app.infrastructure.clients.proxmox_retry import ProxmoxRetryPolicy
+from app.infrastructure.clients.proxmox_singleflight import AsyncSingleFlight
+
+pytestmark = pytest.mark.anyio
+
+LOGIN = "/api2/json/access/ticket"
+RESOURCES = "/api2/json/cluster/resources"
+START = "/api2/json/nodes/pve/qemu/100/status/start"
+
+
+# -- retries ---------------------------------------------------------------------
+
+
+async def test_idempotent_read_is_retried_after_gateway_errors(client, fake, transport, host):
+    transport.failures = [503, 502]
+    assert 9000 in await client.get_cluster_vmids(host)
+    assert transport.sent == 3
+    assert fake.calls[RESOURCES] == 1
+
+
+async def test_read_gives_up_after_max_attempts(client, transport, host):
+    transport.failures = [503] * 5
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get_cluster_vmids(host)
+    assert transport.sent == client.retry.max_attempts
+
+
+async def test_unsafe_call_is_not_replayed_once_sent(client, fake, transport, host):
+    transport.failures = [503]
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.start_server("100", host)
+    assert transport.sent == 1
+
+    transport.failures = [httpx.ReadTimeout("no answer")]
+    with pytest.raises(httpx.ReadTimeout):
+        # the host may already have started the VM
+        await client.start_server("100", host)
+    assert transport.sent == 2
+    assert START not in fake.calls
+
+
+async def test_unsafe_call_is_retried_when_never_sent(client, fake, transport, host):
+    transport.failures = [httpx.ConnectError("connection refused")]
+    assert await client.start_server("100", host)
+    assert transport.sent == 2
+    assert fake.calls[START] == 1
+    assert fake.vms[100].status == "running"
+
+
+async def test_retry_budget_runs_dry_and_refills_on_success(make_client, fake, transport, host):
+    retry = ProxmoxRetryPolicy(max_attempts=3, base_delay=0.0, budget_ratio=0.5, budget_capacity=2.0)
+    client = make_client(retry=retry, breakers=ProxmoxBreakerRegistry(failure_threshold=100, min_calls=100))
+
+    transport.failures = [503] * 3
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get_cluster_vmids(host)
+    assert transport.sent == 3
+    assert retry.budget(host.id).tokens == 0
+
+    transport.failures = [503]
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get_cluster_vmids(host)
+    assert transport.sent == 4
+
+    for _ in range(2):
+        await client.get_cluster_vmids(host)
+    assert retry.budget(host.id).tokens == 1.0
+    transport.failures = [503]
+    assert 9000 in await client.get_cluster_vmids(host)
+    assert fake.calls[RESOURCES] == 3
+
+
+def test_retry_delays_back_off_with_jitter():
+    retry = ProxmoxRetryPolicy(base_delay=0.25, max_delay=1.0, max_attempts=10, budget_capacity=100)
+    error = httpx.ConnectError("refused")
+    for attempt, ceiling in ((1, 0.25), (2, 0.5), (3, 1.0), (6, 1.0)):
+        delay = retry.next_delay("h1", "POST", "power", attempt, error=error)
+        assert 0 <= delay <= ceiling
+
+
+# -- single flight ---------------------------------------------------------------
+
+
+async def test_concurrent_identical_reads_share_one_request(client, fake, host):
+    fake.config.latency_ms = 30
+    results = await asyncio.gather(*(client.get_cluster_vmids(host) for _ in range(10)))
+    assert all(result == results[0] for result in results)
+    assert fake.calls[RESOURCES] == 1
+    assert client.reads.shared == 9
+    assert client.reads.in_flight == 0
+
+
+async def test_reads_of_different_resources_are_not_shared(client, fake, host):
+    fake.config.latency_ms = 30
+    statuses = await asyncio.gather(*(client.get_server_status(str(vmid), host) for vmid in (100, 101, 102)))
+    assert statuses == ["stopped", "running", "running"]
+    assert client.reads.shared == 0
+
+
+async def test_shared_failure_reaches_every_caller(client, fake, transport, host):
+    fake.config.latency_ms = 30
+    transport.failures = [httpx.ReadError("reset")] * 3
+    results = await asyncio.gather(*(client.get_cluster_vmids(host) for _ in range(4)), return_exceptions=True)
+    assert all(isinstance(result, httpx.ReadError) for result in results)
+    assert transport.sent == 3
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = AsyncSingleFlight()
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("key", slow))
+    second = asyncio.ensure_future(flight.do("key", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == "done"
+    assert first.cancelled()
+    assert flight.shared == 1
+
+
+# -- tickets ---------------------------------------------------------------------
+
+
+async def test_concurrent_calls_log_in_once(client, fake, host):
+    fake.config.latency_ms = 10
+    await asyncio.gather(*(client.get_server_status(str(vmid), host) for vmid in (100, 101, 102)))
+    assert fake.calls[LOGIN] == 1
+
+
+async def test_old_ticket_is_renewed_in_the_background(make_client, fake, host):
+    client = make_client(tickets=ProxmoxTicketCache(renew_after=0.05))
+    await client.get_cluster_vmids(host)
+    first = client.tickets.get(host)
+
+    await asyncio.sleep(0.06)
+    await client.get_cluster_vmids(host)
+    # the call itself still used the old ticket; the renewal ran beside it
+    await asyncio.gather(*client._background)
+    assert fake.calls[LOGIN] == 2
+    assert client.tickets.get(host).ticket != first.ticket
+
+
+async def test_rejected_ticket_triggers_one_login(client, fake, host):
+    await client.get_cluster_vmids(host)
+    # pveproxy restarted and forgot every ticket
+    fake._tickets.clear()
+    assert 9000 in await client.get_cluster_vmids(host)
+    assert fake.calls[LOGIN] == 2
+
+
+async def test_expired_or_foreign_ticket_is_not_served(client, host):
+    client.tickets = ProxmoxTicketCache(lifetime=0.1, expiry_margin=0.05)
+    await client.get_cluster_vmids(host)
+    moved = replace(host, api_url="http://other-pve")
+    assert client.tickets.get(host) is not None
+    assert client.tickets.get(moved) is None
+
+    await asyncio.sleep(0.06)
+    assert client.tickets.get(host) is None
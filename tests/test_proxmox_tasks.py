@@ -0,0 +1,89 @@
+"""UPID task watcher: one poll per node per tick, exit statuses, timeouts and host outages."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.infrastructure.clients.proxmox_breaker import ProxmoxBreakerRegistry
+from app.infrastructure.clients.proxmox_tasks import (
+    ProxmoxTaskError,
+    ProxmoxTaskTimeout,
+    ProxmoxTaskWatcher,
+)
+
+pytestmark = pytest.mark.anyio
+
+ACTIVE = "/api2/json/nodes/pve/tasks"
+
+
+@pytest.fixture
+def client(make_client):
+    # a short open period so an outage that trips the breaker ends within the test
+    client = make_client(breakers=ProxmoxBreakerRegistry(open_seconds=0.05))
+    client.tasks = ProxmoxTaskWatcher(client, min_interval=0.01, max_interval=0.05)
+    return client
+
+
+def status_calls(fake) -> int:
+    return sum(count for path, count in fake.calls.items() if path.endswith("/status") and "/tasks/" in path)
+
+
+async def test_wait_returns_once_the_task_stops(client, fake, host):
+    upid = await client.start_server("100", host)
+    assert await client.wait_for_task(host, upid, "power") == "OK"
+    assert fake.vms[100].status == "running"
+    assert client.tasks.outstanding == 0
+
+
+async def test_many_waiters_share_one_poll_per_node(client, fake, host):
+    upids = [await client.start_server(str(vmid), host) for vmid in (100, 101, 102)]
+    upids += [await client.stop_server(str(vmid), host) for vmid in (100, 101)]
+
+    assert await asyncio.gather(*(client.wait_for_task(host, upid, "power") for upid in upids)) == ["OK"] * 5
+    # status is only fetched for tasks that dropped off the node's active list
+    assert status_calls(fake) == len(upids)
+    assert fake.calls[ACTIVE] < len(upids) * 3
+
+
+async def test_same_upid_is_watched_once(client, fake, host):
+    upid = await client.start_server("100", host)
+    assert await asyncio.gather(
+        client.wait_for_task(host, upid, "power"), client.wait_for_task(host, upid, "power")
+    ) == ["OK", "OK"]
+    assert status_calls(fake) == 1
+
+
+async def test_failed_task_raises_with_its_exit_status(client, fake, host):
+    upid = await client.start_server("100", host)
+    fake.tasks[upid].exitstatus = "start failed: QEMU exited with code 1"
+    with pytest.raises(ProxmoxTaskError) as raised:
+        await client.wait_for_task(host, upid, "power")
+    assert raised.value.upid == upid
+    assert raised.value.exitstatus.startswith("start failed")
+
+
+async def test_task_still_running_past_its_timeout(client, fake, host):
+    upid = await client.start_server("100", host)
+    fake.tasks[upid].finishes_at = time.monotonic() + 60
+    with pytest.raises(ProxmoxTaskTimeout):
+        await client.tasks.wait(host, upid, timeout=0.05)
+    assert client.tasks.outstanding == 0
+
+
+async def test_wait_survives_a_host_outage(client, fake, host):
+    upid = await client.start_server("100", host)
+    fake.config.failure_rate = 1.0
+    waiter = asyncio.ensure_future(client.wait_for_task(host, upid, "power"))
+    await asyncio.sleep(0.1)
+    assert not waiter.done()
+    assert client.breakers.get(host.id).snapshot().failures
+
+    fake.config.failure_rate = 0.0
+    assert await waiter == "OK"
+
+
+async def test_missing_upid_is_a_no_op_and_garbage_is_rejected(client, host):
+    assert await client.wait_for_task(host, None) is None
+    with pytest.raises(ValueError):
+        await client.tasks.wait(host, "not-a-upid", timeout=1)
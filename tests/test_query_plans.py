@@ -0,0 +1,109 @@
+"""Every listing and expiry query the repositories issue must be an index search without a sort.
+
+Each case runs a real repository call against a throwaway database, records the SELECTs it
+sends and checks SQLite's ``EXPLAIN QUERY PLAN`` for them, so dropping or reshaping an index
+that ``_upgrade_schema`` maintains fails here instead of turning into a full scan in production.
+"""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.application.use_cases.notify_expiring_servers import NOTIFIABLE_STATUSES
+from app.application.use_cases.stop_expired_servers import STOPPABLE_STATUSES
+from app.domain.models.server import Server, ServerStatus
+from app.domain.models.upgrade import UpgradeSpec
+from app.domain.models.user import User
+from app.infrastructure.repositories.pagination import PageCursor
+from app.infrastructure.repositories.server_repository import ServerRepository
+from app.infrastructure.repositories.upgrade_repository import UpgradeRepository
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.storage.sqlite import SQLAlchemyDataStore
+
+NOW = datetime(2024, 1, 10)
+OWNER = uuid4()
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SQLAlchemyDataStore(str(tmp_path / "plans.db"))
+    users = UserRepository(db)
+    servers = ServerRepository(db)
+    UpgradeRepository(db).add(UpgradeSpec(name="plus"))
+    for index in range(3):
+        users.add(User(email=f"user{index}@example.com", phone_number="01000000000", created_at=NOW))
+        server = Server(
+            owner_id=OWNER,
+            plan="basic",
+            location="kr-central",
+            proxmox_host_id="h1",
+            external_id=str(100 + index),
+            expire_in_days=index + 1,
+            status=ServerStatus.ACTIVE,
+            created_at=NOW - timedelta(days=3),
+        )
+        servers.add(server)
+        servers.record_upgrade(server.id, "plus", None)
+    return db
+
+
+CASES = {
+    "list_all": lambda db: ServerRepository(db).list_all(limit=2),
+    "list_all_after": lambda db: ServerRepository(db).list_all(
+        after=PageCursor(created_at=NOW - timedelta(days=3), id=""), limit=2
+    ),
+    "list_all_owner": lambda db: ServerRepository(db).list_all(owner_id=OWNER, limit=2),
+    "list_all_status": lambda db: ServerRepository(db).list_all(status=ServerStatus.ACTIVE, limit=2),
+    "list_all_plan": lambda db: ServerRepository(db).list_all(plan="basic", limit=2),
+    "list_all_location": lambda db: ServerRepository(db).list_all(location="kr-central", limit=2),
+    "list_for_user": lambda db: ServerRepository(db).list_for_user(OWNER, limit=2),
+    "list_for_host": lambda db: ServerRepository(db).list_for_host("h1"),
+    "iter_for_host": lambda db: list(ServerRepository(db).iter_for_host("h1", chunk_size=1)),
+    "iter_all": lambda db: list(ServerRepository(db).iter_all(status=ServerStatus.ACTIVE, chunk_size=1)),
+    "list_expired": lambda db: ServerRepository(db).list_expired(NOW, statuses=STOPPABLE_STATUSES),
+    "iter_expired": lambda db: list(
+        ServerRepository(db).iter_expired(NOW, statuses=STOPPABLE_STATUSES, chunk_size=1)
+    ),
+    "list_expiring_within": lambda db: ServerRepository(db).list_expiring_within(
+        NOW, 3, statuses=NOTIFIABLE_STATUSES
+    ),
+    "iter_expiring_within": lambda db: list(
+        ServerRepository(db).iter_expiring_within(NOW, 3, statuses=NOTIFIABLE_STATUSES, chunk_size=1)
+    ),
+    "users_list": lambda db: UserRepository(db).list(limit=2),
+    "users_iter_all": lambda db: list(UserRepository(db).iter_all(chunk_size=1)),
+}
+
+# unfiltered listings walk the (created_at, id) index from the start; LIMIT bounds the scan
+ORDERED_SCANS = {"list_all", "users_list", "users_iter_all"}
+
+
+def captured_selects(db, call) -> list[tuple[str, tuple]]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        call(db)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return statements
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_query_uses_index_without_sort(db, name):
+    statements = captured_selects(db, CASES[name])
+    assert statements
+
+    with db.engine.connect() as conn:
+        for statement, parameters in statements:
+            details = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            assert not any("TEMP B-TREE" in detail for detail in details), (statement, details)
+            for detail in details:
+                assert "INDEX" in detail, (statement, details)
+                assert detail.startswith("SEARCH") or name in ORDERED_SCANS, (statement, details)
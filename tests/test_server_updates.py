@@ -0,0 +1,111 @@
+"""Dirty-field tracking: ``ServerRepository.update`` writes only what changed since the last load or save."""
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.domain.models.server import Server, ServerStatus
+from app.infrastructure.repositories.server_repository import ServerRepository
+from app.infrastructure.storage.sqlite import ServerModel
+
+
+@pytest.fixture
+def servers(db):
+    return ServerRepository(db)
+
+
+@pytest.fixture
+def server(servers):
+    server = Server(owner_id=uuid4(), plan="basic", location="kr-central", expire_in_days=30)
+    servers.add(server)
+    return server
+
+
+def captured_writes(db, call) -> list[tuple[str, object]]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("UPDATE", "INSERT")):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return statements
+
+
+def test_loaded_server_has_no_changes(servers, server):
+    loaded = servers.get(server.id)
+    assert loaded.changed_fields() == set()
+    assert Server(owner_id=uuid4(), plan="basic", location="kr-central").changed_fields() is None
+
+
+def test_update_writes_only_changed_columns(db, servers, server):
+    loaded = servers.get(server.id)
+    loaded.status = ServerStatus.STOPPED
+    assert loaded.changed_fields() == {"status"}
+
+    [(statement, parameters)] = captured_writes(db, lambda: servers.update(loaded))
+    assert statement.startswith("UPDATE servers SET status=?")
+    assert "plan" not in statement
+    assert parameters == ("stopped", str(server.id))
+    assert loaded.changed_fields() == set()
+
+
+def test_unchanged_server_is_not_written(db, servers, server):
+    assert captured_writes(db, lambda: servers.update(servers.get(server.id))) == []
+
+
+def test_expiry_change_also_writes_expire_at(db, servers, server):
+    loaded = servers.get(server.id)
+    loaded.expire_in_days = 60
+    [(statement, _)] = captured_writes(db, lambda: servers.update(loaded))
+    assert "expire_in_days=?" in statement and "expire_at=?" in statement
+    assert servers.get(server.id).expire_at == loaded.expire_at
+
+
+def test_concurrent_edits_of_different_fields_both_survive(servers, server):
+    user_copy = servers.get(server.id)
+    sync_copy = servers.get(server.id)
+    user_copy.expire_in_days = 90
+    sync_copy.primary_ip = "10.0.0.5"
+    servers.update(user_copy)
+    servers.update(sync_copy)
+
+    stored = servers.get(server.id)
+    assert stored.expire_in_days == 90
+    assert stored.primary_ip == "10.0.0.5"
+
+
+def test_update_falls_back_to_a_full_write(db, servers, server):
+    fresh = Server(owner_id=uuid4(), plan="basic", location="kr-central")
+    servers.update(fresh)
+    assert servers.get(fresh.id) is not None
+
+    loaded = servers.get(server.id)
+    with db.session() as session:
+        session.execute(delete(ServerModel).where(ServerModel.id == str(server.id)))
+        session.commit()
+    loaded.status = ServerStatus.ACTIVE
+    servers.update(loaded)
+    assert servers.get(server.id).status is ServerStatus.ACTIVE
+
+
+def test_update_many_batches_changed_rows_and_skips_the_rest(db, servers):
+    batch = [Server(owner_id=uuid4(), plan="basic", location="kr-central") for _ in range(5)]
+    for server in batch:
+        servers.add(server)
+    now = datetime(2024, 1, 10)
+    for server in batch[:3]:
+        server.last_notified_at = now
+
+    writes = captured_writes(db, lambda: servers.update_many(batch, chunk_size=2))
+    assert len(writes) == 2
+    assert all(statement.startswith("UPDATE servers SET last_notified_at=?") for statement, _ in writes)
+    assert [server.changed_fields() for server in batch] == [set()] * 5
+    assert [servers.get(server.id).last_notified_at for server in batch] == [now] * 3 + [None] * 2
+    assert servers.update_many(batch) == 0
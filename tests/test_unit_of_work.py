@@ -0,0 +1,102 @@
+"""Unit of work over a temp SQLite file: one transaction per request, detached background work."""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.domain.models.server import Server
+from app.infrastructure.repositories.server_repository import ServerRepository
+from app.infrastructure.storage.sqlite import SQLAlchemyDataStore, detached_context
+
+
+@pytest.fixture
+def servers(db):
+    return ServerRepository(db)
+
+
+def new_server() -> Server:
+    return Server(owner_id=uuid4(), plan="basic", location="kr-central")
+
+
+def visible_elsewhere(servers, server) -> bool:
+    """Whether a session outside the current unit of work sees ``server``."""
+
+    return detached_context().run(servers.get, server.id) is not None
+
+
+def test_writes_commit_together_on_a_clean_exit(db, servers):
+    first, second = new_server(), new_server()
+    with db.unit_of_work():
+        servers.add(first)
+        servers.add(second)
+        # the repositories' commits only flushed into the shared transaction
+        assert servers.get(first.id) is not None
+        assert not visible_elsewhere(servers, first)
+    assert visible_elsewhere(servers, first)
+    assert visible_elsewhere(servers, second)
+
+
+def test_exception_rolls_back_every_write(db, servers):
+    kept = new_server()
+    servers.add(kept)
+    with pytest.raises(RuntimeError), db.unit_of_work():
+        servers.add(new_server())
+        kept.primary_ip = "10.0.0.9"
+        servers.update(kept)
+        raise RuntimeError("request failed")
+    assert servers.get(kept.id).primary_ip is None
+    assert len(list(servers.iter_all())) == 1
+
+
+def test_nested_unit_of_work_joins_the_outer_one(db, servers):
+    server = new_server()
+    with pytest.raises(RuntimeError), db.unit_of_work() as outer:
+        with db.unit_of_work() as inner:
+            assert inner.session is outer.session
+            servers.add(server)
+        # leaving the inner block committed nothing
+        assert not visible_elsewhere(servers, server)
+        raise RuntimeError("outer failed")
+    assert servers.get(server.id) is None
+
+
+def test_explicit_commit_keeps_the_unit_open(db, servers):
+    committed, discarded = new_server(), new_server()
+    with pytest.raises(RuntimeError), db.unit_of_work() as uow:
+        servers.add(committed)
+        uow.commit()
+        assert visible_elsewhere(servers, committed)
+        servers.add(discarded)
+        raise RuntimeError("later step failed")
+    assert servers.get(committed.id) is not None
+    assert servers.get(discarded.id) is None
+
+
+def test_active_session_is_scoped_to_the_unit_and_its_store(db, tmp_path):
+    other = SQLAlchemyDataStore(str(tmp_path / "other.db"))
+    assert db.active_session() is None
+    with db.unit_of_work() as uow:
+        assert db.active_session() is uow.session
+        assert other.active_session() is None
+        assert detached_context().run(db.active_session) is None
+    assert db.active_session() is None
+
+
+@pytest.mark.anyio
+async def test_background_task_in_a_detached_context_outlives_the_request(db, servers):
+    background, request = new_server(), new_server()
+    sessions = []
+
+    async def save_later():
+        sessions.append(db.active_session())
+        await asyncio.to_thread(servers.add, background)
+
+    with pytest.raises(RuntimeError), db.unit_of_work():
+        await asyncio.get_running_loop().create_task(save_later(), context=detached_context())
+        servers.add(request)
+        raise RuntimeError("request failed")
+
+    assert sessions == [None]
+    assert servers.get(background.id) is not None
+    assert servers.get(request.id) is None
@@ -0,0 +1,147 @@
+"""VMID pool: leases from a temp SQLite file, reconciled against the fake cluster's VMIDs."""
+
+import asyncio
+from dataclasses import replace
+from uuid import uuid4
+
+import httpx
+import pytest
+from sqlalchemy import delete
+
+from app.application.services.vmid_allocator import VmidAllocator
+from app.devtools.fake_proxmox import FakeVm
+from app.domain.models.server import Server
+from app.infrastructure.repositories.proxmox_host_repository import (
+    ProxmoxHostRepository,
+)
+from app.infrastructure.repositories.server_repository import ServerRepository
+from app.infrastructure.repositories.vmid_lease_repository import VmidLeaseRepository
+from app.infrastructure.storage.sqlite import ServerModel
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def host(host, db):
+    host = replace(host, vmid_range_start=100, vmid_range_end=119)
+    ProxmoxHostRepository(db).add(host)
+    return host
+
+
+@pytest.fixture
+def leases(db):
+    return VmidLeaseRepository(db)
+
+
+@pytest.fixture
+async def allocator(leases, client):
+    allocator = VmidAllocator(leases, client, pool_size=4)
+    yield allocator
+    # let background top-ups finish before the event loop closes
+    await asyncio.gather(*allocator._background)
+
+
+def add_server(db) -> Server:
+    server = Server(owner_id=uuid4(), plan="basic", location="kr-central")
+    ServerRepository(db).add(server)
+    return server
+
+
+def delete_servers(db, *servers: Server) -> None:
+    # servers have no delete API; rows are removed out of band (admin cleanup)
+    with db.session() as session:
+        session.execute(delete(ServerModel).where(ServerModel.id.in_([str(server.id) for server in servers])))
+        session.commit()
+
+
+async def test_allocate_fills_the_pool_around_vmids_in_use(allocator, leases, host, db):
+    # the fake runs VMs 100-102 and the template 9000
+    vmid = await allocator.allocate(host, add_server(db).id)
+    assert vmid == 103
+    assert leases.reserved_vmids(host.id) == {104, 105, 106}
+
+
+async def test_concurrent_allocations_never_share_a_vmid(allocator, host, db):
+    servers = [add_server(db) for _ in range(10)]
+    vmids = await asyncio.gather(*(allocator.allocate(host, server.id) for server in servers))
+    assert len(set(vmids)) == 10
+    assert not set(vmids) & {100, 101, 102}
+
+
+async def test_exhausted_range_is_an_error(allocator, host, db):
+    small = replace(host, vmid_range_start=100, vmid_range_end=103)
+    assert await allocator.allocate(small, add_server(db).id) == 103
+    with pytest.raises(ValueError, match="No free VMID"):
+        await allocator.allocate(small, add_server(db).id)
+
+
+async def test_replenish_drops_reserved_vmids_taken_on_the_cluster(allocator, leases, fake, host):
+    assert await allocator.replenish(host) == 4
+    # someone created a guest by hand with a pooled id
+    fake.vms[104] = FakeVm(104, "pve", "manual")
+
+    assert await allocator.replenish(host) == 1
+    reserved = leases.reserved_vmids(host.id)
+    assert 104 not in reserved
+    assert len(reserved) == 4
+
+
+async def test_replenish_survives_a_failing_nextid(allocator, leases, client, host, monkeypatch):
+    async def unavailable(_host):
+        raise httpx.ConnectError("refused")
+
+    # the hint is optional: the scan starts at the bottom of the range instead
+    monkeypatch.setattr(client, "get_next_vmid", unavailable)
+    assert await allocator.replenish(host) == 4
+    assert min(leases.reserved_vmids(host.id)) == 103
+
+
+async def test_leases_of_deleted_servers_return_once_their_vm_is_gone(allocator, leases, fake, host, db):
+    gone, kept, live = (add_server(db) for _ in range(3))
+    gone_vmid = await allocator.allocate(host, gone.id)
+    kept_vmid = await allocator.allocate(host, kept.id)
+    live_vmid = await allocator.allocate(host, live.id)
+    fake.vms[kept_vmid] = FakeVm(kept_vmid, "pve", "still-destroying")
+    delete_servers(db, gone, kept)
+
+    await allocator.replenish(host)
+    reserved = leases.reserved_vmids(host.id)
+    assert gone_vmid in reserved
+    assert kept_vmid not in reserved
+    assert live_vmid not in reserved
+    assert leases.claim(host.id, add_server(db).id) == gone_vmid
+
+
+def test_reserve_skips_vmids_already_in_the_pool(leases, host):
+    assert leases.reserve(host.id, [200, 201, 202]) == 3
+    assert leases.reserve(host.id, [201, 202, 203]) == 1
+    assert leases.reserve(host.id, []) == 0
+    assert leases.reserved_vmids(host.id) == {200, 201, 202, 203}
+
+
+def test_reserve_conflicts_do_not_abort_an_enclosing_unit_of_work(leases, host, db):
+    leases.reserve(host.id, [200])
+    server = Server(owner_id=uuid4(), plan="basic", location="kr-central")
+    with db.unit_of_work():
+        ServerRepository(db).add(server)
+        assert leases.reserve(host.id, [200, 201]) == 1
+    assert ServerRepository(db).get(server.id) is not None
+    assert leases.reserved_vmids(host.id) == {200, 201}
+
+
+def test_reserve_rolls_back_with_its_unit_of_work(leases, host, db):
+    with pytest.raises(RuntimeError), db.unit_of_work():
+        leases.reserve(host.id, [300, 301])
+        raise RuntimeError("provisioning failed")
+    assert leases.reserved_count(host.id) == 0
+
+
+def test_release_and_discard(leases, host, db):
+    leases.reserve(host.id, [200, 201])
+    vmid = leases.claim(host.id, add_server(db).id)
+    assert vmid == 200
+
+    leases.release(host.id, vmid)
+    assert leases.reserved_vmids(host.id) == {200, 201}
+    leases.discard(host.id, 200)
+    assert leases.known_vmids(host.id) == {201}